@@ -2,14 +2,73 @@
 """
 Build script for PalmSpeak Control Centre
 Creates an executable file with all dependencies included
+
+    python build_exe.py            # one-folder build: fast launch (default)
+    python build_exe.py --lite     # one-folder build without TensorFlow
+    python build_exe.py --onefile  # single self-extracting .exe (slow launch)
+
+The one-folder build starts without unpacking anything to a temp directory,
+is not UPX-compressed (decompressing the large TensorFlow/MediaPipe
+libraries costs more at launch than it saves on disk) and leaves out the
+TensorFlow, Keras and MediaPipe submodules the app never imports. Those are
+found by loading the model once with every backend and recording which
+modules were imported (--no-auto-excludes turns this off).
+
+The converted numpy model is bundled next to the .h5, so the first launch
+skips Keras too. --lite leaves TensorFlow out of the bundle entirely; the
+packaged app can then only use the numpy backend.
+
+After building, the bundle size and the measured launch time (process start
+to model ready, first launch and next launch) are printed and written to
+dist/build_report.json.
 """
 
 import os
 import sys
+import json
+import time
+import argparse
 import subprocess
 import shutil
+import tempfile
 from pathlib import Path
 
+APP_NAME = 'PalmSpeak_Control_Centre'
+MODEL_PATH = os.path.join('alphabet_keras', 'asl_alphabet_model.h5')
+ARTIFACT_DIR = 'build_artifacts'
+# Packages whose unused submodules are left out of the one-folder build
+AUTO_EXCLUDE_PACKAGES = ('tensorflow', 'keras', 'tf_keras', 'mediapipe')
+# Left out entirely unless something imports them while the model loads
+OPTIONAL_PACKAGES = ('tensorboard', 'tensorflow_estimator', 'IPython', 'pandas', 'scipy', 'pytest')
+# Left out of --lite builds
+TENSORFLOW_PACKAGES = ('tensorflow', 'keras', 'tf_keras', 'tensorboard', 'tensorflow_estimator',
+                       'tensorflow_io_gcs_filesystem')
+# MediaPipe graphs the hands solution needs (the other solutions' models are skipped)
+MEDIAPIPE_MODULES = ('hand_landmark', 'palm_detection')
+# Never UPX-compressed in --onefile builds: large, and slow to decompress at launch
+UPX_EXCLUDE = ['_pywrap_tensorflow_internal.pyd', 'tensorflow_framework*.dll', '_framework_bindings.pyd',
+               'opencv_videoio_ffmpeg*.dll', 'cv2.pyd', 'python3*.dll', 'vcruntime140*.dll']
+
+# Loads the model with every backend and prints the imported modules as JSON
+PROBE_SCRIPT = """
+import sys, json, logging
+import numpy as np
+from palmspeak.engine import RecognitionEngine
+from palmspeak.artifacts import load_inference
+from palmspeak.inference import BACKENDS
+from palmspeak.variants import PRECISIONS, VARIANT_BACKENDS
+engine = RecognitionEngine(num_workers=0, logger=logging.getLogger('palmspeak-build'))
+try:
+    engine.load_model()
+finally:
+    engine.shutdown()
+for name in BACKENDS:
+    for precision in PRECISIONS if name in VARIANT_BACKENDS else ('float32',):
+        backend, _ = load_inference(engine.model_path, name, None, precision=precision)
+        backend.predict(np.zeros((1, backend.input_dim), dtype=np.float32))
+print(json.dumps(sorted(sys.modules)))
+"""
+
 # Configure console for Unicode output
 def configure_unicode_console():
     # Use the global sys module
@@ -32,11 +91,12 @@ def check_requirements():
         'pyinstaller': 'PyInstaller',
         'flask': 'flask',
         'flask-cors': 'flask_cors',
+        'flask-sock': 'flask_sock',
+        'waitress': 'waitress',
         'tensorflow': 'tensorflow',
         'numpy': 'numpy',
         'opencv-python': 'cv2',
-        'mediapipe': 'mediapipe',
-        'pillow': 'PIL'
+        'mediapipe': 'mediapipe'
     }
     
     missing_packages = []
@@ -57,10 +117,144 @@ def check_requirements():
     print("All packages found!")
     return True
 
-def create_spec_file():
+def probe_used_modules():
+    """Modules imported while the model loads with every backend, or None if the probe fails"""
+    print("Probing which modules the app imports (loads the model with every backend)...")
+    env = os.environ.copy()
+    env['PALMSPEAK_CACHE_DIR'] = ''  # Convert from the .h5 so the Keras path is seen too
+    result = subprocess.run([sys.executable, '-c', PROBE_SCRIPT], capture_output=True, text=True,
+                            encoding='utf-8', errors='replace', env=env)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        print("Module probe failed, building without automatic excludes:")
+        print(result.stderr[-2000:])
+        return None
+    return set(json.loads(lines[-1]))
+
+def unused_submodules(package, used):
+    """Top-most submodules of `package` that none of the `used` modules are in or under"""
+    import importlib.util
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    # Every package containing a used module counts as used
+    used_prefixes = set()
+    for name in used:
+        parts = name.split('.')
+        for i in range(1, len(parts) + 1):
+            used_prefixes.add('.'.join(parts[:i]))
+    
+    excludes = []
+    
+    def walk(name, directory):
+        for entry in sorted(os.listdir(directory)):
+            path = os.path.join(directory, entry)
+            if os.path.isdir(path) and os.path.exists(os.path.join(path, '__init__.py')):
+                child = f"{name}.{entry}"
+            elif entry.endswith('.py') and entry != '__init__.py':
+                child, path = f"{name}.{entry[:-3]}", None
+            else:
+                continue
+            if child not in used_prefixes:
+                excludes.append(child)
+            elif path:
+                walk(child, path)
+    
+    for location in spec.submodule_search_locations:
+        walk(package, location)
+    return excludes
+
+def auto_excludes(used):
+    """Excludes for everything in AUTO_EXCLUDE_PACKAGES / OPTIONAL_PACKAGES the app never imports"""
+    excludes = [name for name in OPTIONAL_PACKAGES if name not in used]
+    for package in AUTO_EXCLUDE_PACKAGES:
+        if package in used:
+            excludes += unused_submodules(package, used)
+    return excludes
+
+def bundle_model_artifact():
+    """Convert the model to the numpy artifact in ARTIFACT_DIR (bundled next to the .h5)"""
+    from palmspeak.artifacts import load_inference
+    
+    shutil.rmtree(ARTIFACT_DIR, ignore_errors=True)
+    load_inference(MODEL_PATH, 'numpy', ARTIFACT_DIR)
+    bundled = sorted(os.listdir(ARTIFACT_DIR)) if os.path.isdir(ARTIFACT_DIR) else []
+    for name in bundled:
+        print(f"Bundling model artifact: {name}")
+    return bool(bundled)
+
+def create_spec_file(onefile=False, lite=False, excludes=(), artifact_dir=None):
     """Create PyInstaller spec file for advanced configuration"""
     # Get current directory for the spec file
     current_dir = os.path.abspath('.')
+    if onefile:
+        output = f'''
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    [],
+    name='{APP_NAME}',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude={UPX_EXCLUDE!r},
+    runtime_tmpdir=None,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=icon,
+)
+'''
+    else:
+        # One folder: nothing to unpack at launch, and no UPX to decompress
+        output = f'''
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='{APP_NAME}',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=icon,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='{APP_NAME}',
+)
+'''
+    tensorflow_imports = [] if lite else [
+        'tensorflow',
+        'tensorflow.keras',
+        'tensorflow.keras.models',
+        'tensorflow.keras.layers',
+        'tensorflow.python.keras.api._v2.keras',
+    ]
+    excludes = list(excludes) + (list(TENSORFLOW_PACKAGES) if lite else [])
+    # Hidden imports win over automatic excludes
+    excludes = sorted(name for name in set(excludes)
+                      if not any(hidden == name or hidden.startswith(name + '.') for hidden in tensorflow_imports))
     spec_content = f'''
 # -*- mode: python ; coding: utf-8 -*-
 import sys
@@ -75,6 +269,7 @@ script_dir = Path(r"{current_dir}")
 main_script = script_dir / "palmspeak_control_centre.py"
 model_dir = script_dir / "alphabet_keras"
 images_dir = script_dir / "images"
+icon = str(images_dir / "icon128.png") if (images_dir / "icon128.png").exists() else None
 
 # Data files to include
 datas = []
@@ -83,31 +278,57 @@ datas = []
 if model_dir.exists():
     datas.append((str(model_dir), "alphabet_keras"))
 
+# Converted model, read next to the .h5 at launch
+artifact_dir = {repr(os.path.abspath(artifact_dir)) if artifact_dir else None}
+if artifact_dir:
+    datas.append((artifact_dir, "alphabet_keras"))
+
 # Add image files if they exist
 if images_dir.exists():
     datas.append((str(images_dir), "images"))
 
-# MediaPipe assets
-datas += collect_data_files("mediapipe")
+# MediaPipe assets (only the hand graphs from mediapipe/modules)
+mediapipe_modules = {MEDIAPIPE_MODULES!r}
+
+def hand_asset(dest):
+    parts = Path(dest).parts
+    return len(parts) < 3 or parts[1] != "modules" or parts[2] in mediapipe_modules
+
+datas += [entry for entry in collect_data_files("mediapipe") if hand_asset(entry[1])]
 
 # TensorFlow binaries
-binaries = collect_dynamic_libs("tensorflow") + collect_dynamic_libs("tensorflow.python")
+binaries = [] if {lite!r} else collect_dynamic_libs("tensorflow") + collect_dynamic_libs("tensorflow.python")
 
 # Hidden imports for packages that PyInstaller might miss
-hiddenimports = [
+hiddenimports = {tensorflow_imports!r} + [
     'flask',
     'flask_cors',
-    'tensorflow',
-    'tensorflow.keras',
-    'tensorflow.keras.models',
-    'tensorflow.keras.layers',
-    'tensorflow.python.keras.api._v2.keras',
+    'flask_sock',
+    'simple_websocket',
+    'waitress',
     'numpy',
     'cv2',
     'mediapipe',
     'mediapipe.python.solutions.hands',
-    'PIL',
-    'PIL.Image',
+    'palmspeak',
+    'palmspeak.inference',
+    'palmspeak.batching',
+    'palmspeak.sessions',
+    'palmspeak.smoothing',
+    'palmspeak.hands',
+    'palmspeak.vision',
+    'palmspeak.workers',
+    'palmspeak.serving',
+    'palmspeak.engine',
+    'palmspeak.artifacts',
+    'palmspeak.metrics',
+    'palmspeak.dedup',
+    'palmspeak.roi',
+    'palmspeak.admission',
+    'palmspeak.logs',
+    'palmspeak.variants',
+    'palmspeak.capture',
+    'palmspeak.prediction_cache',
     'queue',
     'threading',
     'logging',
@@ -123,6 +344,9 @@ hiddenimports = [
     'tkinter.messagebox'
 ]
 
+# Modules the app never imports ({len(excludes)})
+excludes = {excludes!r}
+
 a = Analysis(
     [str(main_script)],
     pathex=[str(script_dir)],
@@ -132,7 +356,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excludes,
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -140,41 +364,30 @@ a = Analysis(
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
-
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
-    name='PalmSpeak_Control_Centre',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon=str(images_dir / "icon128.png") if (images_dir / "icon128.png").exists() else None,
-)
-'''
+{output}'''
     
     with open('palmspeak.spec', 'w', encoding='utf-8') as f:
-        f.write(spec_content.strip())
+        f.write(spec_content.strip() + '\n')
     
-    print("Created palmspeak.spec file")
+    print(f"Created palmspeak.spec file ({'one file' if onefile else 'one folder'}"
+          f"{', without TensorFlow' if lite else ''}, {len(excludes)} excluded modules)")
 
-def build_executable():
+def build_executable(args):
     """Build the executable using PyInstaller"""
     try:
+        excludes = []
+        if not args.onefile and not args.no_auto_excludes:
+            used = probe_used_modules()
+            if used is not None:
+                excludes = auto_excludes(used)
+        
+        artifact_dir = ARTIFACT_DIR if bundle_model_artifact() else None
+        if args.lite and artifact_dir is None:
+            print("Build error: --lite needs the converted model artifact")
+            return False
+        
         # Create the spec file first
-        create_spec_file()
+        create_spec_file(onefile=args.onefile, lite=args.lite, excludes=excludes, artifact_dir=artifact_dir)
         
         # Build command
         cmd = [
@@ -206,15 +419,98 @@ def build_executable():
         print(f"Build error: {str(e)}")
         return False
 
+def executable_path(onefile):
+    name = APP_NAME + ('.exe' if sys.platform == 'win32' else '')
+    if onefile:
+        return os.path.join('dist', name)
+    return os.path.join('dist', APP_NAME, name)
+
+def bundle_sizes(onefile):
+    """Total bundle bytes and the largest top-level entries of the bundle folder"""
+    if onefile:
+        size = os.path.getsize(executable_path(True))
+        return size, [(os.path.basename(executable_path(True)), size)]
+    root = os.path.join('dist', APP_NAME)
+    sizes = {}
+    for directory, _, files in os.walk(root):
+        relative = os.path.relpath(directory, root)
+        # Group by the top-level entry (folders under _internal for PyInstaller 6)
+        parts = [] if relative == '.' else relative.split(os.sep)
+        for file_name in files:
+            key_parts = (parts + [file_name])[:2 if parts[:1] == ['_internal'] else 1]
+            key = '/'.join(key_parts)
+            sizes[key] = sizes.get(key, 0) + os.path.getsize(os.path.join(directory, file_name))
+    return sum(sizes.values()), sorted(sizes.items(), key=lambda item: -item[1])
+
+def measure_launch(onefile, runs=2, timeout=300):
+    """Launch the built app headless (PALMSPEAK_STARTUP_PROBE) and time process start to model ready.
+    
+    Runs share a fresh model cache, so the first run is a cold first launch.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        env = os.environ.copy()
+        env['PALMSPEAK_CACHE_DIR'] = os.path.join(scratch, 'cache')
+        for run in range(runs):
+            probe_path = os.path.join(scratch, f'probe{run}.json')
+            env['PALMSPEAK_STARTUP_PROBE'] = probe_path
+            started = time.perf_counter()
+            try:
+                subprocess.run([os.path.abspath(executable_path(onefile))], env=env, timeout=timeout,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                results.append({'error': str(e)})
+                continue
+            elapsed = time.perf_counter() - started
+            if os.path.exists(probe_path):
+                with open(probe_path, encoding='utf-8') as f:
+                    probe = json.load(f)
+            else:
+                probe = {'error': 'The app exited without reporting'}
+            probe['launch_s'] = elapsed
+            results.append(probe)
+    return results
+
+def report_build(args):
+    """Print and save the bundle size and measured launch times"""
+    total, entries = bundle_sizes(args.onefile)
+    report = {
+        'profile': 'onefile' if args.onefile else 'lite' if args.lite else 'onedir',
+        'bundle_bytes': total,
+        'largest': [{'path': path, 'bytes': size} for path, size in entries[:10]],
+    }
+    print("\n" + "=" * 50)
+    print("BUILD REPORT")
+    print("=" * 50)
+    print(f"Profile: {report['profile']}")
+    print(f"Bundle size: {total / 1024 / 1024:.1f} MB")
+    for path, size in entries[:10]:
+        print(f"  {size / 1024 / 1024:8.1f} MB  {path}")
+    if not args.no_launch_test:
+        print("Measuring launch time...")
+        report['launches'] = measure_launch(args.onefile)
+        for label, launch in zip(('First launch', 'Next launch'), report['launches']):
+            if launch.get('error'):
+                print(f"{label}: failed ({launch['error']})")
+            else:
+                print(f"{label}: {launch['launch_s']:.2f}s to model ready "
+                      f"(model {launch['model_ready_s']:.2f}s, {launch['status']})")
+    with open(os.path.join('dist', 'build_report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"Report saved to {os.path.abspath(os.path.join('dist', 'build_report.json'))}")
+    return report
+
 def create_requirements_txt():
     """Create requirements.txt with exact versions"""
     requirements = """Flask==2.3.3
 flask-cors==4.0.0
+flask-sock==0.7.0
+waitress==2.1.2
 tensorflow==2.12.0
 numpy==1.23.5
 opencv-python==4.8.1.78
 mediapipe==0.10.11
-Pillow==10.0.1
 PyInstaller==5.13.2
 """
     
@@ -225,7 +521,7 @@ PyInstaller==5.13.2
 
 def cleanup():
     """Clean up build artifacts"""
-    cleanup_dirs = ['build', '__pycache__']
+    cleanup_dirs = ['build', '__pycache__', ARTIFACT_DIR]
     cleanup_files = ['palmspeak.spec']
     
     for dir_name in cleanup_dirs:
@@ -238,8 +534,26 @@ def cleanup():
             os.remove(file_name)
             print(f"Cleaned up {file_name}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the PalmSpeak Control Centre executable")
+    parser.add_argument('--onefile', action='store_true',
+                        help="Single self-extracting .exe (unpacks on every launch)")
+    parser.add_argument('--lite', action='store_true',
+                        help="Leave TensorFlow out and bundle only the converted numpy model")
+    parser.add_argument('--no-auto-excludes', action='store_true',
+                        help="Keep every TensorFlow / Keras / MediaPipe submodule")
+    parser.add_argument('--no-launch-test', action='store_true',
+                        help="Skip launching the built app to measure its start-up time")
+    parser.add_argument('--cleanup', choices=('ask', 'yes', 'no'), default='ask',
+                        help="Remove build artifacts afterwards")
+    args = parser.parse_args()
+    if args.onefile and args.lite:
+        parser.error("--lite is a one-folder build")
+    return args
+
 def main():
     """Main build process"""
+    args = parse_args()
     print("PalmSpeak Control Centre - EXE Builder")
     print("=" * 50)
     
@@ -260,17 +574,20 @@ def main():
     print("All requirements satisfied")
     
     # Build executable
-    success = build_executable()
+    success = build_executable(args)
     
     if success:
         print("\n" + "=" * 50)
         print("BUILD COMPLETED SUCCESSFULLY!")
         print("=" * 50)
-        print(f"Executable location: {os.path.abspath('dist/PalmSpeak_Control_Centre.exe')}")
+        print(f"Executable location: {os.path.abspath(executable_path(args.onefile))}")
         print("\nNext steps:")
         print("1. Test the executable in the dist/ folder")
         print("2. Make sure your model file (alphabet_keras/asl_alphabet_model.h5) is included")
-        print("3. Distribute the entire dist/ folder (not just the .exe)")
+        if args.onefile:
+            print("3. Distribute the entire dist/ folder (not just the .exe)")
+        else:
+            print(f"3. Distribute the entire dist/{APP_NAME}/ folder (not just the .exe)")
         
         # Check if model exists
         model_path = "alphabet_keras/asl_alphabet_model.h5"
@@ -282,8 +599,14 @@ def main():
     else:
         print("\nBuild failed. Check the error messages above.")
     
+    if success:
+        report_build(args)
+    
     # Ask about cleanup
-    cleanup_choice = input("\nClean up build artifacts? (y/n): ").lower().strip()
+    if args.cleanup == 'ask':
+        cleanup_choice = input("\nClean up build artifacts? (y/n): ").lower().strip()
+    else:
+        cleanup_choice = 'y' if args.cleanup == 'yes' else 'n'
     if cleanup_choice == 'y':
         cleanup()
 
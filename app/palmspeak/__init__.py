@@ -0,0 +1,3 @@
+"""
+PalmSpeak recognition service components shared by the Control Centre
+"""
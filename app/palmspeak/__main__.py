@@ -0,0 +1,137 @@
+"""
+Headless PalmSpeak server.
+
+    python -m palmspeak serve --port 5000 --workers 2
+    python -m palmspeak bench --output bench.json
+    python -m palmspeak transcribe recording.mp4 --output transcript.json
+    python -m palmspeak variants --output variants.json
+    python -m palmspeak replay capture.pslog --url http://127.0.0.1:5000 --speed 2
+
+`serve` runs the same recognition engine and API as the Control Centre,
+without the GUI, until interrupted (Ctrl+C / SIGTERM). `bench` runs the
+benchmark suite in palmspeak/bench.py, `transcribe` the offline batch
+pipeline in palmspeak/transcribe.py, `variants` the reduced-precision
+model report in palmspeak/variants.py and `replay` re-sends captured
+traffic (palmspeak/capture.py) with palmspeak/replay.py.
+"""
+
+import sys
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+
+from palmspeak.serving import SERVER_MODES
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m palmspeak',
+                                     description="PalmSpeak recognition service")
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    serve = commands.add_parser('serve', help="Load the model and serve the API without the GUI")
+    serve.add_argument('--host', help="Interface to bind (PALMSPEAK_HOST, default 0.0.0.0)")
+    serve.add_argument('--port', type=int, help="API port (PORT, default 5000)")
+    serve.add_argument('--stream-port', type=int,
+                       help="WebSocket /stream port (PALMSPEAK_STREAM_PORT, default 5001, 0 = none)")
+    serve.add_argument('--workers', type=int,
+                       help="Vision worker processes (PALMSPEAK_WORKERS, default 0 = in-process)")
+    serve.add_argument('--threads', type=int, help="waitress request threads (PALMSPEAK_SERVER_THREADS)")
+    serve.add_argument('--server', choices=SERVER_MODES, help="HTTP server (PALMSPEAK_SERVER)")
+    serve.add_argument('--backend', help="Inference backend (PALMSPEAK_INFERENCE_BACKEND)")
+    serve.add_argument('--log-level', default='INFO',
+                       choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+
+    bench = commands.add_parser('bench', help="Benchmark the pipeline and write the results as JSON")
+    from palmspeak.bench import add_arguments
+    add_arguments(bench)
+
+    transcribe = commands.add_parser('transcribe', help="Transcribe a video file or image folder offline")
+    from palmspeak.transcribe import add_arguments
+    add_arguments(transcribe)
+
+    variants = commands.add_parser('variants', help="Compare float32/float16/int8 model variants")
+    from palmspeak.variants import add_arguments
+    add_arguments(variants)
+
+    replay = commands.add_parser('replay', help="Replay captured traffic against a server and diff predictions")
+    from palmspeak.replay import add_arguments
+    add_arguments(replay)
+    return parser
+
+
+def serve(args):
+    """Run the engine until SIGINT/SIGTERM or a server error; returns the exit code"""
+    logging.basicConfig(level=args.log_level,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('palmspeak-control')
+    from palmspeak.logs import configure_logging
+    log_listener = configure_logging(logger)
+
+    # Imported here so `--help` does not pay for TensorFlow and MediaPipe
+    from palmspeak.engine import RecognitionEngine
+
+    engine = RecognitionEngine(host=args.host, port=args.port, server_mode=args.server,
+                               server_threads=args.threads, num_workers=args.workers,
+                               inference_backend=args.backend, stream_port=args.stream_port,
+                               logger=logger)
+    stopped = threading.Event()
+    errors = []
+
+    def on_exit(error):
+        if error is not None:
+            errors.append(error)
+        stopped.set()
+
+    def on_signal(signum, frame):
+        logger.info("Shutting down...")
+        stopped.set()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    try:
+        # Serve first: /health is live (not ready) and predictions answer 503 while the model loads
+        engine.start_server(on_exit=on_exit)
+        logger.info(engine.load_model())
+        # Wait in short slices so signals are handled promptly on Windows too
+        while not stopped.wait(0.5):
+            pass
+    except Exception as e:
+        logger.error(f"Server failed: {str(e)}")
+        return 1
+    finally:
+        engine.shutdown()
+        if log_listener is not None:
+            log_listener.stop()
+
+    if errors:
+        logger.error(f"Server error: {str(errors[0])}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'serve':
+        return serve(args)
+    if args.command == 'bench':
+        from palmspeak.bench import main as bench_main
+        return bench_main(args)
+    if args.command == 'transcribe':
+        from palmspeak.transcribe import main as transcribe_main
+        return transcribe_main(args)
+    if args.command == 'variants':
+        from palmspeak.variants import main as variants_main
+        return variants_main(args)
+    if args.command == 'replay':
+        from palmspeak.replay import main as replay_main
+        return replay_main(args)
+    return 2
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Vision workers in frozen builds
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Admission control and load shedding for frame predictions.
+
+Both HTTP servers hand every request to a thread, so under overload frames
+pile up and every answer arrives late. AdmissionController puts a bounded
+gate in front of the expensive pipeline:
+
+- at most `max_in_flight` frames are processed at once; the rest wait in a
+  FIFO queue of at most `max_pending` entries;
+- a session only ever has its newest frame waiting: a newer frame from the
+  same session supersedes (sheds) the one already queued;
+- a frame that cannot start within `max_wait` seconds, or that finds the
+  queue full, is shed immediately.
+
+Shed frames raise Overloaded, which the routes turn into a fast 429
+(superseded by the session's own newer frame) or 503 (server over capacity)
+with a Retry-After hint.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class Overloaded(Exception):
+    """A frame was shed; `status` is the HTTP status to answer with"""
+
+    def __init__(self, reason, status, retry_after):
+        super().__init__(f"Frame shed ({reason})")
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after  # Seconds
+
+
+class _Ticket:
+    __slots__ = ('session_id', 'superseded')
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.superseded = False
+
+
+class _Slot:
+    """Context manager holding one in-flight slot"""
+    __slots__ = ('controller', 'started')
+
+    def __init__(self, controller):
+        self.controller = controller
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.controller._release(time.perf_counter() - self.started)
+        return False
+
+
+class AdmissionController:
+    """Bounded in-flight work with newest-frame-per-session queueing"""
+
+    def __init__(self, max_in_flight=4, max_pending=16, max_wait=0.25):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.shed = {'superseded': 0, 'queue_full': 0, 'timeout': 0}
+        self.admitted = 0
+        # Smoothed service time, used for Retry-After hints
+        self.service_time = 0.05
+        self._queue = deque()
+        self._latest = {}
+        self._cond = threading.Condition()
+
+    @property
+    def pending(self):
+        return len(self._queue)
+
+    def admit(self, session_id=None):
+        """Wait for an in-flight slot; returns a context manager that releases it.
+
+        Frames from the same `session_id` replace each other in the queue;
+        pass None for requests that must not supersede each other (e.g. the
+        shared default session). Raises Overloaded when the frame is shed.
+        """
+        with self._cond:
+            if self.in_flight < self.max_in_flight and not self._queue:
+                self.in_flight += 1
+                self.admitted += 1
+                return _Slot(self)
+
+            if len(self._queue) >= self.max_pending:
+                raise self._shed('queue_full', 503)
+
+            ticket = _Ticket(session_id)
+            if session_id is not None:
+                previous = self._latest.get(session_id)
+                if previous is not None:
+                    previous.superseded = True
+                    self._queue.remove(previous)
+                    self._cond.notify_all()
+                self._latest[session_id] = ticket
+            self._queue.append(ticket)
+
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while True:
+                    if ticket.superseded:
+                        raise self._shed('superseded', 429)
+                    if self._queue[0] is ticket and self.in_flight < self.max_in_flight:
+                        self._queue.popleft()
+                        self.in_flight += 1
+                        self.admitted += 1
+                        # Let the next waiter check whether it can start too
+                        self._cond.notify_all()
+                        return _Slot(self)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._queue.remove(ticket)
+                        self._cond.notify_all()
+                        raise self._shed('timeout', 503)
+                    self._cond.wait(remaining)
+            finally:
+                if session_id is not None and self._latest.get(session_id) is ticket:
+                    del self._latest[session_id]
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'pending': len(self._queue),
+                'max_pending': self.max_pending,
+                'admitted': self.admitted,
+                'shed': dict(self.shed),
+                'service_time_ms': self.service_time * 1000,
+            }
+
+    def _release(self, elapsed):
+        with self._cond:
+            self.in_flight -= 1
+            self.service_time += 0.1 * (elapsed - self.service_time)
+            self._cond.notify_all()
+
+    def _shed(self, reason, status):
+        # Called with the lock held: estimate when a slot should be free
+        self.shed[reason] += 1
+        backlog = (len(self._queue) + self.in_flight) / self.max_in_flight
+        return Overloaded(reason, status, max(0.01, backlog * self.service_time))
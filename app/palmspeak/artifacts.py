@@ -0,0 +1,168 @@
+"""
+Cached, fast-loading model artifacts.
+
+Loading the .h5 model means importing TensorFlow and rebuilding the Keras
+graph, which dominates cold start. The numpy and tflite backends don't need
+Keras once they are built, so the first load converts the model and stores
+the result in the cache directory, keyed by the SHA-256 of the .h5 file:
+
+    numpy   - <model>-<hash>.npz     Dense kernels, biases and activations
+    tflite  - <model>-<hash>.tflite  converted flatbuffer
+
+Reduced-precision variants (variants.py) are cached the same way, with the
+precision in the name and, when calibration rows are configured, their hash
+mixed into the key.
+
+Later loads of an unchanged .h5 read the artifact directly (the numpy one
+without importing TensorFlow at all). A changed .h5 hashes differently, so
+stale artifacts are simply never matched. Packaged builds ship the artifact
+next to the .h5 (see build_exe.py), which is checked before the cache.
+"""
+
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+
+from palmspeak.inference import NumpyBackend, TFLiteBackend, load_backend
+from palmspeak.variants import (DEFAULT_PRECISION, PRECISIONS, VARIANT_BACKENDS, MIN_AGREEMENT,
+                                build_variant, calibration_rows, agreement)
+
+# Bump when the artifact layout changes so old files are ignored
+CACHE_VERSION = 1
+CACHEABLE_BACKENDS = {'numpy': '.npz', 'tflite': '.tflite'}
+
+
+def default_cache_dir():
+    """Per-user cache directory (PALMSPEAK_CACHE_DIR; empty disables caching)"""
+    configured = os.environ.get('PALMSPEAK_CACHE_DIR')
+    if configured is not None:
+        return configured or None
+    base = (os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+            or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'palmspeak')
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_path(cache_dir, model_path, digest, backend_name, precision=DEFAULT_PRECISION):
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    variant = '' if precision == DEFAULT_PRECISION else f"-{precision}"
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}{variant}-v{CACHE_VERSION}"
+                                   f"{CACHEABLE_BACKENDS[backend_name]}")
+
+
+def save_artifact(path, backend):
+    """Write a numpy/tflite backend to `path` atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if backend.name == 'numpy':
+                arrays = {}
+                for i, (kernel, bias, _) in enumerate(backend.layers):
+                    arrays[f'kernel_{i}'] = kernel
+                    arrays[f'bias_{i}'] = bias
+                arrays['activations'] = np.array([activation for _, _, activation in backend.layers])
+                np.savez(f, **arrays)
+            else:
+                f.write(backend.model_content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_artifact(path, backend_name, precision=DEFAULT_PRECISION):
+    """Rebuild a backend from an artifact written by save_artifact"""
+    if backend_name == 'numpy':
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data['activations']]
+            return NumpyBackend([(data[f'kernel_{i}'], data[f'bias_{i}'], activation)
+                                 for i, activation in enumerate(activations)])
+    with open(path, 'rb') as f:
+        return TFLiteBackend(model_content=f.read(), precision=precision)
+
+
+def load_inference(model_path, backend_name, cache_dir=None, logger=None,
+                   precision=DEFAULT_PRECISION, calibration_path=None):
+    """Load the classifier backend, from the artifact cache when possible.
+
+    Returns (backend, from_cache). On a cache miss the .h5 file is loaded
+    with Keras, the backend is built and parity-checked as usual, and the
+    artifact is written for next time. A reduced `precision` is built from
+    the parity-checked float32 backend and kept only if it agrees with it
+    (see variants.py); otherwise the float32 backend is returned.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown model precision '{precision}' (choose from {', '.join(PRECISIONS)})")
+    if precision != DEFAULT_PRECISION and backend_name not in VARIANT_BACKENDS:
+        if logger:
+            logger.warning(f"The {backend_name} backend runs float32 only, ignoring "
+                           f"PALMSPEAK_MODEL_PRECISION={precision} (use the tflite backend for {precision})")
+        precision = DEFAULT_PRECISION
+
+    path = None
+    if backend_name in CACHEABLE_BACKENDS:
+        digest = file_digest(model_path)
+        if precision != DEFAULT_PRECISION and calibration_path:
+            digest = hashlib.sha256((digest + file_digest(calibration_path)).encode()).hexdigest()
+        # An artifact bundled next to the model comes first, then the cache
+        candidates = [artifact_path(os.path.dirname(os.path.abspath(model_path)), model_path, digest,
+                                    backend_name, precision)]
+        if cache_dir:
+            path = artifact_path(cache_dir, model_path, digest, backend_name, precision)
+            candidates.append(path)
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                try:
+                    return read_artifact(candidate, backend_name, precision), True
+                except Exception as e:
+                    if logger:
+                        logger.warning(f"Ignoring unreadable model artifact {candidate}: {str(e)}")
+
+    from tensorflow.keras.models import load_model as tf_load_model
+    model = tf_load_model(model_path)
+    backend = load_backend(backend_name, model, logger)
+    if precision != DEFAULT_PRECISION and backend.name == backend_name:
+        backend = load_variant(backend, model, precision, calibration_path, logger)
+
+    # Only cache a backend that passed its checks, never a fallback
+    if path is not None and backend.name == backend_name and backend.precision == precision:
+        try:
+            save_artifact(path, backend)
+            if logger:
+                logger.info(f"Cached {backend.name} model artifact: {path}")
+        except OSError as e:
+            if logger:
+                logger.warning(f"Could not write model cache {path}: {str(e)}")
+    return backend, False
+
+
+def load_variant(base, model, precision, calibration_path=None, logger=None):
+    """Build a reduced-precision variant of `base`, or return `base` if it is not accurate enough"""
+    try:
+        rows = calibration_rows(calibration_path, base.input_dim)
+        variant = build_variant(base, model, precision, rows)
+        share = agreement(variant, base, rows)
+    except Exception as e:
+        if logger:
+            logger.warning(f"Could not build the {precision} model, using float32: {str(e)}")
+        return base
+    if share < MIN_AGREEMENT:
+        if logger:
+            logger.warning(f"{precision} model agrees with float32 on only {share:.1%} of "
+                           f"{len(rows)} calibration rows, using float32")
+        return base
+    if logger:
+        logger.info(f"Using {precision} {base.name} model ({share:.1%} agreement with float32 "
+                    f"on {len(rows)} calibration rows)")
+    return variant
@@ -0,0 +1,165 @@
+"""
+Micro-batching scheduler for the classifier.
+
+Flask serves each request on its own thread, so concurrent clients would
+otherwise call the backend separately with a 1x63 row each. MicroBatcher
+collects rows from concurrent callers for up to `max_wait` seconds (or until
+`max_batch_size` rows are queued), runs one batched forward pass and hands
+each caller back its own slice of the output. The window only stays open while
+another caller is on its way, so a lone client never waits for it.
+"""
+
+import threading
+import queue
+import time
+import numpy as np
+
+
+class _PendingBatch:
+    """Rows submitted by one caller, waiting for their predictions"""
+    __slots__ = ('inputs', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchStats:
+    """Batch size and queue wait counters for the scheduler"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.batches = 0
+            self.requests = 0
+            self.rows = 0
+            self.max_batch_rows = 0
+            self.batch_size_counts = {}
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record(self, requests, rows, waits):
+        with self._lock:
+            self.batches += 1
+            self.requests += requests
+            self.rows += rows
+            self.max_batch_rows = max(self.max_batch_rows, rows)
+            self.batch_size_counts[requests] = self.batch_size_counts.get(requests, 0) + 1
+            self.total_wait += sum(waits)
+            self.max_wait = max(self.max_wait, max(waits))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'rows': self.rows,
+                'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'max_batch_rows': self.max_batch_rows,
+                'batch_size_counts': dict(sorted(self.batch_size_counts.items())),
+                'mean_queue_wait_ms': 1000 * self.total_wait / self.requests if self.requests else 0.0,
+                'max_queue_wait_ms': 1000 * self.max_wait,
+            }
+
+
+class MicroBatcher:
+    """Coalesce concurrent predict calls into single batched backend calls"""
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait=0.002):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = BatchStats()
+        self._queue = queue.Queue()
+        # Callers inside predict(); the window closes once all of them are in the batch
+        self._callers = 0
+        self._callers_lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='palmspeak-batcher', daemon=True)
+        self._thread.start()
+
+    def predict(self, inputs):
+        """Queue an (N, features) array and block until its (N, classes) output is ready"""
+        if not self._running:
+            raise RuntimeError("Batcher is stopped")
+        with self._callers_lock:
+            self._callers += 1
+        try:
+            pending = _PendingBatch(np.asarray(inputs, dtype=np.float32))
+            self._queue.put(pending)
+            pending.done.wait()
+        finally:
+            with self._callers_lock:
+                self._callers -= 1
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def stop(self):
+        """Stop the scheduler thread once the queued work has been served"""
+        if self._running:
+            self._running = False
+            self._queue.put(None)
+            self._thread.join(timeout=1.0)
+
+    def _collect(self, first):
+        """Gather more pending calls until the window closes, the batch is full or no one else is waiting"""
+        batch = [first]
+        rows = len(first.inputs)
+        deadline = first.enqueued_at + self.max_wait
+        while rows < self.max_batch_size:
+            if self._callers <= len(batch) and self._queue.empty():
+                break
+            timeout = deadline - time.perf_counter()
+            try:
+                pending = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                # Stop requested - serve what we have, then exit on the next loop
+                self._queue.put(None)
+                break
+            batch.append(pending)
+            rows += len(pending.inputs)
+        return batch, rows
+
+    def _run(self):
+        self._serve()
+        # Fail anything that slipped in after the stop request
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is not None:
+                pending.error = RuntimeError("Batcher is stopped")
+                pending.done.set()
+
+    def _serve(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, rows = self._collect(first)
+            started = time.perf_counter()
+            try:
+                inputs = batch[0].inputs if len(batch) == 1 else np.concatenate([p.inputs for p in batch])
+                outputs = self.predict_fn(inputs)
+                offset = 0
+                for pending in batch:
+                    count = len(pending.inputs)
+                    pending.result = outputs[offset:offset + count]
+                    offset += count
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                self.stats.record(len(batch), rows, [started - p.enqueued_at for p in batch])
+                for pending in batch:
+                    pending.done.set()
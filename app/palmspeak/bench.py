@@ -0,0 +1,325 @@
+"""
+Reproducible benchmarks for the recognition pipeline.
+
+    python -m palmspeak bench --output bench.json [--images DIR]
+
+Measures, with a fixed seed so runs are comparable across commits:
+
+    cold_start  - a fresh interpreter importing the engine and loading the model
+    model       - the classifier forward pass (batch 1 and batch 32)
+    landmarks   - extract_hand_landmarks on each frame
+    predict     - handle_predict through the Flask test client, plus the
+                  per-stage percentiles the engine's metrics recorded
+    throughput  - /predict over HTTP with 1/4/16 concurrent keep-alive clients
+    memory      - peak RSS of this process and of the cold-start child
+
+Frames come from --images (any .jpg/.png files, ideally real hand photos) or
+are generated synthetically; synthetic frames exercise decode and MediaPipe
+but rarely contain a detectable hand, so the model only runs on landmarks.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import platform
+import threading
+import subprocess
+import http.client
+from contextlib import closing
+from datetime import datetime, timezone
+
+import numpy as np
+
+COLD_START_PROBE = """
+import json, time
+started = time.perf_counter()
+from palmspeak.engine import RecognitionEngine
+imported = time.perf_counter()
+engine = RecognitionEngine()
+engine.load_model()
+loaded = time.perf_counter()
+engine.shutdown()
+print(json.dumps({'import_s': imported - started, 'load_s': loaded - imported}))
+"""
+
+
+def percentiles(samples_s):
+    """Latency summary in milliseconds"""
+    if not len(samples_s):
+        return {'count': 0}
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {'count': int(ms.size), 'mean_ms': float(ms.mean()), 'p50_ms': float(p50),
+            'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(ms.max())}
+
+
+def synthetic_frames(count, seed, width=640, height=480):
+    """Deterministic JPEG frames: noise background with a skin-toned blob"""
+    import cv2
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        image = rng.integers(0, 80, size=(height, width, 3), dtype=np.uint8)
+        center = (int(rng.integers(160, width - 160)), int(rng.integers(120, height - 120)))
+        cv2.ellipse(image, center, (70, 100), float(rng.uniform(0, 180)), 0, 360, (120, 160, 210), -1)
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        frames.append(encoded.tobytes())
+    return frames
+
+
+def load_frames(directory):
+    paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.jpeg'))
+                   + glob.glob(os.path.join(directory, '*.png')))
+    if not paths:
+        raise ValueError(f"No .jpg/.png images in {directory}")
+    frames = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            frames.append(f.read())
+    return frames
+
+
+def synthetic_landmarks(count, seed):
+    """Deterministic 21x3 landmark arrays in MediaPipe's normalized range"""
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(0.05, 0.95, size=(21, 3)).astype(np.float32) for _ in range(count)]
+
+
+def progress(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def peak_rss_mb(who='self'):
+    """Peak resident set size in MB, or None where it can't be read"""
+    try:
+        import resource
+    except ImportError:
+        if who != 'self':
+            return None
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)  # Windows
+        except (ImportError, AttributeError):
+            return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is kB on Linux, bytes on macOS
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def free_port():
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def bench_cold_start():
+    """Import + model load in a fresh interpreter (uses the artifact cache if warm)"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', COLD_START_PROBE], capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['wall_s'] = wall
+    timings['peak_rss_mb'] = peak_rss_mb('children')
+    return timings
+
+
+def bench_model(engine, iterations, seed):
+    rng = np.random.default_rng(seed)
+    single = rng.uniform(0, 1, size=(1, engine.inference.input_dim)).astype(np.float32)
+    batch = rng.uniform(0, 1, size=(32, engine.inference.input_dim)).astype(np.float32)
+    results = {'backend': engine.inference.name}
+    for name, inputs in (('batch_1', single), ('batch_32', batch)):
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            engine.inference.predict(inputs)
+            samples.append(time.perf_counter() - started)
+        results[name] = percentiles(samples)
+        results[name]['rows_per_s'] = len(inputs) / float(np.mean(samples))
+    return results
+
+
+def bench_landmarks(engine, frames, iterations):
+    from palmspeak.vision import decode_image
+    images = [decode_image(frame) for frame in frames]
+    samples = []
+    detected = 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        landmarks = engine.extract_hand_landmarks(images[i % len(images)])
+        samples.append(time.perf_counter() - started)
+        detected += landmarks is not None
+    results = percentiles(samples)
+    results['hand_detected'] = detected
+    return results
+
+
+def bench_predict(engine, frames, landmarks, iterations):
+    """Drive handle_predict / handle_predict_landmarks in-process via the Flask test client"""
+    from palmspeak.metrics import PipelineMetrics
+    engine.metrics = PipelineMetrics()  # Stage numbers for this run only
+    client = engine.flask_app.test_client()
+    headers = {'X-PalmSpeak-Session': 'bench'}
+    results = {}
+    for endpoint, bodies, content_type in (
+            ('/predict', frames, 'image/jpeg'),
+            ('/predict-landmarks', [l.astype('<f4').tobytes() for l in landmarks], 'application/octet-stream')):
+        samples = []
+        for i in range(iterations):
+            body = bodies[i % len(bodies)]
+            started = time.perf_counter()
+            response = client.post(endpoint, data=body, content_type=content_type, headers=headers)
+            samples.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"{endpoint} returned {response.status_code}: {response.get_data(as_text=True)}")
+        results[endpoint] = percentiles(samples)
+    results['stages'] = engine.metrics.summary()['stages']
+    return results
+
+
+def _client_loop(port, frames, offset, deadline, samples, errors, session):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'image/jpeg', 'X-PalmSpeak-Session': session}
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            body = frames[i % len(frames)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                connection.request('POST', '/predict', body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(type(e).__name__)
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            samples.append(time.perf_counter() - started)
+    finally:
+        connection.close()
+
+
+def bench_throughput(port, frames, client_counts, duration):
+    """Closed-loop load: each client sends its next frame as soon as the last reply arrives"""
+    results = {}
+    for clients in client_counts:
+        per_client = [[] for _ in range(clients)]
+        errors = []
+        deadline = time.perf_counter() + duration
+        threads = [threading.Thread(target=_client_loop,
+                                    args=(port, frames, n * 7, deadline, per_client[n], errors, f'bench-{n}'))
+                   for n in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        samples = [s for client_samples in per_client for s in client_samples]
+        level = percentiles(samples)
+        level['requests_per_s'] = len(samples) / elapsed
+        level['errors'] = len(errors)
+        results[str(clients)] = level
+    return results
+
+
+def run(args):
+    """Run the selected benchmarks and return the results dict"""
+    import logging
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('palmspeak-control')
+    logger.setLevel(args.log_level)
+    # Saturating the server is the point here; don't log every queued task
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+
+    frames = load_frames(args.images) if args.images else synthetic_frames(args.frames, args.seed)
+    landmarks = synthetic_landmarks(args.frames, args.seed)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'frames': len(frames),
+            'frame_source': args.images or 'synthetic',
+            'iterations': args.iterations,
+            'env': {k: v for k, v in sorted(os.environ.items()) if k.startswith('PALMSPEAK_')},
+        }
+    }
+
+    if not args.skip_cold_start:
+        progress("Benchmarking cold start...")
+        results['cold_start'] = bench_cold_start()
+
+    from palmspeak.engine import RecognitionEngine
+    engine = RecognitionEngine(host='127.0.0.1', port=free_port(), server_mode=args.server,
+                               stream_port=0, logger=logger)
+    try:
+        engine.load_model()
+        results['meta']['backend'] = engine.inference.name
+        results['meta']['server'] = engine.server_mode
+        results['meta']['workers'] = engine.num_workers
+
+        progress("Benchmarking model forward pass...")
+        results['model'] = bench_model(engine, args.iterations, args.seed)
+        progress("Benchmarking landmark extraction...")
+        results['landmarks'] = bench_landmarks(engine, frames, args.iterations)
+
+        engine.start_server()
+        progress("Benchmarking handle_predict...")
+        results['predict'] = bench_predict(engine, frames, landmarks, args.iterations)
+        if args.duration > 0:
+            progress(f"Benchmarking throughput ({args.duration:g}s per level)...")
+            results['throughput'] = bench_throughput(engine.port, frames, args.clients, args.duration)
+    finally:
+        engine.shutdown()
+
+    results['memory'] = {'peak_rss_mb': peak_rss_mb('self')}
+    return results
+
+
+def add_arguments(parser):
+    from palmspeak.serving import SERVER_MODES
+    parser.add_argument('--output', '-o', help="Write JSON here instead of stdout")
+    parser.add_argument('--images', help="Directory of .jpg/.png frames (default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=32, help="Synthetic frames/landmark sets to generate")
+    parser.add_argument('--iterations', type=int, default=200, help="Samples per in-process benchmark")
+    parser.add_argument('--clients', type=lambda s: [int(n) for n in s.split(',')], default=[1, 4, 16],
+                        help="Comma-separated concurrent client counts (default 1,4,16)")
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help="Seconds per throughput level (0 skips the HTTP benchmark)")
+    parser.add_argument('--server', choices=SERVER_MODES, help="HTTP server (PALMSPEAK_SERVER)")
+    parser.add_argument('--skip-cold-start', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+
+
+def main(args):
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
@@ -0,0 +1,221 @@
+"""
+Opt-in capture of prediction traffic to a compact binary log.
+
+With PALMSPEAK_CAPTURE_FILE set, every frame and landmark prediction is
+appended to that file: its arrival time, session, the frame bytes (or, with
+PALMSPEAK_CAPTURE_MODE=landmarks, only the detected hands' landmarks) and
+the prediction returned. `python -m palmspeak replay` drives a server with a
+capture and diffs its predictions against the recorded ones.
+
+File layout (little-endian, records 8-byte aligned):
+
+    header   FILE_HEADER: magic, version, flags
+    record   RECORD: size, kind, hands, raw class, letter class, timestamp,
+             raw confidence, confidence, session length, payload length,
+             region (4 float32)
+             session id (UTF-8), payload, padding
+
+A frame record's payload is the encoded frame as received; a landmark
+record's is `hands` x 21 x 3 float32. Every record starts with its total
+size, so CaptureLog walks a memory-mapped file from header to header and
+hands out payloads as views into the mapping, without reading or parsing
+the frames themselves.
+"""
+
+import os
+import mmap
+import struct
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+FILE_MAGIC = b'PSCAPTR\x00'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<8sII')
+RECORD = struct.Struct('<IBBBBdffHHI4f')
+ALIGNMENT = 8
+
+KIND_FRAME = 0
+KIND_LANDMARKS = 1
+CAPTURE_MODES = ('frames', 'landmarks')
+# Class index stored when there is no prediction (no hand, or a letter outside the class list)
+NO_CLASS = 255
+
+
+class Record(namedtuple('Record', 'offset timestamp kind session region hands raw_class raw_confidence '
+                                  'letter_class confidence payload')):
+    """One captured prediction; `payload` is a view into the log's mapping"""
+    __slots__ = ()
+
+    @property
+    def landmarks(self):
+        """hands x 21 x 3 float32 view of a landmark record's payload"""
+        return np.frombuffer(self.payload, dtype='<f4').reshape(-1, 21, 3)
+
+
+def class_index(classes, letter):
+    try:
+        return classes.index(letter)
+    except ValueError:
+        return NO_CLASS
+
+
+class CaptureWriter:
+    """Append predictions to a capture file; safe to call from any request thread"""
+
+    def __init__(self, path, classes, mode='frames', max_bytes=1024 * 1024 * 1024, logger=None):
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode '{mode}' (choose from {', '.join(CAPTURE_MODES)})")
+        self.path = path
+        self.classes = list(classes)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self.records = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 0))
+        self.size = self._file.tell()
+
+    @property
+    def with_landmarks(self):
+        """Whether frame predictions must carry their hands' landmarks"""
+        return self.mode == 'landmarks'
+
+    def record_frame(self, timestamp, session_id, image_bytes, region, hands, response):
+        """Capture a frame prediction: the frame itself, or its hands' landmarks in landmarks mode"""
+        if self.mode == 'landmarks':
+            landmarks = [hand['landmarks'] for hand in hands if 'landmarks' in hand]
+            self.record_landmarks(timestamp, session_id, np.asarray(landmarks, dtype='<f4'), response, region)
+        else:
+            self._append(KIND_FRAME, timestamp, session_id, region, len(hands), image_bytes, response)
+
+    def record_landmarks(self, timestamp, session_id, landmarks, response, region=(0.0, 0.0, 1.0, 1.0)):
+        """Capture a landmark prediction (`landmarks` N x 21 x 3, or None for no hand)"""
+        if landmarks is None:
+            payload, hands = b'', 0
+        else:
+            landmarks = np.ascontiguousarray(landmarks, dtype='<f4')
+            payload, hands = landmarks.tobytes(), landmarks.size // 63
+        self._append(KIND_LANDMARKS, timestamp, session_id, region, hands, payload, response)
+
+    def _append(self, kind, timestamp, session_id, region, hands, payload, response):
+        session = (session_id or '').encode('utf-8')[:0xFFFF]
+        length = RECORD.size + len(session) + len(payload)
+        padding = -length % ALIGNMENT
+        header = RECORD.pack(length + padding, kind, min(hands, 255),
+                             class_index(self.classes, response.get('raw_letter')),
+                             class_index(self.classes, response.get('letter')),
+                             timestamp, response.get('raw_confidence') or 0.0,
+                             response.get('confidence') or 0.0,
+                             len(session), 0, len(payload), *region)
+        with self._lock:
+            if self._file is None:
+                return
+            if self.size + length + padding > self.max_bytes:
+                if self.skipped == 0 and self.logger:
+                    self.logger.warning(f"Capture file {self.path} reached its size limit, capture stopped")
+                self.skipped += 1
+                return
+            self._file.write(header)
+            self._file.write(session)
+            self._file.write(payload)
+            if padding:
+                self._file.write(bytes(padding))
+            # Whole records reach the file at once, so a live capture can be read (and survives a crash)
+            self._file.flush()
+            self.size += length + padding
+            self.records += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'path': self.path, 'mode': self.mode, 'records': self.records,
+                    'bytes': self.size, 'skipped': self.skipped}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CaptureLog:
+    """Read-only, memory-mapped view of a capture file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < FILE_HEADER.size:
+            raise ValueError(f"{path} is not a PalmSpeak capture")
+        magic, version, _ = FILE_HEADER.unpack_from(self._mmap, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} is not a PalmSpeak capture")
+        if version != FILE_VERSION:
+            raise ValueError(f"Unsupported capture version {version} in {path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __iter__(self):
+        """Records in file order; a record cut short (capture still being written) ends the walk"""
+        data = self._mmap
+        view = memoryview(data)
+        offset = FILE_HEADER.size
+        end = len(data)
+        while offset + RECORD.size <= end:
+            (size, kind, hands, raw_class, letter_class, timestamp, raw_confidence, confidence,
+             session_length, _, payload_length, *region) = RECORD.unpack_from(data, offset)
+            if size < RECORD.size or offset + size > end:
+                break
+            start = offset + RECORD.size
+            session = bytes(view[start:start + session_length]).decode('utf-8', errors='replace')
+            start += session_length
+            yield Record(offset, timestamp, kind, session, tuple(region), hands, raw_class, raw_confidence,
+                         letter_class, confidence, view[start:start + payload_length])
+            offset += size
+
+    def landmark_rows(self):
+        """(N x 63 float32 rows, predicted class of each row) for every captured hand.
+
+        The recorded prediction is the primary (first) hand's; other hands get NO_CLASS.
+        """
+        rows, labels = [], []
+        for record in self:
+            if record.kind == KIND_LANDMARKS and record.hands:
+                landmarks = record.landmarks
+                rows.append(landmarks.reshape(len(landmarks), 63))
+                labels.extend([record.raw_class] + [NO_CLASS] * (len(landmarks) - 1))
+        if not rows:
+            return np.empty((0, 63), dtype=np.float32), np.empty(0, dtype=np.uint8)
+        return np.concatenate(rows).astype(np.float32), np.asarray(labels, dtype=np.uint8)
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Payload views are still referenced; the mapping goes when they do
+            pass
+
+
+def open_capture(logger, classes):
+    """CaptureWriter from the PALMSPEAK_CAPTURE_* settings, or None when capture is off"""
+    path = os.environ.get('PALMSPEAK_CAPTURE_FILE')
+    if not path:
+        return None
+    writer = CaptureWriter(path, classes,
+                           mode=os.environ.get('PALMSPEAK_CAPTURE_MODE', 'frames'),
+                           max_bytes=int(float(os.environ.get('PALMSPEAK_CAPTURE_MAX_MB', 1024)) * 1024 * 1024),
+                           logger=logger)
+    if logger:
+        logger.info(f"Capturing prediction traffic to {path} ({writer.mode})")
+    return writer
@@ -0,0 +1,64 @@
+"""
+Near-duplicate frame detection per session.
+
+A static scene or a hand held still produces a stream of almost identical
+frames. Before running decode + MediaPipe + model, the frame is reduced to a
+small grayscale thumbnail (JPEG frames are decoded at 1/8 scale, which is a
+fraction of the cost of a full decode) and compared with the thumbnail of
+the last frame that went through the full pipeline. If the mean absolute
+difference is under the threshold, that frame's class probabilities are
+reused.
+
+Reuse is bounded: after `max_reuse` consecutive reused frames, or once the
+last computed frame is older than `max_age` seconds, the next frame is
+computed again. Comparing against the last *computed* frame, rather than
+the previous one, means a slow drift cannot accumulate unnoticed.
+"""
+
+import time
+
+import numpy as np
+
+
+class FrameCache:
+    """Last fully processed frame of a session"""
+    __slots__ = ('thumbnail', 'predictions', 'computed_at', 'reused')
+
+    def __init__(self, thumbnail, predictions):
+        self.thumbnail = thumbnail
+        self.predictions = predictions
+        self.computed_at = time.monotonic()
+        self.reused = 0
+
+
+class FrameDeduplicator:
+    """Decide per session whether a frame can reuse the previous result"""
+
+    def __init__(self, threshold=3.0, max_reuse=5, max_age=2.0):
+        # Mean absolute difference on 0-255 grayscale thumbnails
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.max_age = max_age
+
+    def lookup(self, session, thumbnail):
+        """Return (True, predictions) if the frame matches the session's last computed one"""
+        if thumbnail is None:
+            return False, None
+        with session.lock:
+            cache = session.frame_cache
+            if (cache is None or cache.thumbnail.shape != thumbnail.shape
+                    or cache.reused >= self.max_reuse
+                    or time.monotonic() - cache.computed_at > self.max_age):
+                return False, None
+            difference = np.abs(cache.thumbnail.astype(np.int16) - thumbnail).mean()
+            if difference > self.threshold:
+                return False, None
+            cache.reused += 1
+            return True, cache.predictions
+
+    def store(self, session, thumbnail, predictions):
+        """Remember a fully processed frame (predictions may be None for no hand)"""
+        if thumbnail is None:
+            return
+        with session.lock:
+            session.frame_cache = FrameCache(thumbnail, predictions)
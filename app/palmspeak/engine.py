@@ -0,0 +1,939 @@
+"""
+PalmSpeak recognition engine.
+
+Everything needed to serve recognition - model loading, MediaPipe, session
+smoothing, the Flask routes and the HTTP server - without any GUI. The Tk
+Control Centre and the headless `python -m palmspeak serve` entry point are
+both thin clients of RecognitionEngine.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import logging
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:  # The /stream WebSocket endpoint is optional
+    Sock = None
+
+from palmspeak.inference import DEFAULT_BACKEND
+from palmspeak.artifacts import load_inference, default_cache_dir
+from palmspeak.variants import DEFAULT_PRECISION
+from palmspeak.batching import MicroBatcher
+from palmspeak.sessions import SessionTable, get_session_id, DEFAULT_SESSION
+from palmspeak.smoothing import policy_factory, MajorityVote
+from palmspeak.hands import HandDetectors
+from palmspeak.vision import (decode_image, process_hands, to_rgb, detect_hands, primary_hand,
+                              normalize_hands, hand_results, blank_frame, frame_thumbnail,
+                              FrameBuffers, BufferPool)
+from palmspeak.dedup import FrameDeduplicator
+from palmspeak.prediction_cache import PredictionCache
+from palmspeak.roi import (FULL_FRAME, ROI_HEADER, parse_region, split_frame, hand_region,
+                           intersect, crop_region, limit_resolution, hands_to_full_frame, region_area)
+from palmspeak.metrics import PipelineMetrics
+from palmspeak.admission import AdmissionController, Overloaded
+from palmspeak.logs import LogSampler
+from palmspeak.capture import open_capture
+from palmspeak.workers import VisionWorkerPool, WorkersUnavailable, DEFAULT_FRAME_TIMEOUT
+from palmspeak.serving import ApiServer, default_server_mode, supports_websockets
+
+MODEL_PATH = 'alphabet_keras/asl_alphabet_model.h5'
+# Most hands accepted in one /predict-landmarks request
+MAX_LANDMARK_HANDS = 16
+
+ASL_CLASSES = [
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
+    'del', 'nothing', 'space'
+]
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+class RecognitionEngine:
+    """ASL recognition service: model, vision pipeline, smoothing and HTTP API.
+    
+    Settings come from the PALMSPEAK_* environment variables; any keyword
+    argument that is not None overrides the matching variable.
+    """
+    
+    def __init__(self, host=None, port=None, server_mode=None, server_threads=None,
+                 num_workers=None, inference_backend=None, stream_port=None, logger=None):
+        self.logger = logger or logging.getLogger('palmspeak-control')
+        
+        # API Server settings
+        self.flask_app = None
+        self.api_server = None
+        self.stream_server = None
+        self.host = host or os.environ.get('PALMSPEAK_HOST', '0.0.0.0')
+        self.port = port if port is not None else int(os.environ.get('PORT', 5000))
+        self.server_mode = server_mode or os.environ.get('PALMSPEAK_SERVER', default_server_mode())
+        # WebSocket listener for /stream next to the main server (0: none)
+        self.stream_port = (stream_port if stream_port is not None
+                            else int(os.environ.get('PALMSPEAK_STREAM_PORT', 5001)))
+        self.server_threads = server_threads or int(os.environ.get('PALMSPEAK_SERVER_THREADS', 8))
+        self.connection_limit = int(os.environ.get('PALMSPEAK_CONNECTION_LIMIT', 100))
+        self.keepalive_timeout = float(os.environ.get('PALMSPEAK_KEEPALIVE_TIMEOUT', 30))
+        self.max_request_mb = float(os.environ.get('PALMSPEAK_MAX_REQUEST_MB', 8))
+        
+        # Model variables
+        self.model_path = resource_path(MODEL_PATH)
+        self.cache_dir = default_cache_dir()
+        self.model_loaded = False  # Ready: loaded and warmed up
+        self.load_error = None
+        self.inference = None
+        self.inference_backend_name = inference_backend or os.environ.get('PALMSPEAK_INFERENCE_BACKEND', DEFAULT_BACKEND)
+        # Reduced-precision classifier variant (see variants.py)
+        self.model_precision = os.environ.get('PALMSPEAK_MODEL_PRECISION', DEFAULT_PRECISION)
+        self.calibration_path = os.environ.get('PALMSPEAK_CALIBRATION_DATA') or None
+        self.batcher = None
+        self.batch_window_ms = float(os.environ.get('PALMSPEAK_BATCH_WINDOW_MS', 2))
+        self.max_batch_size = int(os.environ.get('PALMSPEAK_MAX_BATCH_SIZE', 32))
+        self.worker_pool = None
+        self.num_workers = num_workers if num_workers is not None else int(os.environ.get('PALMSPEAK_WORKERS', 0))
+        self.ASL_CLASSES = ASL_CLASSES
+        self.vote_policy = os.environ.get('PALMSPEAK_VOTE_POLICY', 'majority')
+        self.CONFIDENCE_THRESHOLD = 0.3
+        self.BINARY_IMAGE_TYPES = ('image/jpeg', 'image/png', 'application/octet-stream')
+        self.BINARY_LANDMARK_TYPES = ('application/octet-stream',)
+        
+        # MediaPipe is imported on first use (see create_hands)
+        self.mp_hands = None
+        # Hands detected per frame; all of them go through the model in one batch
+        self.max_hands = max(1, int(os.environ.get('PALMSPEAK_MAX_HANDS', 1)))
+        # Preprocessing buffers, one set per frame in flight
+        self.frame_buffers = BufferPool(lambda: FrameBuffers(self.max_hands))
+        self.hand_detectors = HandDetectors(
+            self.create_hands,
+            pool_size=int(os.environ.get('PALMSPEAK_HANDS_POOL_SIZE', 4)),
+            max_trackers=int(os.environ.get('PALMSPEAK_MAX_TRACKERS', 8)))
+        
+        # Crop to the session's last hand region before MediaPipe (ROI size 0 disables)
+        self.roi_size = int(os.environ.get('PALMSPEAK_ROI_SIZE', 256))
+        self.roi_margin = float(os.environ.get('PALMSPEAK_ROI_MARGIN', 2.0))
+        self.max_frame_size = int(os.environ.get('PALMSPEAK_MAX_FRAME_SIZE', 640))
+        
+        # Reuse the previous result for near-duplicate frames (threshold 0 disables)
+        dedup_threshold = float(os.environ.get('PALMSPEAK_DEDUP_THRESHOLD', 3.0))
+        self.dedup = FrameDeduplicator(
+            threshold=dedup_threshold,
+            max_reuse=int(os.environ.get('PALMSPEAK_DEDUP_MAX_REUSE', 5)),
+            max_age=float(os.environ.get('PALMSPEAK_DEDUP_MAX_AGE', 2.0))) if dedup_threshold > 0 else None
+        
+        # Reuse classifier outputs for landmark rows in the same grid cell (grid 0 disables)
+        cache_grid = float(os.environ.get('PALMSPEAK_PREDICTION_CACHE_GRID', 0))
+        self.prediction_cache = PredictionCache(
+            grid=cache_grid,
+            max_entries=int(os.environ.get('PALMSPEAK_PREDICTION_CACHE_SIZE', 1024)),
+            ttl=float(os.environ.get('PALMSPEAK_PREDICTION_CACHE_TTL', 10))) if cache_grid > 0 else None
+        
+        # Cap concurrent frames and shed the rest under overload (max in flight 0 disables)
+        max_in_flight = int(os.environ.get('PALMSPEAK_MAX_IN_FLIGHT', max(4, self.num_workers)))
+        self.admission = AdmissionController(
+            max_in_flight=max_in_flight,
+            max_pending=int(os.environ.get('PALMSPEAK_MAX_PENDING', 16)),
+            max_wait=float(os.environ.get('PALMSPEAK_ADMISSION_WAIT_MS', 250)) / 1000) if max_in_flight > 0 else None
+        
+        # Per-stage latency histograms and outcome counters (/metrics)
+        self.metrics = PipelineMetrics()
+        # Per-frame prediction lines are logged for one frame in N (0 disables them)
+        self.log_prediction = LogSampler(int(os.environ.get('PALMSPEAK_LOG_EVERY', 100)))
+        # Opt-in traffic capture for replay (PALMSPEAK_CAPTURE_FILE, see capture.py)
+        self.capture = open_capture(self.logger, ASL_CLASSES)
+        
+        # Per-client smoothing state
+        self.sessions = SessionTable(
+            max_sessions=int(os.environ.get('PALMSPEAK_MAX_SESSIONS', 256)),
+            ttl=float(os.environ.get('PALMSPEAK_SESSION_TTL', 600)),
+            buffer_size=10,
+            policy=self.create_vote_policy(),
+            on_evict=self.hand_detectors.release)
+    
+    def load_model(self):
+        """Load and warm up the model and start the inference machinery; returns a short status string.
+        
+        MediaPipe is imported and warmed up on a second thread while the
+        model loads. Raises FileNotFoundError if the model file is missing;
+        other loading errors propagate as-is (and are reported by /health).
+        """
+        try:
+            return self._load_model()
+        except Exception as e:
+            self.load_error = str(e)
+            raise
+    
+    def _load_model(self):
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Model file not found: {self.model_path}")
+        
+        started = time.perf_counter()
+        hands_warm_up = threading.Thread(target=self.warm_up_hands, name='palmspeak-warm-up', daemon=True)
+        hands_warm_up.start()
+        
+        self.logger.info("Loading ASL model...")
+        self.inference, from_cache = load_inference(self.model_path, self.inference_backend_name,
+                                                    self.cache_dir, self.logger,
+                                                    precision=self.model_precision,
+                                                    calibration_path=self.calibration_path)
+        # The first call allocates and primes the backend; keep it off the first request
+        self.inference.predict(np.zeros((1, self.inference.input_dim), dtype=np.float32))
+        if self.prediction_cache is not None:
+            # Outputs cached from a previously loaded model are dropped
+            self.prediction_cache.set_model(self.inference)
+        if self.batch_window_ms > 0:
+            self.batcher = MicroBatcher(self.inference.predict,
+                                        max_batch_size=self.max_batch_size,
+                                        max_wait=self.batch_window_ms / 1000.0)
+            self.logger.info(f"Micro-batching enabled ({self.batch_window_ms:g} ms window, "
+                             f"max {self.max_batch_size} rows)")
+        if self.num_workers > 0:
+            self.start_worker_pool(self.model_path)
+        hands_warm_up.join()
+        self.model_loaded = True
+        source = "cached artifact" if from_cache else "converted from .h5"
+        self.logger.info(f"Model ready in {time.perf_counter() - started:.2f}s ({source}). "
+                         f"Input size: {self.inference.input_dim}")
+        if self.inference.precision != DEFAULT_PRECISION:
+            return f"Loaded ({self.inference.name}, {self.inference.precision})"
+        return f"Loaded ({self.inference.name})"
+    
+    def warm_up_hands(self):
+        """Import MediaPipe and run one blank frame so the first request skips graph setup"""
+        try:
+            with self.hand_detectors.lease() as hands:
+                process_hands(hands, blank_frame())
+        except Exception as e:
+            self.logger.warning(f"MediaPipe warm-up failed: {str(e)}")
+    
+    def start_worker_pool(self, model_path):
+        """Start the vision worker processes, staying in-process if they fail"""
+        self.logger.info(f"Starting {self.num_workers} vision worker processes...")
+        pool = VisionWorkerPool(self.num_workers, model_path, self.inference.name,
+                                cache_dir=self.cache_dir, max_hands=self.max_hands,
+                                with_landmarks=self.capture_landmarks,
+                                precision=self.inference.precision,
+                                calibration_path=self.calibration_path, logger=self.logger,
+                                frame_timeout=float(os.environ.get('PALMSPEAK_WORKER_TIMEOUT',
+                                                                   DEFAULT_FRAME_TIMEOUT)))
+        try:
+            pool.start()
+            self.worker_pool = pool
+        except Exception as e:
+            self.logger.error(f"Vision workers failed to start, processing in-process: {str(e)}")
+    
+    @property
+    def capture_landmarks(self):
+        """Frame results keep their landmarks when the capture records landmarks"""
+        return self.capture is not None and self.capture.with_landmarks
+    
+    @property
+    def server_running(self):
+        return self.api_server is not None and self.api_server.running
+    
+    def start_server(self, on_exit=None):
+        """Create the Flask app and serve it on a background thread.
+        
+        The server may start before load_model finishes: /health reports it
+        live but not ready, and prediction routes answer 503 until then.
+        The port is bound before returning, so bind errors raise here.
+        on_exit(error) is called from the server thread when serving ends.
+        """
+        # Create Flask app
+        self.flask_app = self.create_flask_app()
+        
+        # Bind the port now so errors show up here, then serve in a separate thread
+        self.logger.info(f"Starting API server on port {self.port} ({self.server_mode})")
+        self.api_server = ApiServer(
+            self.flask_app, host=self.host, port=self.port,
+            mode=self.server_mode,
+            threads=self.server_threads,
+            connection_limit=self.connection_limit,
+            keepalive_timeout=self.keepalive_timeout,
+            max_request_size=int(self.max_request_mb * 1024 * 1024),
+            logger=self.logger)
+        self.api_server.start(on_exit=on_exit)
+        self.logger.info(f"API server started successfully on port {self.port}")
+        self.start_stream_server()
+    
+    def start_stream_server(self):
+        """Serve /stream on its own Werkzeug listener; streaming problems never stop the API"""
+        if Sock is None:
+            self.logger.warning("WebSocket streaming is off: flask-sock is not installed, clients will use HTTP")
+            return
+        if not self.stream_port:
+            if not supports_websockets(self.server_mode):
+                self.logger.warning(f"WebSocket streaming is off: PALMSPEAK_STREAM_PORT is 0 and "
+                                    f"{self.server_mode} cannot serve /stream, clients will use HTTP")
+            return
+        server = ApiServer(
+            self.create_stream_app(), host=self.host, port=self.stream_port, mode='werkzeug',
+            keepalive_timeout=self.keepalive_timeout,
+            max_request_size=int(self.max_request_mb * 1024 * 1024),
+            logger=self.logger)
+        try:
+            server.start()
+        except OSError as e:
+            self.logger.warning(f"WebSocket streaming is off: cannot listen on port {self.stream_port} "
+                                f"({str(e)}), clients will use HTTP")
+            return
+        self.stream_server = server
+        self.logger.info(f"WebSocket streaming on port {self.stream_port} (/stream)")
+    
+    @property
+    def streaming_port(self):
+        """Port clients should open /stream on, or None when streaming is off"""
+        if self.stream_server is not None:
+            return self.stream_port
+        if Sock is not None and self.api_server is not None and supports_websockets(self.server_mode):
+            return self.port
+        return None
+    
+    def stop_server(self):
+        """Stop the API server, let in-flight requests finish and release the port"""
+        server, self.api_server = self.api_server, None
+        if server is not None:
+            server.stop()
+            self.logger.info(f"API server stopped, port {self.port} released")
+        stream_server, self.stream_server = self.stream_server, None
+        if stream_server is not None:
+            stream_server.stop()
+            self.logger.info(f"Streaming server stopped, port {self.stream_port} released")
+    
+    def shutdown(self):
+        """Stop the server and release MediaPipe, worker and batching resources"""
+        self.stop_server()
+        self.sessions.clear()
+        self.hand_detectors.close()
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+        if self.batcher is not None:
+            self.batcher.stop()
+        if self.capture is not None:
+            self.capture.close()
+    
+    def create_stream_app(self):
+        """Flask app serving only /stream, for the WebSocket listener"""
+        app = Flask(__name__)
+        self.add_stream_route(app)
+        return app
+    
+    def add_stream_route(self, app):
+        # Pings keep idle streams alive through the server's keep-alive timeout
+        app.config['SOCK_SERVER_OPTIONS'] = {'ping_interval': 25}
+        sock = Sock(app)
+        
+        @sock.route('/stream')
+        def stream(ws):
+            self.handle_stream(ws, request)
+    
+    def create_flask_app(self):
+        """Create and configure Flask app"""
+        app = Flask(__name__)
+        CORS(app, resources={r"/*": {"origins": "*"}})
+        
+        @app.before_request
+        def limit_request_size():
+            # Reject oversized bodies before reading them (waitress also enforces this)
+            limit = app.config.get('MAX_CONTENT_LENGTH')
+            if limit and request.content_length and request.content_length > limit:
+                return jsonify({'error': 'Request too large'}), 413
+        
+        @app.route('/predict', methods=['POST'])
+        def predict():
+            return self.handle_predict(request)
+        
+        @app.route('/predict-landmarks', methods=['POST'])
+        def predict_landmarks():
+            return self.handle_predict_landmarks(request)
+        
+        @app.route('/clear-buffer', methods=['POST'])
+        def clear_buffer():
+            session_id = get_session_id(request)
+            session = self.sessions.peek(session_id)
+            if session is not None:
+                session.clear()
+            return jsonify({
+                'status': 'success',
+                'message': 'Prediction buffer cleared',
+                'session_id': session_id
+            })
+        
+        if Sock is not None and supports_websockets(self.server_mode):
+            self.add_stream_route(app)
+        
+        @app.route('/health', methods=['GET'])
+        def health_check():
+            session = self.sessions.peek(get_session_id(request))
+            return jsonify({
+                'status': self.readiness_status(),
+                'live': True,
+                'ready': self.model_loaded,
+                'model_loaded': self.model_loaded,
+                'buffer_size': len(session.prediction_buffer) if session else 0,
+                'sessions': len(self.sessions),
+                'stream_port': self.streaming_port,
+                'hand_trackers': self.hand_detectors.active_trackers,
+                'workers': len(self.worker_pool) if self.worker_pool else 0,
+                'batching': self.batcher.stats.snapshot() if self.batcher else None,
+                'admission': self.admission.snapshot() if self.admission else None,
+                'capture': self.capture.snapshot() if self.capture else None,
+                'prediction_cache': self.prediction_cache.snapshot() if self.prediction_cache else None
+            })
+        
+        @app.route('/metrics', methods=['GET'])
+        def metrics():
+            return self.metrics.render(self.metric_values()), 200, {
+                'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        
+        @app.route('/health/live', methods=['GET'])
+        def liveness_check():
+            return jsonify({'live': True})
+        
+        @app.route('/health/ready', methods=['GET'])
+        def readiness_check():
+            if not self.model_loaded:
+                return self.not_ready_response()
+            return jsonify({'ready': True, 'status': self.readiness_status()})
+        
+        return app
+    
+    def metric_values(self):
+        """Engine state exported next to the pipeline histograms at /metrics"""
+        values = {
+            'ready': ('gauge', "1 once the model is loaded and warmed up", int(self.model_loaded)),
+            'sessions': ('gauge', "Client sessions with smoothing state", len(self.sessions)),
+            'sessions_evicted_total': ('counter', "Sessions evicted by LRU/TTL", self.sessions.evicted),
+            'hand_trackers': ('gauge', "Sessions with a dedicated MediaPipe tracker",
+                              self.hand_detectors.active_trackers),
+            'workers': ('gauge', "Running vision worker processes",
+                        len(self.worker_pool) if self.worker_pool else 0),
+        }
+        if self.admission is not None:
+            values['in_flight'] = ('gauge', "Frames being processed", self.admission.in_flight)
+            values['queue_depth'] = ('gauge', "Frames waiting for an in-flight slot", self.admission.pending)
+        if self.batcher is not None:
+            stats = self.batcher.stats.snapshot()
+            values['batches_total'] = ('counter', "Micro-batched model calls", stats['batches'])
+            values['batch_rows_total'] = ('counter', "Rows run through micro-batched model calls", stats['rows'])
+        if self.prediction_cache is not None:
+            stats = self.prediction_cache.snapshot()
+            values['prediction_cache_hits_total'] = ('counter', "Hand rows answered from the prediction cache",
+                                                     stats['hits'])
+            values['prediction_cache_misses_total'] = ('counter', "Hand rows that ran the classifier",
+                                                       stats['misses'])
+            values['prediction_cache_evictions_total'] = ('counter', "Prediction cache entries evicted (LRU)",
+                                                          stats['evictions'])
+            values['prediction_cache_entries'] = ('gauge', "Entries in the prediction cache", stats['entries'])
+        return values
+    
+    def readiness_status(self):
+        if self.model_loaded:
+            return 'healthy'
+        return 'unhealthy' if self.load_error else 'starting'
+    
+    def not_ready_response(self):
+        """503 while the model is still loading (with Retry-After), 500 if loading failed"""
+        if self.load_error:
+            return jsonify({'error': 'Model not loaded', 'ready': False,
+                            'status': self.readiness_status()}), 500
+        response = jsonify({'error': 'Model is loading', 'ready': False,
+                            'status': self.readiness_status()})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    
+    def admit(self, session_id):
+        """Wait for an in-flight slot (raises Overloaded when the frame is shed)"""
+        if self.admission is None:
+            return nullcontext()
+        try:
+            with self.metrics.time('queue'):
+                # Frames of the shared default session come from different clients
+                return self.admission.admit(session_id if session_id != DEFAULT_SESSION else None)
+        except Overloaded as e:
+            self.metrics.count('shed_total', e.reason)
+            raise
+    
+    def overloaded_response(self, error):
+        """Fast 429 (superseded by the session's newer frame) or 503 (over capacity) with Retry-After"""
+        message = 'Superseded by a newer frame' if error.reason == 'superseded' else 'Server busy'
+        response = jsonify({'error': message, 'shed': error.reason,
+                            'retry_after_ms': round(error.retry_after * 1000)})
+        # Retry-After only takes whole seconds; retry_after_ms has the actual estimate
+        response.headers['Retry-After'] = str(max(1, round(error.retry_after)))
+        return response, error.status
+    
+    def handle_predict(self, request):
+        """Handle prediction requests"""
+        if not self.model_loaded:
+            return self.not_ready_response()
+        
+        session_id = get_session_id(request)
+        try:
+            slot = self.admit(session_id)
+        except Overloaded as e:
+            return self.overloaded_response(e)
+        
+        with slot, self.metrics.time_request('predict'):
+            try:
+                image_bytes = self.read_request_image(request)
+                if image_bytes is None or len(image_bytes) == 0:
+                    self.metrics.count('errors_total', 'predict')
+                    return jsonify({'error': 'No image data'}), 400
+                
+                session = self.sessions.get(session_id)
+                region = parse_region(request.headers.get(ROI_HEADER)) or FULL_FRAME
+                return jsonify(self.predict_frame(image_bytes, session, region))
+                
+            except ValueError as e:
+                # Unreadable request body or image
+                self.metrics.count('errors_total', 'predict')
+                return jsonify({'error': str(e)}), 400
+            except WorkersUnavailable as e:
+                self.metrics.count('errors_total', 'predict')
+                self.logger.warning(f"Prediction error: {str(e)}")
+                response = jsonify({'error': str(e)})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            except Exception as e:
+                self.metrics.count('errors_total', 'predict')
+                self.logger.error(f"Prediction error: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+    
+    def predict_frame(self, image_bytes, session, region=FULL_FRAME):
+        """Run one encoded frame through the pipeline and the session's smoothing.
+        
+        `region` is the part of the client's full capture the frame covers.
+        """
+        arrived = time.time()
+        # Near-duplicate of the session's last computed frame: reuse its result.
+        # Only for identified sessions; the shared default session mixes clients.
+        thumbnail = None
+        reused = False
+        if self.dedup is not None and session.continuous:
+            with self.metrics.time('dedup'):
+                thumbnail = frame_thumbnail(image_bytes)
+                reused, hands = self.dedup.lookup(session, thumbnail)
+            self.metrics.count('dedup_total', 'reused' if reused else 'computed')
+        
+        if reused:
+            response = self.apply_hands(hands, session)
+            response['reused'] = True
+        else:
+            hands = self.frame_predictions(image_bytes, session, region)
+            if thumbnail is not None:
+                self.dedup.store(session, thumbnail, hands)
+            response = self.apply_hands(hands, session)
+        if self.capture is not None:
+            self.capture.record_frame(arrived, session.session_id, image_bytes, region, hands, response)
+        return self.add_roi(response, session)
+    
+    def frame_predictions(self, image_bytes, session, region=FULL_FRAME):
+        """Per-hand results for one encoded frame (see hand_results); empty when no hand is found"""
+        # Hand the frame to a worker process when the process pool is running
+        if self.worker_pool is not None and self.worker_pool.running:
+            with self.metrics.time('worker'):
+                return self.worker_pool.process(image_bytes, region)
+        
+        # Preprocess into buffers reused across frames instead of fresh arrays
+        with self.frame_buffers.lease() as buffers:
+            # Decode and process image
+            with self.metrics.time('decode'):
+                img = decode_image(image_bytes)
+            
+            # Extract hand landmarks
+            detected = self.locate_hands(img, session, region, buffers)
+            
+            return self.hands_predictions(detected, buffers)
+    
+    def roi_active(self, session):
+        """Hand-region cropping runs in-process for identified single-hand sessions without a tracker.
+        
+        With several hands a crop around the tracked ones would hide a new hand entering the frame.
+        A video-mode tracker already follows the hand region itself and needs full frames of a
+        steady geometry, so cropping only serves sessions beyond PALMSPEAK_MAX_TRACKERS.
+        """
+        return (self.roi_size > 0 and self.max_hands == 1 and session.continuous
+                and not (self.worker_pool is not None and self.worker_pool.running)
+                and not self.hand_detectors.tracks(session))
+    
+    def locate_hands(self, image, session, image_region=FULL_FRAME, buffers=None):
+        """Detected hands in full-capture coordinates, trying the session's hand region first.
+        
+        On a hit the region is re-centred on the hand; when the crop misses,
+        the whole frame is searched and the region is reset. Crops (ours or the
+        client's) move with the hand, so they go to a pooled static detector;
+        the session's video tracker only sees full frames, whose geometry it
+        can follow from one frame to the next (see roi_active).
+        """
+        in_place = buffers is not None
+        tracked = session if image_region == FULL_FRAME else None
+        if not self.roi_active(session):
+            return hands_to_full_frame(self.extract_hands(image, tracked, buffers), image_region, in_place)
+        
+        roi = session.hand_roi
+        region = intersect(roi, image_region) if roi is not None else None
+        # Only crop when it removes a good share of the pixels (clients may already upload the region)
+        if region is not None and region_area(region) < 0.8 * region_area(image_region):
+            with self.metrics.time('roi'):
+                crop, region = crop_region(image, region, image_region, self.roi_size, buffers)
+            detected = self.extract_hands(crop, None, buffers)
+            if detected:
+                detected = hands_to_full_frame(detected, region, in_place)
+                session.hand_roi = hand_region(detected[0][0], self.roi_margin)
+                return detected
+        
+        with self.metrics.time('roi'):
+            image = limit_resolution(image, self.max_frame_size, buffers)
+        detected = hands_to_full_frame(self.extract_hands(image, tracked, buffers), image_region, in_place)
+        session.hand_roi = hand_region(detected[0][0], self.roi_margin) if detected else None
+        return detected
+    
+    def add_roi(self, response, session):
+        """Tell the client which part of its capture to upload next (null: the whole frame)"""
+        if session.continuous:
+            roi = session.hand_roi if self.roi_active(session) else None
+            response['roi'] = [round(v, 4) for v in roi] if roi is not None else None
+        return response
+    
+    def handle_stream(self, ws, request):
+        """Serve continuous recognition over a WebSocket connection.
+        
+        Binary messages are encoded frames; text messages are JSON control
+        messages ({"type": "clear"}) or {"landmarks": [...]} frames. Only the
+        newest queued frame is processed, older ones are dropped as stale.
+        """
+        session_id = request.args.get('session') or f"stream-{uuid.uuid4().hex}"
+        self.logger.info(f"Stream opened (session {session_id})")
+        dropped = 0
+        try:
+            while True:
+                session = self.sessions.get(session_id)
+                message, skipped = self.receive_latest_frame(ws, session)
+                dropped += skipped
+                if not self.model_loaded:
+                    ws.send(json.dumps({'error': 'Model is loading' if not self.load_error
+                                        else 'Model not loaded'}))
+                    continue
+                
+                try:
+                    with self.admit(session_id), self.metrics.time_request('stream'):
+                        if isinstance(message, str):
+                            with self.metrics.time('parse'):
+                                data = json.loads(message)
+                                landmarks = self.parse_landmarks(data['landmarks'])
+                            response = self.classify_landmarks(landmarks, session, data.get('handedness'))
+                        else:
+                            region, frame = split_frame(message)
+                            response = self.predict_frame(frame, session, region or FULL_FRAME)
+                except Overloaded as e:
+                    response = {'error': 'Server busy', 'shed': e.reason,
+                                'retry_after_ms': round(e.retry_after * 1000)}
+                except Exception as e:
+                    self.metrics.count('errors_total', 'stream')
+                    self.logger.error(f"Stream prediction error: {str(e)}")
+                    response = {'error': str(e)}
+                
+                response['dropped'] = dropped
+                ws.send(json.dumps(response))
+        except ConnectionClosed:
+            pass
+        finally:
+            self.sessions.remove(session_id)
+            self.logger.info(f"Stream closed (session {session_id}, {dropped} stale frames dropped)")
+    
+    def receive_latest_frame(self, ws, session):
+        """Block for the next frame, then skip ahead to the newest one already queued.
+        
+        Returns (message, number of frames skipped). Control messages are
+        applied as they are read and never dropped.
+        """
+        frame = None
+        skipped = 0
+        message = ws.receive()
+        while message is not None:
+            if not (isinstance(message, str) and self.apply_stream_control(message, session)):
+                if frame is not None:
+                    skipped += 1
+                frame = message
+            # Block again only if nothing but control messages has arrived
+            message = ws.receive() if frame is None else ws.receive(timeout=0)
+        return frame, skipped
+    
+    def apply_stream_control(self, message, session):
+        """Handle a JSON control message; returns False if it is a landmark frame instead"""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return True  # Ignore malformed text
+        if not isinstance(data, dict) or 'landmarks' in data:
+            return False
+        if data.get('type') == 'clear':
+            session.clear()
+        return True
+    
+    def handle_predict_landmarks(self, request):
+        """Handle prediction requests that carry pre-computed hand landmarks"""
+        if not self.model_loaded:
+            return self.not_ready_response()
+        
+        session_id = get_session_id(request)
+        try:
+            slot = self.admit(session_id)
+        except Overloaded as e:
+            return self.overloaded_response(e)
+        
+        with slot, self.metrics.time_request('predict-landmarks'):
+            try:
+                landmarks, handedness = self.read_request_landmarks(request)
+                session = self.sessions.get(session_id)
+                return jsonify(self.classify_landmarks(landmarks, session, handedness))
+                
+            except ValueError as e:
+                self.metrics.count('errors_total', 'predict-landmarks')
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                self.metrics.count('errors_total', 'predict-landmarks')
+                self.logger.error(f"Landmark prediction error: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+    
+    def read_request_landmarks(self, request):
+        """Return (N x 21 x 3 landmark array or None, handedness list or None) from a JSON or packed float32 request.
+        
+        An empty body, or a null/empty 'landmarks' field, means no hand was detected.
+        """
+        if request.mimetype in self.BINARY_LANDMARK_TYPES:
+            with self.metrics.time('read'):
+                body = self.read_stream(request.stream, request.content_length)
+            if len(body) % 4:
+                raise ValueError("Binary landmark body must be packed little-endian float32 values")
+            return self.parse_landmarks(np.frombuffer(body, dtype='<f4')), None
+        
+        with self.metrics.time('parse'):
+            data = request.get_json(silent=True)
+            if not data or 'landmarks' not in data:
+                raise ValueError("No landmark data")
+            return self.parse_landmarks(data['landmarks']), data.get('handedness')
+    
+    def parse_landmarks(self, values):
+        """Landmarks of one hand (21x3 / 63 values) or several (N x 21 x 3) as an N x 21 x 3 array; None if empty"""
+        if values is None:
+            return None
+        if not isinstance(values, (list, tuple, np.ndarray)):
+            raise ValueError(f"Expected landmarks as an array of numbers, got {type(values).__name__}")
+        if len(values) == 0:
+            return None
+        try:
+            landmarks = np.asarray(values, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError("Expected landmarks as a (nested) array of numbers") from None
+        if not np.isfinite(landmarks).all():
+            raise ValueError("Landmarks must be finite numbers")
+        if landmarks.size % 63 or landmarks.size // 63 > MAX_LANDMARK_HANDS:
+            raise ValueError(f"Expected 21x3 landmarks for 1 to {MAX_LANDMARK_HANDS} hands, "
+                             f"got {landmarks.size} values")
+        landmarks = landmarks.reshape(-1, 21, 3)
+        # Rows are normalized by their largest value, as in training
+        if (landmarks.reshape(-1, 63).max(axis=1) <= 0).any():
+            raise ValueError("Each hand needs at least one positive coordinate (normalized landmarks)")
+        return landmarks
+    
+    def classify_landmarks(self, landmarks, session, handedness=None):
+        """Run the classifier and the session's smoothing on client-detected hands (None for no hand)"""
+        arrived = time.time()
+        detected = []
+        if landmarks is not None:
+            labels = handedness if isinstance(handedness, list) else []
+            detected = [(hand, labels[i] if i < len(labels) else None, None) for i, hand in enumerate(landmarks)]
+        response = self.apply_hands(self.hands_predictions(detected), session, len(detected) > 1)
+        if self.capture is not None:
+            self.capture.record_landmarks(arrived, session.session_id, landmarks, response)
+        return response
+    
+    def hands_predictions(self, detected, buffers=None):
+        """Per-hand results (see hand_results) for detected hands, with one model call for all of them"""
+        if not detected:
+            return []
+        
+        # Normalize each hand separately and stack them into one batch
+        with self.metrics.time('normalize'):
+            inputs = normalize_hands([landmarks for landmarks, _, _ in detected], buffers)
+        with self.metrics.time('model'):
+            if self.prediction_cache is not None:
+                predictions = self.prediction_cache.predict(inputs, self.run_model)
+            else:
+                predictions = self.run_model(inputs)
+        return hand_results(detected, predictions, self.capture_landmarks)
+    
+    def apply_hands(self, hands, session, list_hands=False):
+        """Smooth the primary (largest) hand into the session; list every hand when multi-hand is on"""
+        response = self.apply_prediction(hands[0]['probabilities'] if hands else None, session)
+        if self.max_hands > 1 or list_hands:
+            response['hands'] = [self.describe_hand(hand) for hand in hands]
+        return response
+    
+    def describe_hand(self, hand):
+        """One hand's unsmoothed letter, handedness and bounding box for the response"""
+        probabilities = hand['probabilities']
+        index = int(np.argmax(probabilities))
+        return {
+            'letter': self.ASL_CLASSES[index],
+            'confidence': float(probabilities[index]),
+            'handedness': hand['handedness'],
+            'handedness_score': hand['score'],
+            'bbox': [round(v, 4) for v in hand['bbox']],
+        }
+    
+    def apply_prediction(self, predictions, session):
+        """Smooth one frame's class probabilities (or None for no hand) into the session's buffer"""
+        if predictions is None:
+            self.metrics.count('frames_total', 'no_hand')
+            with self.metrics.time('smoothing'), session.lock:
+                session.prediction_buffer.append(('nothing', 1.0))
+                most_common = self.get_most_common_prediction(session.prediction_buffer)
+                buffer_size = len(session.prediction_buffer)
+            return {
+                'letter': most_common[0],
+                'confidence': most_common[1],
+                'message': 'No hand detected',
+                'buffer_size': buffer_size
+            }
+        
+        predicted_class_index = np.argmax(predictions)
+        predicted_class = self.ASL_CLASSES[predicted_class_index]
+        confidence = float(np.max(predictions))
+        
+        accepted = confidence > self.CONFIDENCE_THRESHOLD
+        self.metrics.count('frames_total', 'accepted' if accepted else 'below_threshold')
+        
+        with self.metrics.time('smoothing'), session.lock:
+            # Add to prediction buffer if confidence is above threshold
+            if accepted:
+                session.prediction_buffer.append((predicted_class, confidence))
+            
+            # Get most common prediction from buffer
+            most_common = self.get_most_common_prediction(session.prediction_buffer)
+            buffer_size = len(session.prediction_buffer)
+        
+        if self.log_prediction():
+            self.logger.info(f"Prediction: {predicted_class} ({confidence:.2%}) -> {most_common[0]}")
+        
+        return {
+            'letter': most_common[0],
+            'raw_letter': predicted_class,
+            'confidence': most_common[1],
+            'raw_confidence': confidence,
+            'buffer_size': buffer_size
+        }
+    
+    def read_request_image(self, request):
+        """Return the encoded image bytes from a binary, multipart or JSON request"""
+        mimetype = request.mimetype
+        
+        # Raw JPEG/PNG body - read straight from the request stream
+        if mimetype in self.BINARY_IMAGE_TYPES:
+            with self.metrics.time('read'):
+                return self.read_stream(request.stream, request.content_length)
+        
+        # Multipart upload - use the 'image' field, or the first file sent
+        if mimetype == 'multipart/form-data':
+            upload = request.files.get('image')
+            if upload is None and request.files:
+                upload = next(iter(request.files.values()))
+            if upload is None:
+                return None
+            with self.metrics.time('read'):
+                return self.read_stream(upload.stream, upload.content_length)
+        
+        # Legacy JSON body with a base64 data URL
+        with self.metrics.time('parse'):
+            data = request.get_json(silent=True)
+        if not isinstance(data, dict) or data.get('image') is None:
+            return None
+        image = data['image']
+        if not isinstance(image, str):
+            raise ValueError(f"Expected 'image' as a base64 string or data URL, got {type(image).__name__}")
+        with self.metrics.time('base64'):
+            image_data = image.split(',', 1)[1] if ',' in image else image
+            try:
+                return base64.b64decode(image_data)
+            except ValueError:  # binascii.Error
+                raise ValueError("'image' is not valid base64") from None
+    
+    def read_stream(self, stream, length):
+        """Read a body of known length into a single buffer without intermediate copies"""
+        if not length or not hasattr(stream, 'readinto'):
+            return stream.read()
+        
+        buffer = bytearray(length)
+        view = memoryview(buffer)
+        received = 0
+        while received < length:
+            count = stream.readinto(view[received:])
+            if not count:
+                break
+            received += count
+        return view[:received]
+    
+    def create_hands(self, static_image_mode):
+        """Create a MediaPipe Hands instance (video-mode trackers when not static)"""
+        if self.mp_hands is None:
+            import mediapipe as mp
+            self.mp_hands = mp.solutions.hands
+        return self.mp_hands.Hands(static_image_mode=static_image_mode, max_num_hands=self.max_hands)
+    
+    def extract_hands(self, image, session=None, buffers=None):
+        """Detect hands with MediaPipe; returns a list of (21x3 landmarks, handedness, score).
+        
+        With `buffers` (a FrameBuffers), the RGB frame and landmarks are views into them.
+        """
+        try:
+            with self.metrics.time('convert'):
+                image_rgb = to_rgb(image, buffers)
+            with self.hand_detectors.lease(session) as hands, self.metrics.time('hands'):
+                return detect_hands(hands, image_rgb, buffers)
+        except Exception as e:
+            self.logger.error(f"Landmark extraction error: {str(e)}")
+            return []
+    
+    def extract_hand_landmarks(self, image, session=None):
+        """Flat landmarks of the primary (largest) detected hand, or None"""
+        detected = self.extract_hands(image, session)
+        return primary_hand(detected)[0].reshape(-1) if detected else None
+    
+    def run_model(self, inputs):
+        """Run the classifier, coalescing with concurrent requests when batching is on"""
+        if self.batcher is not None:
+            return self.batcher.predict(inputs)
+        return self.inference.predict(inputs)
+    
+    def create_vote_policy(self):
+        """Return the factory for the configured smoothing vote policy"""
+        try:
+            factory = policy_factory(self.vote_policy)
+            factory()  # Validate parameters up front
+            return factory
+        except ValueError as e:
+            self.logger.warning(f"Invalid vote policy '{self.vote_policy}', using majority: {str(e)}")
+            return MajorityVote
+    
+    def get_most_common_prediction(self, prediction_buffer):
+        """Return the smoothed prediction and its average confidence from the buffer"""
+        return prediction_buffer.most_common()
@@ -0,0 +1,116 @@
+"""
+Thread-safe access to MediaPipe Hands.
+
+A Hands graph must only be used by one thread at a time. HandDetectors leases
+detectors to request threads from two sources:
+
+- a pool of static-image detectors, which run full palm detection on every
+  frame and are shared by any request;
+- dedicated video-mode trackers for continuous sessions, which reuse the
+  previous frame's hand region and only fall back to palm detection when
+  tracking is lost.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class HandDetectors:
+    """Lease MediaPipe Hands instances to one request at a time"""
+
+    def __init__(self, create_hands, pool_size=4, max_trackers=8):
+        # create_hands(static_image_mode) -> new Hands instance
+        self.create_hands = create_hands
+        self.pool_size = max(1, pool_size)
+        self.max_trackers = max_trackers
+        self.active_trackers = 0
+        self._pool = queue.LifoQueue()
+        self._pool_created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, session=None):
+        """Yield the session's tracker if it is free, otherwise a pooled static detector"""
+        tracker = self._acquire_tracker(session)
+        if tracker is not None:
+            try:
+                yield tracker
+            finally:
+                session.tracker_lock.release()
+            return
+
+        hands = self._get_pooled()
+        try:
+            yield hands
+        finally:
+            self._pool.put(hands)
+
+    def tracks(self, session):
+        """Whether the session's frames go to its own tracker (it has one, or one is still free)"""
+        if session is None or not session.continuous or self.max_trackers <= 0 or session.tracker_closed:
+            return False
+        return session.tracker is not None or self.active_trackers < self.max_trackers
+
+    def release(self, session):
+        """Close the session's tracker once any in-flight frame has finished"""
+        with session.tracker_lock:
+            # Requests still holding an evicted session must not create a new tracker
+            session.tracker_closed = True
+            tracker, session.tracker = session.tracker, None
+        if tracker is not None:
+            tracker.close()
+            with self._lock:
+                self.active_trackers -= 1
+
+    def close(self):
+        """Close the pooled detectors"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _acquire_tracker(self, session):
+        if session is None or not session.continuous or self.max_trackers <= 0:
+            return None
+        # A second frame from the same session while one is in flight uses the pool
+        if not session.tracker_lock.acquire(blocking=False):
+            return None
+        if session.tracker is None:
+            if session.tracker_closed:
+                session.tracker_lock.release()
+                return None
+            with self._lock:
+                allowed = self.active_trackers < self.max_trackers
+                if allowed:
+                    self.active_trackers += 1
+            if not allowed:
+                session.tracker_lock.release()
+                return None
+            try:
+                session.tracker = self.create_hands(False)
+            except Exception:
+                with self._lock:
+                    self.active_trackers -= 1
+                session.tracker_lock.release()
+                raise
+        return session.tracker
+
+    def _get_pooled(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._pool_created < self.pool_size
+            if create:
+                self._pool_created += 1
+        if create:
+            try:
+                return self.create_hands(True)
+            except Exception:
+                with self._lock:
+                    self._pool_created -= 1
+                raise
+        return self._pool.get()
@@ -0,0 +1,221 @@
+"""
+Pluggable inference backends for the ASL landmark classifier.
+
+Keras `model.predict` builds a data adapter and runs callbacks on every call,
+which dominates the cost of a single 1x63 forward pass. The backends here wrap
+the loaded Keras model once and expose the same `predict(batch)` call:
+
+    keras     - plain `model.predict` (reference implementation)
+    function  - `tf.function` compiled direct call
+    tflite    - in-memory TFLite conversion run by the TFLite interpreter
+    numpy     - pure NumPy forward pass built from the Dense layer weights
+"""
+
+import threading
+import numpy as np
+
+DEFAULT_BACKEND = 'numpy'
+
+
+class InferenceBackend:
+    """Common interface: predict(batch) returns an (N, classes) float32 array"""
+    name = 'base'
+    input_dim = None
+    precision = 'float32'
+
+    def predict(self, inputs):
+        raise NotImplementedError
+
+
+class KerasBackend(InferenceBackend):
+    """Reference backend using the full Keras predict loop"""
+    name = 'keras'
+
+    def __init__(self, model):
+        self.model = model
+        self.input_dim = model.input_shape[-1]
+
+    def predict(self, inputs):
+        return np.asarray(self.model.predict(inputs, verbose=0), dtype=np.float32)
+
+
+class FunctionBackend(InferenceBackend):
+    """Call the model through a traced tf.function with a fixed input signature"""
+    name = 'function'
+
+    def __init__(self, model):
+        import tensorflow as tf
+        self._tf = tf
+        input_dim = self.input_dim = model.input_shape[-1]
+        self._call = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec([None, input_dim], tf.float32)])
+        # Trace once up front so the first request doesn't pay for it
+        self._call(tf.zeros([1, input_dim], tf.float32))
+
+    def predict(self, inputs):
+        inputs = self._tf.convert_to_tensor(np.asarray(inputs, dtype=np.float32))
+        return self._call(inputs).numpy()
+
+
+class TFLiteBackend(InferenceBackend):
+    """Convert the Keras model to TFLite once and run it with the interpreter"""
+    name = 'tflite'
+
+    def __init__(self, model=None, model_content=None, precision='float32'):
+        import tensorflow as tf
+        self.precision = precision
+        if model_content is None:
+            converter = tf.lite.TFLiteConverter.from_keras_model(model)
+            model_content = converter.convert()
+        self.model_content = model_content
+        self.interpreter = tf.lite.Interpreter(model_content=model_content)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_dim = int(self._input['shape'][-1])
+        self._batch_size = int(self._input['shape'][0])
+        # The interpreter holds mutable tensor state, so calls are serialised
+        self._lock = threading.Lock()
+
+    def predict(self, inputs):
+        inputs = np.ascontiguousarray(inputs, dtype=np.float32)
+        with self._lock:
+            if inputs.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input['index'], list(inputs.shape))
+                self.interpreter.allocate_tensors()
+                self._batch_size = inputs.shape[0]
+            self.interpreter.set_tensor(self._input['index'], inputs)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output['index']).copy()
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+def _sigmoid(x):
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+
+def _tanh(x):
+    return np.tanh(x, out=x)
+
+
+ACTIVATIONS = {
+    'linear': None,
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': _tanh,
+}
+
+# Layers that do nothing at inference time
+PASSTHROUGH_LAYERS = ('InputLayer', 'Dropout', 'Flatten')
+
+
+class NumpyBackend(InferenceBackend):
+    """Pure NumPy forward pass for Sequential stacks of Dense layers.
+
+    float32 only: NumPy has no int8 or float16 matmul that beats float32, so
+    a reduced-precision copy would only cost accuracy (see variants.py).
+    """
+    name = 'numpy'
+
+    def __init__(self, layers):
+        # layers: list of (kernel, bias, activation name)
+        self.layers = []
+        self._ops = []
+        for kernel, bias, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for numpy backend: {activation}")
+            kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+            bias = np.ascontiguousarray(bias, dtype=np.float32)
+            self.layers.append((kernel, bias, activation))
+            self._ops.append((kernel, bias, ACTIVATIONS[activation]))
+        self.input_dim = self.layers[0][0].shape[0]
+
+    @property
+    def weight_bytes(self):
+        return sum(kernel.nbytes + bias.nbytes for kernel, bias, _ in self.layers)
+
+    @classmethod
+    def from_keras(cls, model):
+        """Extract the Dense weights and activations from a loaded Keras model"""
+        layers = []
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            if layer_type in PASSTHROUGH_LAYERS:
+                continue
+            if layer_type != 'Dense':
+                raise ValueError(f"Unsupported layer for numpy backend: {layer_type}")
+            kernel, bias = layer.get_weights()
+            layers.append((kernel, bias, layer.get_config()['activation']))
+        return cls(layers)
+
+    def predict(self, inputs):
+        x = np.asarray(inputs, dtype=np.float32)
+        for kernel, bias, activation in self._ops:
+            x = x @ kernel
+            x += bias
+            if activation is not None:
+                x = activation(x)
+        return x
+
+
+BACKENDS = {
+    'keras': KerasBackend,
+    'function': FunctionBackend,
+    'tflite': TFLiteBackend,
+    'numpy': NumpyBackend.from_keras,
+}
+
+
+def create_backend(name, model):
+    """Build the named backend around a loaded Keras model"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](model)
+
+
+def check_parity(backend, reference, input_dim, samples=64, atol=1e-4, seed=0):
+    """Compare a backend against the reference on random inputs.
+
+    Returns the maximum absolute probability difference; raises ValueError
+    if it exceeds `atol` or any predicted class differs.
+    """
+    rng = np.random.default_rng(seed)
+    inputs = rng.uniform(-0.2, 1.0, size=(samples, input_dim)).astype(np.float32)
+    expected = reference.predict(inputs)
+    actual = backend.predict(inputs)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if max_diff > atol or not np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1)):
+        raise ValueError(f"{backend.name} backend differs from {reference.name} (max diff {max_diff:.2e})")
+    return max_diff
+
+
+def load_backend(name, model, logger=None):
+    """Create the configured backend, falling back to Keras if it fails parity"""
+    reference = KerasBackend(model)
+    if name == reference.name:
+        return reference
+    try:
+        backend = create_backend(name, model)
+        max_diff = check_parity(backend, reference, model.input_shape[-1])
+        if logger:
+            logger.info(f"Inference backend '{backend.name}' matches Keras (max diff {max_diff:.2e})")
+        return backend
+    except Exception as e:
+        if logger:
+            logger.warning(f"Inference backend '{name}' unavailable, using keras: {str(e)}")
+        return reference
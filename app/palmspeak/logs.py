@@ -0,0 +1,183 @@
+"""
+Bounded, low-overhead logging.
+
+Request threads must never wait on, or grow memory because of, the log
+view. The pieces here keep every part of the log path bounded:
+
+    LogSampler        per-frame messages are logged for one frame in N
+    RateLimitFilter   token bucket per call site, so an error repeated on
+                      every frame cannot flood the log
+    RingBufferHandler newest lines for the Control Centre's log view; older
+                      unread lines are dropped and counted
+    file logging      optional rotating text/JSON file written by a
+                      background thread behind a bounded queue
+"""
+
+import os
+import copy
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class LogSampler:
+    """Let one call in `every` through (0 lets none through)"""
+
+    def __init__(self, every=100):
+        self.every = every
+        self._calls = itertools.count()
+
+    def __call__(self):
+        return self.every > 0 and next(self._calls) % self.every == 0
+
+
+class RateLimitFilter(logging.Filter):
+    """Allow `burst` records per call site at once, refilled at `rate` per second.
+
+    The next record that gets through says how many were suppressed.
+    """
+
+    def __init__(self, rate=5.0, burst=20):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = 0
+        # (pathname, lineno) -> [tokens, last refill, suppressed since last pass]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep the newest `capacity` formatted lines until drained"""
+
+    def __init__(self, capacity=1000):
+        super().__init__()
+        self.lines = deque()
+        self.capacity = capacity
+        self.dropped = 0
+        self._unreported = 0
+
+    def emit(self, record):
+        # Handler.handle() holds self.lock around emit()
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.lines) >= self.capacity:
+            self.lines.popleft()
+            self.dropped += 1
+            self._unreported += 1
+        self.lines.append(line)
+
+    def drain(self):
+        """Return (lines, number of lines dropped since the last drain)"""
+        self.acquire()
+        try:
+            lines = list(self.lines)
+            self.lines.clear()
+            dropped, self._unreported = self._unreported, 0
+        finally:
+            self.release()
+        return lines, dropped
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                    + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry)
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the writer falls behind"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback now (the default merges them into one string)
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_file_logging(logger, path, output_format='text', max_bytes=10 * 1024 * 1024,
+                       backups=3, queue_size=10000):
+    """Write `logger`'s records to a rotating file from a background thread.
+
+    Returns the QueueListener; stop() it to flush the file on shutdown.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter() if output_format == 'json' else logging.Formatter(LOG_FORMAT))
+    handler = _BoundedQueueHandler(queue.Queue(queue_size))
+    logger.addHandler(handler)
+    listener = QueueListener(handler.queue, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def configure_logging(logger):
+    """Apply the PALMSPEAK_LOG_* settings to `logger`; returns the file listener or None"""
+    logger.addFilter(RateLimitFilter(rate=float(os.environ.get('PALMSPEAK_LOG_RATE', 5))))
+    path = os.environ.get('PALMSPEAK_LOG_FILE')
+    if not path:
+        return None
+    return start_file_logging(logger, path,
+                              output_format=os.environ.get('PALMSPEAK_LOG_FORMAT', 'text'),
+                              max_bytes=int(float(os.environ.get('PALMSPEAK_LOG_MAX_MB', 10)) * 1024 * 1024))
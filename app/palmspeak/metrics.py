@@ -0,0 +1,191 @@
+"""
+Low-overhead latency instrumentation for the recognition pipeline.
+
+Each pipeline stage (body read, decode, MediaPipe, model, smoothing, ...)
+feeds a fixed-bucket histogram, and requests and frame outcomes feed plain
+counters. Recording is a perf_counter pair, a bisect and a short locked
+increment (about a microsecond), so it stays on in production. The data is
+exported at /metrics in the Prometheus text format and summarised in the
+Control Centre.
+"""
+
+import bisect
+import threading
+import time
+
+# Histogram upper bounds in seconds (50 us .. 2.5 s); +Inf is implicit
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGES = (
+    'queue',      # Wait for an admission (in-flight) slot
+    'read',       # Binary/multipart body read
+    'dedup',      # Near-duplicate thumbnail check
+    'parse',      # JSON body parse
+    'base64',     # Legacy data URL decode
+    'decode',     # cv2.imdecode
+    'roi',        # Hand-region crop / resolution limit
+    'convert',    # BGR -> RGB
+    'hands',      # MediaPipe Hands
+    'normalize',  # Landmark normalization
+    'model',      # Classifier (including micro-batch wait)
+    'worker',     # Whole frame in a vision worker process
+    'smoothing',  # Session vote
+)
+
+# name -> (label, help)
+COUNTERS = {
+    'requests_total': ('endpoint', "Prediction requests and stream frames received"),
+    'errors_total': ('endpoint', "Prediction requests that failed"),
+    'frames_total': ('result', "Frame outcomes: accepted, below_threshold or no_hand"),
+    'dedup_total': ('result', "Frames whose previous result was reused or that were computed"),
+    'shed_total': ('reason', "Frames shed by admission control: superseded, queue_full or timeout"),
+}
+
+
+class Histogram:
+    """Latency histogram with fixed buckets (per-bucket counts, rendered cumulatively)"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        """Return (per-bucket counts, sum, count) taken atomically"""
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q, counts=None):
+        """Estimate the q-quantile by interpolating inside its bucket"""
+        if counts is None:
+            counts = self.snapshot()[0]
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Overflow bucket has no upper bound
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class _Timer:
+    """Context manager that records its elapsed time in a histogram"""
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class PipelineMetrics:
+    """Per-stage and per-endpoint latency histograms plus outcome counters"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.stages = {stage: Histogram(buckets) for stage in STAGES}
+        self.requests = {}
+        self.counters = {name: {} for name in COUNTERS}
+        self._lock = threading.Lock()
+
+    def time(self, stage):
+        """`with metrics.time('decode'): ...` records one stage timing"""
+        return _Timer(self.stages[stage])
+
+    def time_request(self, endpoint):
+        """Time a whole request and count it under `endpoint`"""
+        histogram = self.requests.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self.requests.setdefault(endpoint, Histogram(self.buckets))
+        self.count('requests_total', endpoint)
+        return _Timer(histogram)
+
+    def count(self, name, label, amount=1):
+        values = self.counters[name]
+        with self._lock:
+            values[label] = values.get(label, 0) + amount
+
+    def summary(self):
+        """Plain dict for the GUI: per-stage count/mean/p50/p95 (ms) and counter values"""
+        stages = {}
+        for stage, histogram in list(self.stages.items()) + [
+                (f'request:{endpoint}', histogram) for endpoint, histogram in list(self.requests.items())]:
+            counts, total, count = histogram.snapshot()
+            if not count:
+                continue
+            stages[stage] = {
+                'count': count,
+                'mean_ms': total / count * 1000,
+                'p50_ms': histogram.quantile(0.5, counts) * 1000,
+                'p95_ms': histogram.quantile(0.95, counts) * 1000,
+            }
+        with self._lock:
+            counters = {name: dict(values) for name, values in self.counters.items()}
+        return {'stages': stages, 'counters': counters}
+
+    def render(self, extra=None):
+        """Prometheus text exposition (format 0.0.4).
+
+        `extra` maps metric name -> (type, help, value) for values owned
+        elsewhere, e.g. ('gauge', "Client sessions", 3).
+        """
+        lines = []
+        self._render_histograms(lines, 'palmspeak_stage_seconds', 'stage',
+                                "Time spent in each recognition pipeline stage", self.stages)
+        self._render_histograms(lines, 'palmspeak_request_seconds', 'endpoint',
+                                "End-to-end prediction latency per endpoint", dict(self.requests))
+        with self._lock:
+            counters = {name: dict(values) for name, values in self.counters.items()}
+        for name, (label, help_text) in COUNTERS.items():
+            metric = f'palmspeak_{name}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} counter')
+            for value, count in sorted(counters[name].items()):
+                lines.append(f'{metric}{{{label}="{value}"}} {count}')
+        for name, (metric_type, help_text, value) in (extra or {}).items():
+            metric = f'palmspeak_{name}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} {metric_type}')
+            lines.append(f'{metric} {_format(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_histograms(self, lines, metric, label, help_text, histograms):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for value, histogram in histograms.items():
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{{label}="{value}"}} {_format(total)}')
+            lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
@@ -0,0 +1,105 @@
+"""
+LRU cache of classifier outputs keyed on quantized landmark rows.
+
+A letter is held for many frames, so consecutive normalized landmark rows
+are nearly identical. PredictionCache rounds each 63-value row to a grid of
+`grid` (in normalized units) and reuses the classifier output stored for
+that cell, so a stable pose only runs the model when it first lands in a
+cell. A reused output is the one computed for another row in the same cell:
+every coordinate differs by less than `grid`, which is the tolerance the
+cache trades for fewer model calls.
+
+The cache is bounded (`max_entries`, least recently used evicted first),
+entries expire after `ttl` seconds, and everything is dropped when the
+model it was filled from changes (set_model).
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU/TTL cache in front of a predict(batch) function"""
+
+    def __init__(self, grid=0.005, max_entries=1024, ttl=10.0):
+        self.grid = grid
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._model = None
+        self._entries = OrderedDict()  # key -> (output row, stored at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def set_model(self, model):
+        """Drop every entry if `model` is not the one the cache was filled from"""
+        with self._lock:
+            if model is not self._model:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._model = model
+
+    def keys(self, inputs):
+        """Cache key of each row: its grid cell as int32 bytes"""
+        cells = np.floor(np.asarray(inputs, dtype=np.float64) / self.grid + 0.5).astype(np.int32)
+        return [row.tobytes() for row in cells]
+
+    def predict(self, inputs, predict):
+        """Outputs for an (N, features) batch; only rows in uncached cells go through `predict`"""
+        keys = self.keys(inputs)
+        now = time.monotonic()
+        outputs = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    missing.append(index)
+                else:
+                    self._entries.move_to_end(key)
+                    outputs[index] = entry[0]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = np.asarray(predict(np.asarray(inputs)[missing]), dtype=np.float32)
+            with self._lock:
+                for index, row in zip(missing, computed):
+                    outputs[index] = row
+                    # A copy, so the entry does not keep the whole batch output alive
+                    self._entries[keys[index]] = (row.copy(), now)
+                    self._entries.move_to_end(keys[index])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return np.stack(outputs)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'grid': self.grid,
+                'ttl_s': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,229 @@
+"""
+Replay captured traffic (see capture.py) against a running server.
+
+    python -m palmspeak replay capture.pslog --url http://127.0.0.1:5000 --speed 2 --output replay.json
+    python -m palmspeak replay capture.pslog --info
+    python -m palmspeak replay capture.pslog --export-landmarks landmarks.npz
+
+Every captured session gets its own keep-alive connection and sends its
+records in order. A record is due at its original offset from the first
+record divided by --speed (0 sends as fast as the server answers); a record
+whose session is still waiting for an earlier reply goes out late, and the
+report says how late.
+
+Frame records are posted to /predict with their session and hand-region
+headers, landmark records to /predict-landmarks as packed float32. Each
+reply's raw letter (that frame's top class) and smoothed letter are compared
+with the recorded ones, so replaying a capture against another build lists
+the predictions that changed.
+
+--export-landmarks saves the captured hands as normalized rows ("landmarks")
+with the served model's predictions ("predicted"), e.g. as calibration data
+for `python -m palmspeak variants`.
+"""
+
+import sys
+import json
+import time
+import threading
+import http.client
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from palmspeak.capture import CaptureLog, KIND_FRAME, NO_CLASS
+
+
+def summarize(log):
+    """Record counts, sessions and time span of a capture"""
+    kinds = Counter()
+    sessions = set()
+    hands = 0
+    first = last = None
+    for record in log:
+        kinds['frames' if record.kind == KIND_FRAME else 'landmarks'] += 1
+        sessions.add(record.session)
+        hands += record.hands
+        first = record.timestamp if first is None else min(first, record.timestamp)
+        last = record.timestamp if last is None else max(last, record.timestamp)
+    return {
+        'records': sum(kinds.values()),
+        'frames': kinds['frames'],
+        'landmarks': kinds['landmarks'],
+        'hands': hands,
+        'sessions': len(sessions),
+        'duration_s': (last - first) if first is not None else 0.0,
+    }
+
+
+def build_request(record):
+    """(path, body, headers) that re-sends one record"""
+    from palmspeak.roi import FULL_FRAME, ROI_HEADER
+    from palmspeak.sessions import DEFAULT_SESSION, SESSION_HEADER
+
+    headers = {'Content-Type': 'application/octet-stream'}
+    if record.session and record.session != DEFAULT_SESSION:
+        headers[SESSION_HEADER] = record.session
+    if record.kind == KIND_FRAME:
+        if record.region != FULL_FRAME:
+            headers[ROI_HEADER] = ','.join(f'{v:.6f}' for v in record.region)
+        return '/predict', record.payload, headers
+    return '/predict-landmarks', record.payload, headers
+
+
+def _session_loop(host, port, records, start, first_timestamp, speed, results):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        for index, record in records:
+            due = start + (record.timestamp - first_timestamp) / speed if speed > 0 else None
+            if due is not None:
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            path, body, headers = build_request(record)
+            sent = time.perf_counter()
+            reply = None
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                status = response.status
+                if status == 200:
+                    reply = json.loads(data)
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+            results.append((index, status, time.perf_counter() - sent,
+                            max(0.0, sent - due) if due is not None else 0.0, reply))
+    finally:
+        connection.close()
+
+
+def replay(log, url, speed=1.0, limit=None):
+    """Send a capture's records to the server at `url`; returns [(record, status, latency, lateness, reply)]"""
+    parts = urlsplit(url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    records = []
+    for index, record in enumerate(log):
+        if limit is not None and index >= limit:
+            break
+        records.append(record)
+    if not records:
+        return []
+
+    by_session = defaultdict(list)
+    for index, record in enumerate(records):
+        by_session[record.session].append((index, record))
+    first_timestamp = min(record.timestamp for record in records)
+    results = []
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_session_loop,
+                                args=(host, port, session_records, start, first_timestamp, speed, results),
+                                daemon=True)
+               for session_records in by_session.values()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [(records[index], status, latency, lateness, reply)
+            for index, status, latency, lateness, reply in sorted(results, key=lambda result: result[0])]
+
+
+def compare(results, classes, max_mismatches=20):
+    """Agreement of replies with the recorded raw and smoothed letters"""
+    def letter(index):
+        return classes[index] if index != NO_CLASS else None
+
+    compared = raw_matches = letter_matches = 0
+    mismatches = []
+    for record, status, _, _, reply in results:
+        if reply is None:
+            continue
+        compared += 1
+        expected = (letter(record.raw_class), letter(record.letter_class))
+        got = (reply.get('raw_letter'), reply.get('letter'))
+        raw_matches += expected[0] == got[0]
+        letter_matches += expected[1] == got[1]
+        if expected != got and len(mismatches) < max_mismatches:
+            mismatches.append({'offset': record.offset, 'session': record.session,
+                               'recorded': {'raw_letter': expected[0], 'letter': expected[1]},
+                               'replayed': {'raw_letter': got[0], 'letter': got[1]}})
+    return {
+        'compared': compared,
+        'raw_letter': raw_matches / compared if compared else None,
+        'letter': letter_matches / compared if compared else None,
+        'mismatches': mismatches,
+    }
+
+
+def export_landmarks(log, path, classes):
+    """Save the captured hands as normalized rows plus the served model's predictions (.npz)"""
+    from palmspeak.vision import normalize_hands
+    rows, predicted = log.landmark_rows()
+    if not len(rows):
+        raise ValueError("The capture has no landmark records (capture with PALMSPEAK_CAPTURE_MODE=landmarks)")
+    names = np.array([classes[index] if index != NO_CLASS else '' for index in predicted])
+    np.savez(path, landmarks=normalize_hands(rows), predicted=names)
+    return len(rows)
+
+
+def add_arguments(parser):
+    parser.add_argument('capture', help="Capture file written with PALMSPEAK_CAPTURE_FILE")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Server to replay against")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Multiple of the captured timing (0: as fast as the server answers)")
+    parser.add_argument('--limit', type=int, help="Replay only the first N records")
+    parser.add_argument('--output', '-o', help="Write the report as JSON here instead of stdout")
+    parser.add_argument('--info', action='store_true', help="Summarize the capture without replaying it")
+    parser.add_argument('--export-landmarks', metavar='NPZ',
+                        help="Save the captured landmarks as .npz instead of replaying")
+
+
+def main(args):
+    from palmspeak.bench import percentiles
+    from palmspeak.engine import ASL_CLASSES
+
+    with CaptureLog(args.capture) as log:
+        summary = summarize(log)
+        if args.info:
+            print(json.dumps(summary, indent=2))
+            return 0
+        if args.export_landmarks:
+            count = export_landmarks(log, args.export_landmarks, ASL_CLASSES)
+            print(f"Saved {count} landmark rows -> {args.export_landmarks}", file=sys.stderr)
+            return 0
+
+        print(f"Replaying {summary['records']} records from {summary['sessions']} sessions "
+              f"({summary['duration_s']:.1f}s captured) at {args.speed:g}x...", file=sys.stderr)
+        started = time.perf_counter()
+        results = replay(log, args.url, args.speed, args.limit)
+        elapsed = time.perf_counter() - started
+        report = {
+            'capture': dict(summary, path=args.capture),
+            'target': args.url,
+            'speed': args.speed,
+            'requests': len(results),
+            'elapsed_s': elapsed,
+            'requests_per_s': len(results) / elapsed if elapsed > 0 else None,
+            'status': dict(Counter(str(status) for _, status, _, _, _ in results)),
+            'latency': percentiles([latency for _, status, latency, _, _ in results if status == 200]),
+            'lateness': percentiles([lateness for _, _, _, lateness, _ in results]),
+            'agreement': compare(results, ASL_CLASSES),
+        }
+        del results
+
+    agreement = report['agreement']
+    print(f"{report['requests']} requests in {elapsed:.1f}s, status {report['status']}", file=sys.stderr)
+    if agreement['compared']:
+        print(f"Raw letter agreement {agreement['raw_letter']:.1%}, "
+              f"smoothed letter agreement {agreement['letter']:.1%} "
+              f"over {agreement['compared']} replies", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
@@ -0,0 +1,151 @@
+"""
+Hand region-of-interest tracking.
+
+A hand usually covers a small part of the captured screen, so running
+MediaPipe on the whole frame wastes pixels and loses detail. Each session
+remembers the region around its last detected hand; the next frame is cropped
+to that region and resized to a fixed resolution before MediaPipe, and the
+full frame is only used when the crop misses. Sessions with their own
+video-mode tracker skip cropping: MediaPipe's tracker already follows the
+hand region between frames, but only if every frame has the same geometry.
+
+Regions are (x, y, width, height) tuples normalized to the client's full
+capture, so they stay valid whatever size the client uploads. The region is
+returned with each prediction, and the client can upload just that part of
+its capture; it then says which region it sent (the X-PalmSpeak-ROI header,
+or a ROI_MAGIC prefix on WebSocket frames) and landmarks are mapped back to
+full-capture coordinates before the model sees them.
+"""
+
+import struct
+
+import cv2
+import numpy as np
+
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+ROI_HEADER = 'X-PalmSpeak-ROI'
+# Binary WebSocket frames may start with ROI_MAGIC + 4 little-endian float32s
+ROI_MAGIC = b'PSR1'
+_ROI_PREFIX = struct.Struct('<4f')
+ROI_PREFIX_SIZE = len(ROI_MAGIC) + _ROI_PREFIX.size
+
+
+def parse_region(value):
+    """Parse "x,y,width,height" (normalized) into a region; None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        region = tuple(float(v) for v in value.split(','))
+    except ValueError:
+        return None
+    return region if _valid(region) else None
+
+
+def split_frame(message):
+    """Split an optional ROI prefix off a binary frame; returns (region or None, image bytes)"""
+    if len(message) > ROI_PREFIX_SIZE and bytes(message[:len(ROI_MAGIC)]) == ROI_MAGIC:
+        region = _ROI_PREFIX.unpack_from(message, len(ROI_MAGIC))
+        return (region if _valid(region) else None), memoryview(message)[ROI_PREFIX_SIZE:]
+    return None, message
+
+
+def _valid(region):
+    if len(region) != 4 or not all(np.isfinite(region)):
+        return False
+    x, y, w, h = region
+    return w > 0 and h > 0 and x >= -1e-3 and y >= -1e-3 and x + w <= 1 + 1e-3 and y + h <= 1 + 1e-3
+
+
+def hand_region(landmarks, margin=2.0, min_size=0.15):
+    """Square-ish region around full-capture landmarks, scaled by `margin` and clipped to the frame"""
+    points = np.asarray(landmarks).reshape(-1, 3)
+    x_min, y_min = points[:, 0].min(), points[:, 1].min()
+    x_max, y_max = points[:, 0].max(), points[:, 1].max()
+    size = min(1.0, max(min_size, (x_max - x_min) * margin, (y_max - y_min) * margin))
+    # Keep the region inside the frame by shifting rather than shrinking it
+    x = min(max((x_min + x_max - size) / 2, 0.0), 1.0 - size)
+    y = min(max((y_min + y_max - size) / 2, 0.0), 1.0 - size)
+    return (float(x), float(y), float(size), float(size))
+
+
+def intersect(region, bounds):
+    """Part of `region` inside `bounds`, or None if they don't overlap"""
+    x = max(region[0], bounds[0])
+    y = max(region[1], bounds[1])
+    right = min(region[0] + region[2], bounds[0] + bounds[2])
+    bottom = min(region[1] + region[3], bounds[1] + bounds[3])
+    if right <= x or bottom <= y:
+        return None
+    return (x, y, right - x, bottom - y)
+
+
+def crop_region(image, region, image_region=FULL_FRAME, size=256, buffers=None):
+    """Crop `region` out of an image covering `image_region` and resize its longer side to `size`.
+
+    Returns (crop, the region actually cropped after rounding to pixels).
+    With a vision.FrameBuffers, the resized crop is written into its "crop" image.
+    """
+    height, width = image.shape[:2]
+    ix, iy, iw, ih = image_region
+    left = int(round((region[0] - ix) / iw * width))
+    top = int(round((region[1] - iy) / ih * height))
+    right = int(round((region[0] + region[2] - ix) / iw * width))
+    bottom = int(round((region[1] + region[3] - iy) / ih * height))
+    left, top = max(left, 0), max(top, 0)
+    right, bottom = min(max(right, left + 1), width), min(max(bottom, top + 1), height)
+
+    crop = image[top:bottom, left:right]
+    scale = size / max(crop.shape[:2])
+    if scale != 1.0:
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        crop = _resize(crop, max(1, round(crop.shape[1] * scale)), max(1, round(crop.shape[0] * scale)),
+                       interpolation, buffers, 'crop')
+    cropped = (ix + left / width * iw, iy + top / height * ih,
+               (right - left) / width * iw, (bottom - top) / height * ih)
+    return crop, cropped
+
+
+def limit_resolution(image, max_size, buffers=None):
+    """Downscale so the longer side is at most `max_size` (normalized landmarks are unaffected)"""
+    scale = max_size / max(image.shape[:2])
+    if max_size <= 0 or scale >= 1.0:
+        return image
+    return _resize(image, round(image.shape[1] * scale), round(image.shape[0] * scale),
+                   cv2.INTER_AREA, buffers, 'frame')
+
+
+def _resize(image, width, height, interpolation, buffers=None, name=None):
+    if buffers is None:
+        return cv2.resize(image, (width, height), interpolation=interpolation)
+    return cv2.resize(image, (width, height), dst=buffers.image(name, height, width), interpolation=interpolation)
+
+
+def to_full_frame(landmarks, region, in_place=False):
+    """Map flat landmarks normalized to `region` back to full-capture coordinates.
+
+    `in_place` overwrites a float array of landmarks instead of returning a copy.
+    """
+    if region == FULL_FRAME:
+        return landmarks
+    x, y, w, h = region
+    if in_place:
+        points = landmarks.reshape(-1, 3)
+    else:
+        points = np.array(landmarks, dtype=np.float64).reshape(-1, 3)
+    points[:, 0] *= w
+    points[:, 0] += x
+    points[:, 1] *= h
+    points[:, 1] += y
+    points[:, 2] *= w  # MediaPipe z uses roughly the same scale as x
+    return landmarks if in_place else points.reshape(np.shape(landmarks))
+
+
+def hands_to_full_frame(detected, region, in_place=False):
+    """to_full_frame for every (landmarks, handedness, score) hand of detect_hands"""
+    if region == FULL_FRAME:
+        return detected
+    return [(to_full_frame(landmarks, region, in_place), label, score) for landmarks, label, score in detected]
+
+
+def region_area(region):
+    return region[2] * region[3]
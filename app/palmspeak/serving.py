@@ -0,0 +1,137 @@
+"""
+Serving layer for the Flask API.
+
+Flask's `app.run` starts Werkzeug's development server, which cannot be
+stopped from another thread. ApiServer binds the port up front (so errors
+reach the caller), serves on a background thread and releases the port on
+`stop()`. Two server modes are available:
+
+    waitress  - production WSGI server with a fixed thread pool, connection
+                limit and keep-alive timeout (no WebSocket support)
+    werkzeug  - threaded Werkzeug server with HTTP/1.1 keep-alive; needed for
+                the /stream WebSocket endpoint
+
+waitress is the default when installed. It cannot upgrade connections to
+WebSockets, so the engine serves /stream from a second, werkzeug-mode
+ApiServer on its own port.
+"""
+
+import time
+import threading
+
+try:
+    from waitress import wasyncore
+    from waitress.server import create_server as create_waitress_server
+except ImportError:  # waitress is optional; fall back to werkzeug
+    create_waitress_server = None
+
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+SERVER_MODES = ('waitress', 'werkzeug')
+
+
+def default_server_mode():
+    return 'waitress' if create_waitress_server is not None else 'werkzeug'
+
+
+def supports_websockets(mode):
+    return mode == 'werkzeug'
+
+
+class ApiServer:
+    """Run a WSGI app on a background thread with a clean, port-releasing stop"""
+
+    def __init__(self, app, host='0.0.0.0', port=5000, mode=None, threads=8,
+                 connection_limit=100, keepalive_timeout=30, max_request_size=8 * 1024 * 1024,
+                 logger=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.mode = mode or default_server_mode()
+        if self.mode not in SERVER_MODES:
+            raise ValueError(f"Unknown server mode '{self.mode}' (choose from {', '.join(SERVER_MODES)})")
+        if self.mode == 'waitress' and create_waitress_server is None:
+            raise ValueError("Server mode 'waitress' requires the waitress package")
+        self.threads = threads
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.max_request_size = max_request_size
+        self.logger = logger
+        self._server = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, on_exit=None):
+        """Bind the port and start serving; on_exit(error) is called when serving ends"""
+        # Flask rejects larger bodies with 413 before they reach the handlers
+        self.app.config['MAX_CONTENT_LENGTH'] = self.max_request_size
+        if self.mode == 'waitress':
+            self._server = create_waitress_server(
+                self.app, host=self.host, port=self.port,
+                threads=self.threads,
+                connection_limit=self.connection_limit,
+                channel_timeout=self.keepalive_timeout,
+                max_request_body_size=self.max_request_size,
+                ident='PalmSpeak')
+            serve = self._server.run
+        else:
+            self._server = make_server(self.host, self.port, self.app, threaded=True,
+                                       request_handler=self._keepalive_handler())
+            self._server.daemon_threads = True
+            serve = self._server.serve_forever
+
+        def run():
+            error = None
+            try:
+                serve()
+            except Exception as e:
+                error = e
+            if on_exit is not None:
+                on_exit(error)
+
+        self._thread = threading.Thread(target=run, name='palmspeak-api', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop accepting connections, finish in-flight requests and release the port"""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        if self.mode == 'waitress':
+            self._stop_waitress(server, timeout)
+        else:
+            server.shutdown()
+            server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _stop_waitress(self, server, timeout):
+        deadline = time.monotonic() + timeout
+        # Stop accepting, then let queued and running requests finish; the
+        # trigger stays open so their responses still reach the loop
+        server.accepting = False
+        server.task_dispatcher.shutdown(cancel_pending=False, timeout=timeout)
+        channels = [channel for channel in list(server._map.values()) if hasattr(channel, 'total_outbufs_len')]
+        while any(channel.total_outbufs_len for channel in channels) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Closing every channel (idle keep-alive ones included), the trigger and
+        # the listening socket empties the map, so the loop returns. It is done
+        # on the loop thread, which is not then left polling closed sockets.
+        if self._thread is not None and self._thread.is_alive():
+            server.trigger.pull_trigger(lambda: wasyncore.close_all(server._map))
+            self._thread.join(max(0.0, deadline - time.monotonic()))
+        if server._map:
+            wasyncore.close_all(server._map, ignore_all=True)
+
+    def _keepalive_handler(self):
+        keepalive_timeout = self.keepalive_timeout
+
+        class KeepAliveRequestHandler(WSGIRequestHandler):
+            # HTTP/1.1 keeps connections open between requests
+            protocol_version = 'HTTP/1.1'
+            timeout = keepalive_timeout
+
+        return KeepAliveRequestHandler
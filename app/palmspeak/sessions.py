@@ -0,0 +1,123 @@
+"""
+Per-client recognition state.
+
+Each client passes a session ID with its requests so that prediction
+smoothing (and anything else that depends on previous frames) is kept
+separate per client. Sessions live in a bounded table that evicts the least
+recently used entry when full and drops entries idle for longer than the TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from palmspeak.smoothing import VoteWindow, MajorityVote
+
+DEFAULT_SESSION = 'default'
+SESSION_HEADER = 'X-PalmSpeak-Session'
+
+
+class SessionState:
+    """Smoothing buffer and bookkeeping for one client session"""
+
+    def __init__(self, session_id, buffer_size=10, policy=MajorityVote):
+        self.session_id = session_id
+        # Clients that identify themselves send a continuous frame stream
+        self.continuous = session_id != DEFAULT_SESSION
+        self.prediction_buffer = VoteWindow(buffer_size, policy())
+        self.lock = threading.Lock()
+        # Dedicated video-mode hand tracker, guarded separately from the buffer
+        self.tracker = None
+        self.tracker_closed = False
+        self.tracker_lock = threading.Lock()
+        # Last fully processed frame, for near-duplicate reuse (see dedup.py)
+        self.frame_cache = None
+        # Region around the last detected hand, normalized to the full capture (see roi.py)
+        self.hand_roi = None
+        self.created_at = time.monotonic()
+        self.last_seen = self.created_at
+
+    def clear(self):
+        with self.lock:
+            self.prediction_buffer.clear()
+            self.frame_cache = None
+
+
+class SessionTable:
+    """Bounded LRU/TTL table of SessionState objects"""
+
+    def __init__(self, max_sessions=256, ttl=600.0, buffer_size=10, policy=MajorityVote, on_evict=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.buffer_size = buffer_size
+        # Factory for each new session's vote policy
+        self.policy = policy
+        # Called (outside the table lock) with each session that leaves the table
+        self.on_evict = on_evict
+        self.evicted = 0
+        self._sessions = OrderedDict()
+        # Only guards the table itself; each session has its own lock
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id):
+        """Return the session, creating it if needed, and mark it as recently used"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = SessionState(session_id, self.buffer_size, self.policy)
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            evicted = self._evict(now)
+        self._release(evicted)
+        return session
+
+    def peek(self, session_id):
+        """Return the session if it exists, without creating or touching it"""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def remove(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._release([session])
+        return session
+
+    def clear(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        self._release(sessions)
+
+    def _evict(self, now):
+        # Oldest entries are at the front, so stop at the first live one
+        evicted = []
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - session.last_seen <= self.ttl:
+                break
+            del self._sessions[session_id]
+            evicted.append(session)
+            self.evicted += 1
+        return evicted
+
+    def _release(self, sessions):
+        if self.on_evict is not None:
+            for session in sessions:
+                self.on_evict(session)
+
+
+def get_session_id(request):
+    """Read the client session ID from the header, query string or JSON body"""
+    session_id = request.headers.get(SESSION_HEADER) or request.args.get('session')
+    if not session_id and request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            session_id = data.get('session_id')
+    return str(session_id) if session_id else DEFAULT_SESSION
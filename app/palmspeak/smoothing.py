@@ -0,0 +1,211 @@
+"""
+Sliding-window vote for prediction smoothing.
+
+VoteWindow keeps running per-class counts and confidence sums as predictions
+are pushed and evicted, so the smoothed letter is available without
+rebuilding a Counter over the buffer on every frame. How the window's
+statistics turn into a letter is decided by a small VotePolicy strategy:
+
+    majority       - most frequent letter, mean confidence (the original vote)
+    min-share:S    - majority, but only if it holds at least share S of the window
+    ewma:D         - highest exponentially weighted confidence, decay D per frame
+"""
+
+from collections import deque
+
+NOTHING = ('nothing', 1.0)
+
+
+class VotePolicy:
+    """Strategy interface: turn a VoteWindow's running statistics into (label, confidence)"""
+
+    def push(self, window, label, confidence, seq):
+        pass
+
+    def evict(self, window, label, confidence, seq):
+        pass
+
+    def reset(self):
+        pass
+
+    def decide(self, window):
+        raise NotImplementedError
+
+
+class MajorityVote(VotePolicy):
+    """Most frequent label with its mean confidence.
+
+    Ties go to the label that entered the window first, matching
+    Counter.most_common over the buffer.
+    """
+
+    def decide(self, window):
+        label = window.leader()
+        return (label, window.mean_confidence(label))
+
+
+class MinShareVote(MajorityVote):
+    """Majority vote that only commits when the leader holds `min_share` of the window"""
+
+    def __init__(self, min_share=0.5):
+        self.min_share = float(min_share)
+
+    def decide(self, window):
+        label = window.leader()
+        if window.counts[label] < self.min_share * len(window):
+            return NOTHING
+        return (label, window.mean_confidence(label))
+
+
+class WeightedVote(VotePolicy):
+    """Label with the highest exponentially weighted confidence sum.
+
+    Each entry is weighted by decay ** age. Weights are stored relative to a
+    moving origin so pushes and evictions stay O(1); the origin is rebased
+    before the scale factors can overflow.
+    """
+
+    MAX_SCALE = 1e100
+
+    def __init__(self, decay=0.8):
+        self.decay = float(decay)
+        if not 0.0 < self.decay <= 1.0:
+            raise ValueError("decay must be in (0, 1]")
+        self.reset()
+
+    def reset(self):
+        self.scores = {}
+        self.origin = 0
+
+    def _weight(self, seq):
+        return self.decay ** (self.origin - seq)
+
+    def push(self, window, label, confidence, seq):
+        if self._weight(seq) > self.MAX_SCALE:
+            factor = self.decay ** (seq - self.origin)
+            for key in self.scores:
+                self.scores[key] *= factor
+            self.origin = seq
+        self.scores[label] = self.scores.get(label, 0.0) + confidence * self._weight(seq)
+
+    def evict(self, window, label, confidence, seq):
+        score = self.scores[label] - confidence * self._weight(seq)
+        if window.counts.get(label):
+            self.scores[label] = score
+        else:
+            del self.scores[label]
+
+    def decide(self, window):
+        label = max(self.scores, key=self.scores.get)
+        return (label, window.mean_confidence(label))
+
+
+POLICIES = {
+    'majority': MajorityVote,
+    'min-share': MinShareVote,
+    'ewma': WeightedVote,
+}
+
+
+def policy_factory(spec):
+    """Return a callable that builds the policy named by 'name' or 'name:param'"""
+    name, _, param = (spec or 'majority').partition(':')
+    name = name.strip().lower()
+    if name not in POLICIES:
+        raise ValueError(f"Unknown vote policy '{name}' (choose from {', '.join(POLICIES)})")
+    policy_class = POLICIES[name]
+    if param:
+        return lambda: policy_class(float(param))
+    return policy_class
+
+
+class VoteWindow:
+    """Fixed-size window of (label, confidence) predictions with O(1) updates"""
+
+    def __init__(self, maxlen=10, policy=None):
+        self.maxlen = maxlen
+        self.policy = policy if policy is not None else MajorityVote()
+        self.entries = deque()
+        self.counts = {}
+        self.confidence_sums = {}
+        # Labels grouped by count, plus the current top count, so the leader
+        # can be found without scanning every class
+        self.by_count = {}
+        self.max_count = 0
+        # Sequence numbers of each label's entries, oldest first (for tie-breaks)
+        self.positions = {}
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __iter__(self):
+        return ((label, confidence) for label, confidence, _ in self.entries)
+
+    def append(self, prediction):
+        label, confidence = prediction
+        if len(self.entries) >= self.maxlen:
+            self._evict()
+        seq = self.seq
+        self.seq += 1
+        self.entries.append((label, confidence, seq))
+        count = self.counts.get(label, 0)
+        self._move(label, count, count + 1)
+        self.confidence_sums[label] = self.confidence_sums.get(label, 0.0) + confidence
+        self.positions.setdefault(label, deque()).append(seq)
+        self.policy.push(self, label, confidence, seq)
+
+    def clear(self):
+        self.entries.clear()
+        self.counts.clear()
+        self.confidence_sums.clear()
+        self.by_count.clear()
+        self.positions.clear()
+        self.max_count = 0
+        self.policy.reset()
+
+    def most_common(self):
+        """Return the smoothed (label, confidence) chosen by the policy"""
+        if not self.entries:
+            return NOTHING
+        return self.policy.decide(self)
+
+    def leader(self):
+        """Most frequent label; ties go to the label whose oldest entry is oldest"""
+        candidates = self.by_count[self.max_count]
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        return min(candidates, key=lambda label: self.positions[label][0])
+
+    def mean_confidence(self, label):
+        return self.confidence_sums[label] / self.counts[label]
+
+    def _evict(self):
+        label, confidence, seq = self.entries.popleft()
+        count = self.counts[label]
+        self._move(label, count, count - 1)
+        self.positions[label].popleft()
+        if count == 1:
+            del self.confidence_sums[label]
+            del self.positions[label]
+        else:
+            self.confidence_sums[label] -= confidence
+        self.policy.evict(self, label, confidence, seq)
+
+    def _move(self, label, old, new):
+        if old:
+            bucket = self.by_count[old]
+            bucket.discard(label)
+            if not bucket:
+                del self.by_count[old]
+                if self.max_count == old:
+                    self.max_count = new
+        if new:
+            self.by_count.setdefault(new, set()).add(label)
+            self.counts[label] = new
+            self.max_count = max(self.max_count, new)
+        else:
+            del self.counts[label]
@@ -0,0 +1,268 @@
+"""
+Offline batch transcription of recorded sessions.
+
+    python -m palmspeak transcribe recording.mp4 --output transcript.json
+    python -m palmspeak transcribe frames/ --fps 10 --output transcript.csv
+
+Runs the same extract_hand_landmarks -> normalize -> model -> smoothing path
+as /predict, without HTTP:
+
+    reader thread   decodes frames (cv2.VideoCapture or an image folder)
+                    into a bounded prefetch queue
+    landmark pool   runs MediaPipe on a chunk of frames in parallel, one
+                    pooled detector per thread (or one video-mode tracker,
+                    in order, with --track)
+    model           one batched forward pass per chunk
+    smoothing       the frames' predictions go through a session's vote
+                    window in frame order
+
+The smoothed letters are collapsed into time-coded segments and written as
+JSON (segments plus assembled text) or CSV (one row per segment).
+"""
+
+import os
+import csv
+import json
+import glob
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+_END = object()
+
+
+def frame_source(path, fps=None, every=1):
+    """Open a video file or image folder; returns (frames, frames per second).
+
+    `frames` yields (frame index, timestamp in seconds, BGR image). Image
+    folders are read in name order at `fps` (default 1 frame per second).
+    """
+    import cv2
+
+    if os.path.isdir(path):
+        paths = sorted(p for p in glob.glob(os.path.join(path, '*'))
+                       if p.lower().endswith(IMAGE_EXTENSIONS))
+        if not paths:
+            raise ValueError(f"No images in {path}")
+        rate = fps or 1.0
+
+        def images():
+            for index in range(0, len(paths), every):
+                image = cv2.imread(paths[index], cv2.IMREAD_COLOR)
+                if image is not None:
+                    yield index, index / rate, image
+        return images(), rate
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video {path}")
+    rate = fps or capture.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def video():
+        index = 0
+        try:
+            while True:
+                # grab() skips decoding frames that --every drops
+                if not capture.grab():
+                    break
+                if index % every == 0:
+                    ok, image = capture.retrieve()
+                    if ok:
+                        yield index, index / rate, image
+                index += 1
+        finally:
+            capture.release()
+    return video(), rate
+
+
+def prefetch(frames, depth):
+    """Run a frame generator on a background thread behind a bounded queue"""
+    buffer = queue.Queue(maxsize=depth)
+    errors = []
+
+    def reader():
+        try:
+            for frame in frames:
+                buffer.put(frame)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            buffer.put(_END)
+
+    threading.Thread(target=reader, name='palmspeak-prefetch', daemon=True).start()
+    while True:
+        frame = buffer.get()
+        if frame is _END:
+            break
+        yield frame
+    if errors:
+        raise errors[0]
+
+
+def chunks(frames, size):
+    chunk = []
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Transcriber:
+    """Batch pipeline around a loaded RecognitionEngine"""
+
+    def __init__(self, engine, threads=None, batch_size=64, track=False, prefetch_depth=128):
+        from palmspeak.sessions import SessionState
+
+        self.engine = engine
+        self.threads = threads or engine.hand_detectors.pool_size
+        self.batch_size = batch_size
+        self.track = track
+        self.prefetch_depth = prefetch_depth
+        self.session = SessionState('transcribe', buffer_size=engine.sessions.buffer_size,
+                                    policy=engine.sessions.policy)
+        self.session.continuous = track
+
+    def run(self, frames):
+        """Yield (index, timestamp, response dict) in frame order"""
+        from palmspeak.vision import normalize_landmarks
+
+        executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='palmspeak-landmarks')
+        try:
+            for chunk in chunks(prefetch(frames, self.prefetch_depth), self.batch_size):
+                images = [image for _, _, image in chunk]
+                if self.track:
+                    # One tracker must see the frames in order
+                    landmarks = [self.engine.extract_hand_landmarks(image, self.session) for image in images]
+                else:
+                    landmarks = list(executor.map(self.engine.extract_hand_landmarks, images))
+
+                found = [i for i, hand in enumerate(landmarks) if hand is not None]
+                probabilities = [None] * len(chunk)
+                if found:
+                    batch = np.concatenate([normalize_landmarks(landmarks[i]) for i in found])
+                    for i, row in zip(found, self.engine.inference.predict(batch)):
+                        probabilities[i] = row
+
+                for (index, timestamp, _), row in zip(chunk, probabilities):
+                    yield index, timestamp, self.engine.apply_prediction(row, self.session)
+        finally:
+            executor.shutdown()
+            if self.track:
+                self.engine.hand_detectors.release(self.session)
+
+
+def build_segments(results, frame_interval):
+    """Collapse consecutive identical smoothed letters into time-coded segments"""
+    segments = []
+    for index, timestamp, response in results:
+        letter = response['letter']
+        if segments and segments[-1]['letter'] == letter:
+            segment = segments[-1]
+            segment['end'] = timestamp + frame_interval
+            segment['frames'] += 1
+            segment['confidence'] += response['confidence']
+        else:
+            segments.append({'letter': letter, 'start': timestamp, 'end': timestamp + frame_interval,
+                             'first_frame': index, 'frames': 1, 'confidence': response['confidence']})
+    for segment in segments:
+        segment['confidence'] /= segment['frames']
+    return segments
+
+
+def assemble_text(segments, min_confidence=0.6):
+    """Running text built the way the overlay does (content.js).
+
+    Confident segments only; 'space' adds a space, 'del' removes the last
+    character, and a letter is not repeated straight after itself.
+    """
+    text = []
+    for segment in segments:
+        letter = segment['letter']
+        if letter == 'nothing' or segment['confidence'] < min_confidence:
+            continue
+        if letter == 'space':
+            text.append(' ')
+        elif letter == 'del':
+            if text:
+                text.pop()
+        elif not text or text[-1] != letter:
+            text.append(letter)
+    return ''.join(text)
+
+
+def write_transcript(path, transcript, output_format):
+    if output_format == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['start', 'end', 'letter', 'confidence', 'frames', 'first_frame'])
+            for segment in transcript['segments']:
+                writer.writerow([f"{segment['start']:.3f}", f"{segment['end']:.3f}", segment['letter'],
+                                 f"{segment['confidence']:.4f}", segment['frames'], segment['first_frame']])
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(transcript, f, indent=2)
+            f.write('\n')
+
+
+def add_arguments(parser):
+    parser.add_argument('input', help="Video file or directory of images")
+    parser.add_argument('--output', '-o', required=True, help="Transcript path (.json or .csv)")
+    parser.add_argument('--format', choices=['json', 'csv'],
+                        help="Output format (default: from the output file extension)")
+    parser.add_argument('--fps', type=float,
+                        help="Frame rate for timestamps (default: the video's, or 1 for image folders)")
+    parser.add_argument('--every', type=int, default=1, help="Process every Nth frame")
+    parser.add_argument('--threads', type=int,
+                        help="Parallel landmark threads (default PALMSPEAK_HANDS_POOL_SIZE)")
+    parser.add_argument('--batch-size', type=int, default=64, help="Frames per batched model call")
+    parser.add_argument('--track', action='store_true',
+                        help="Use one video-mode hand tracker in frame order instead of parallel detection")
+    parser.add_argument('--log-level', default='WARNING', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+
+
+def main(args):
+    import time
+    import logging
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('palmspeak-control')
+    logger.setLevel(args.log_level)
+
+    from palmspeak.engine import RecognitionEngine
+
+    output_format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'json')
+    every = max(1, args.every)
+    engine = RecognitionEngine(num_workers=0, logger=logger)
+    try:
+        engine.load_model()
+        frames, fps = frame_source(args.input, args.fps, every)
+        transcriber = Transcriber(engine, threads=args.threads, batch_size=args.batch_size, track=args.track)
+
+        started = time.perf_counter()
+        results = list(transcriber.run(frames))
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.shutdown()
+
+    segments = build_segments(results, every / fps)
+    duration = (results[-1][1] + every / fps) if results else 0.0
+    transcript = {
+        'source': os.path.abspath(args.input),
+        'fps': fps,
+        'every': every,
+        'frames': len(results),
+        'duration': duration,
+        'processing_seconds': elapsed,
+        'speed': duration / elapsed if elapsed else None,
+        'text': assemble_text(segments),
+        'segments': segments,
+    }
+    write_transcript(args.output, transcript, output_format)
+    print(f"Transcribed {len(results)} frames ({duration:.1f}s) in {elapsed:.1f}s "
+          f"({transcript['speed'] or 0:.1f}x real time) -> {args.output}")
+    return 0
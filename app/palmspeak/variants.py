@@ -0,0 +1,260 @@
+"""
+Reduced-precision variants of the landmark classifier.
+
+    python -m palmspeak variants --output variants.json
+    python -m palmspeak variants --calibration recording.mp4 --save-calibration landmarks.npz
+
+PALMSPEAK_MODEL_PRECISION picks the variant the engine loads:
+
+    float32  the model as trained (default)
+    float16  tflite: float16 weight quantization
+    int8     tflite: full integer quantization, with activation ranges
+             calibrated on landmark rows, run by TFLite's int8 kernels
+
+Only the tflite backend has reduced-precision variants. NumPy has no int8
+or float16 matmul faster than float32, so a numpy variant would either keep
+a widened float32 copy (more memory) or widen per call (more CPU), and lose
+accuracy either way. The numpy backend runs float32 and ignores the setting
+with a warning.
+
+The int8 variant quantizes activations, so it needs calibration rows
+(PALMSPEAK_CALIBRATION_DATA, a .npy of N x 63 normalized rows or a .npz with
+"landmarks" and optional "labels"); without them, synthetic hand-shaped rows
+are used.
+
+A variant is only used if its top-1 class agrees with the float32 model on
+at least MIN_AGREEMENT of the calibration rows; otherwise the engine logs a
+warning and keeps float32. `python -m palmspeak variants` measures every
+backend/precision pair against the original Keras model.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+
+import numpy as np
+
+PRECISIONS = ('float32', 'float16', 'int8')
+DEFAULT_PRECISION = 'float32'
+VARIANT_BACKENDS = ('tflite',)
+MIN_AGREEMENT = 0.98
+
+
+def tflite_variant(model, precision, calibration):
+    """TFLite post-training quantization of a Keras model"""
+    import tensorflow as tf
+    from palmspeak.inference import TFLiteBackend
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if precision == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif precision == 'int8':
+        rows = np.asarray(calibration, dtype=np.float32)
+
+        def representative_dataset():
+            for row in rows:
+                yield [row.reshape(1, -1)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        # Integer kernels throughout; float input/output keeps the predict() contract
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return TFLiteBackend(model_content=converter.convert(), precision=precision)
+
+
+def build_variant(base, model, precision, calibration):
+    """Variant of a float32 tflite backend; `model` is the Keras model it came from"""
+    if precision == DEFAULT_PRECISION:
+        return base
+    if base.name == 'tflite':
+        return tflite_variant(model, precision, calibration)
+    raise ValueError(f"No {precision} variant for the {base.name} backend "
+                     f"(use one of {', '.join(VARIANT_BACKENDS)})")
+
+
+def agreement(backend, reference, inputs):
+    """Share of rows on which both backends pick the same class"""
+    return float(np.mean(backend.predict(inputs).argmax(axis=1) == reference.predict(inputs).argmax(axis=1)))
+
+
+def synthetic_landmarks(input_dim=63, samples=512, seed=0):
+    """Hand-shaped normalized rows (21 points around a palm) for when no recorded data is available"""
+    rng = np.random.default_rng(seed)
+    points = input_dim // 3
+    centre = rng.uniform(0.3, 0.7, size=(samples, 1, 2))
+    spread = rng.uniform(0.05, 0.2, size=(samples, 1, 1))
+    xy = centre + rng.normal(0, 1, size=(samples, points, 2)) * spread
+    z = rng.normal(-0.03, 0.03, size=(samples, points, 1))
+    rows = np.concatenate([np.clip(xy, 0.0, 1.0), z], axis=2).reshape(samples, -1)
+    return (rows / rows.max(axis=1, keepdims=True)).astype(np.float32)
+
+
+def load_calibration(path, input_dim=63):
+    """Read calibration rows; returns (inputs, labels or None).
+
+    `.npy`: an N x input_dim array of normalized rows. `.npz`: "landmarks"
+    plus optional "labels" (class indices or names).
+    """
+    if path.lower().endswith('.npz'):
+        with np.load(path, allow_pickle=False) as data:
+            inputs = data['landmarks']
+            labels = data['labels'] if 'labels' in data else None
+    else:
+        inputs, labels = np.load(path, allow_pickle=False), None
+    inputs = np.asarray(inputs, dtype=np.float32).reshape(-1, input_dim)
+    if labels is not None and labels.dtype.kind in 'US':
+        from palmspeak.engine import ASL_CLASSES
+        labels = np.array([ASL_CLASSES.index(str(label)) for label in labels])
+    return inputs, labels
+
+
+def calibration_rows(path, input_dim=63):
+    """Calibration rows from PALMSPEAK_CALIBRATION_DATA-style `path`, or synthetic ones"""
+    if path:
+        return load_calibration(path, input_dim)[0]
+    return synthetic_landmarks(input_dim)
+
+
+def extract_calibration(source, every=1, limit=2000):
+    """Landmark rows found by MediaPipe in a video file or image folder"""
+    import logging
+    from palmspeak.engine import RecognitionEngine
+    from palmspeak.transcribe import frame_source
+    from palmspeak.vision import normalize_landmarks
+
+    engine = RecognitionEngine(num_workers=0, logger=logging.getLogger('palmspeak-variants'))
+    rows = []
+    try:
+        frames, _ = frame_source(source, every=every)
+        for _, _, image in frames:
+            landmarks = engine.extract_hand_landmarks(image)
+            if landmarks is not None:
+                rows.append(normalize_landmarks(landmarks)[0])
+                if len(rows) >= limit:
+                    break
+    finally:
+        engine.hand_detectors.close()
+    if not rows:
+        raise ValueError(f"No hands found in {source}")
+    return np.asarray(rows, dtype=np.float32)
+
+
+def measure_latency(backend, inputs, repeat=300, batch_size=64):
+    """p50/p95 of single-row predict (ms) and batched rows per second"""
+    rows = inputs[:1]
+    for _ in range(20):
+        backend.predict(rows)
+    samples = []
+    for i in range(repeat):
+        row = inputs[i % len(inputs)][None, :]
+        started = time.perf_counter()
+        backend.predict(row)
+        samples.append(time.perf_counter() - started)
+    samples = np.array(samples) * 1000
+
+    batch = np.resize(inputs, (batch_size, inputs.shape[1]))
+    backend.predict(batch)
+    runs = max(10, repeat // 10)
+    started = time.perf_counter()
+    for _ in range(runs):
+        backend.predict(batch)
+    elapsed = time.perf_counter() - started
+    return {
+        'single_p50_ms': float(np.percentile(samples, 50)),
+        'single_p95_ms': float(np.percentile(samples, 95)),
+        'batch_rows_per_s': batch_size * runs / elapsed,
+    }
+
+
+def model_size(backend):
+    """Bytes the variant's weights take (the flatbuffer for tflite)"""
+    if backend.name == 'tflite':
+        return len(backend.model_content)
+    if backend.name == 'numpy':
+        return backend.weight_bytes
+    return None
+
+
+def evaluate(backend, reference, inputs, labels=None):
+    """Accuracy and latency of one variant against the reference model"""
+    expected = reference.predict(inputs)
+    actual = backend.predict(inputs)
+    result = {
+        'backend': backend.name,
+        'precision': backend.precision,
+        'size_bytes': model_size(backend),
+        'agreement': float(np.mean(actual.argmax(axis=1) == expected.argmax(axis=1))),
+        'max_abs_diff': float(np.max(np.abs(actual - expected))),
+        'mean_abs_diff': float(np.mean(np.abs(actual - expected))),
+    }
+    if labels is not None:
+        result['accuracy'] = float(np.mean(actual.argmax(axis=1) == labels))
+    result.update(measure_latency(backend, inputs))
+    return result
+
+
+def add_arguments(parser):
+    parser.add_argument('--output', '-o', help="Write the report as JSON")
+    parser.add_argument('--calibration',
+                        help="Landmark rows (.npy / .npz with landmarks and optional labels), "
+                             "or a video / image folder to extract them from with MediaPipe")
+    parser.add_argument('--save-calibration', help="Save the rows extracted from a video / image folder (.npz)")
+    parser.add_argument('--every', type=int, default=1, help="Use every Nth frame of a video / image folder")
+    parser.add_argument('--backends', default='numpy,tflite',
+                        help="Comma-separated backends to measure (float32 only for those without variants)")
+
+
+def main(args):
+    from tensorflow.keras.models import load_model as tf_load_model
+    from palmspeak.engine import MODEL_PATH, resource_path
+    from palmspeak.inference import KerasBackend, create_backend
+
+    model_path = resource_path(MODEL_PATH)
+    model = tf_load_model(model_path)
+    reference = KerasBackend(model)
+
+    labels = None
+    source = 'synthetic'
+    if args.calibration and os.path.splitext(args.calibration)[1].lower() in ('.npy', '.npz'):
+        inputs, labels = load_calibration(args.calibration, reference.input_dim)
+        source = os.path.abspath(args.calibration)
+    elif args.calibration:
+        inputs = extract_calibration(args.calibration, every=max(1, args.every))
+        source = os.path.abspath(args.calibration)
+        if args.save_calibration:
+            np.savez(args.save_calibration, landmarks=inputs)
+            print(f"Saved {len(inputs)} calibration rows -> {args.save_calibration}", file=sys.stderr)
+    else:
+        inputs = synthetic_landmarks(reference.input_dim)
+
+    results = [evaluate(reference, reference, inputs, labels)]
+    for backend_name in args.backends.split(','):
+        base = create_backend(backend_name, model)
+        for precision in PRECISIONS:
+            if precision != DEFAULT_PRECISION and backend_name not in VARIANT_BACKENDS:
+                continue
+            print(f"Measuring {backend_name} {precision}...", file=sys.stderr)
+            results.append(evaluate(build_variant(base, model, precision, inputs), reference, inputs, labels))
+
+    report = {
+        'model': os.path.basename(model_path),
+        'calibration': {'source': source, 'rows': len(inputs), 'labelled': labels is not None},
+        'min_agreement': MIN_AGREEMENT,
+        'platform': platform.platform(),
+        'variants': results,
+    }
+    print(f"{'Backend':<10}{'Precision':<10}{'Size KB':>9}{'Agree':>8}{'Max diff':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'Rows/s':>10}")
+    for r in results:
+        size = f"{r['size_bytes'] / 1024:.1f}" if r['size_bytes'] else '-'
+        print(f"{r['backend']:<10}{r['precision']:<10}{size:>9}"
+              f"{r['agreement']:>8.1%}{r['max_abs_diff']:>10.2e}{r['single_p50_ms']:>9.3f}"
+              f"{r['single_p95_ms']:>9.3f}{r['batch_rows_per_s']:>10.0f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    return 0
@@ -0,0 +1,188 @@
+"""
+Image and landmark helpers shared by the in-process and worker pipelines
+
+The hot path helpers take an optional FrameBuffers: colour conversion,
+resizing, landmark extraction and normalization then write into that
+preallocated storage instead of allocating new arrays for every frame.
+"""
+
+import queue
+from contextlib import contextmanager
+
+import numpy as np
+import cv2
+
+HAND_POINTS = 21
+
+
+class FrameBuffers:
+    """Preallocated images, landmarks and model rows for one frame at a time.
+
+    Arrays returned by helpers given these buffers are views into them, valid
+    until the owner's next frame; copy anything that must outlive it.
+    """
+
+    def __init__(self, max_hands=1, input_dim=HAND_POINTS * 3):
+        self.landmarks = np.empty((max_hands, HAND_POINTS, 3), dtype=np.float32)
+        self.inputs = np.empty((max_hands, input_dim), dtype=np.float32)
+        self.scale = np.empty((max_hands, 1), dtype=np.float32)
+        self._images = {}
+
+    def image(self, name, height, width):
+        """Contiguous (height, width, 3) uint8 view of the named buffer, grown if the frame is larger"""
+        size = height * width * 3
+        storage = self._images.get(name)
+        if storage is None or storage.size < size:
+            storage = self._images[name] = np.empty(size, dtype=np.uint8)
+        return storage[:size].reshape(height, width, 3)
+
+
+class BufferPool:
+    """Lease FrameBuffers to one request at a time; grows to the number of concurrent frames"""
+
+    def __init__(self, create_buffers):
+        self.create_buffers = create_buffers
+        self._free = queue.LifoQueue()
+
+    @contextmanager
+    def lease(self):
+        try:
+            buffers = self._free.get_nowait()
+        except queue.Empty:
+            buffers = self.create_buffers()
+        try:
+            yield buffers
+        finally:
+            self._free.put(buffers)
+
+
+def decode_image(buffer):
+    """Decode an encoded JPEG/PNG buffer into a BGR image"""
+    img_array = np.frombuffer(buffer, dtype=np.uint8)
+    img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Failed to decode image")
+    return img
+
+
+def process_hands(hands, image):
+    """Run a MediaPipe Hands instance on a BGR image and return the primary hand's flat landmarks (or None)"""
+    return detect_landmarks(hands, to_rgb(image))
+
+
+def to_rgb(image, buffers=None):
+    """Convert a BGR image to RGB (MediaPipe requires RGB)"""
+    if buffers is None:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=buffers.image('rgb', image.shape[0], image.shape[1]))
+
+
+def detect_landmarks(hands, image_rgb):
+    """Run MediaPipe Hands on an RGB image and return the primary hand's flat landmarks (or None)"""
+    detected = detect_hands(hands, image_rgb)
+    return primary_hand(detected)[0].reshape(-1) if detected else None
+
+
+def detect_hands(hands, image_rgb, buffers=None):
+    """Run MediaPipe Hands on an RGB image; returns a list of (21x3 landmarks, handedness, score).
+
+    Handedness is MediaPipe's "Left"/"Right" label, which assumes a mirrored
+    (selfie) image; it is None if MediaPipe did not classify the hand. With
+    `buffers`, the landmarks are written into buffers.landmarks.
+    """
+    results = hands.process(image_rgb)
+    if not results.multi_hand_landmarks:
+        return []
+
+    handedness = getattr(results, 'multi_handedness', None) or []
+    detected = []
+    for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+        if buffers is not None and i < len(buffers.landmarks):
+            landmarks = buffers.landmarks[i]
+        else:
+            landmarks = np.empty((HAND_POINTS, 3), dtype=np.float32)
+        fill_landmarks(landmarks, hand_landmarks.landmark)
+        label, score = None, None
+        if i < len(handedness):
+            classification = handedness[i].classification[0]
+            label, score = classification.label, float(classification.score)
+        detected.append((landmarks, label, score))
+    return detected
+
+
+def fill_landmarks(out, points):
+    """Copy MediaPipe landmark protos into a (21, 3) float32 array, one column at a time"""
+    out[:, 0] = [point.x for point in points]
+    out[:, 1] = [point.y for point in points]
+    out[:, 2] = [point.z for point in points]
+    return out
+
+
+def hand_bbox(landmarks):
+    """Normalized (x, y, width, height) box around one hand's landmarks"""
+    points = np.asarray(landmarks).reshape(-1, 3)
+    x_min, y_min = points[:, 0].min(), points[:, 1].min()
+    x_max, y_max = points[:, 0].max(), points[:, 1].max()
+    return (float(x_min), float(y_min), float(x_max - x_min), float(y_max - y_min))
+
+
+def primary_hand(detected):
+    """The largest detected hand (the signer nearest the camera)"""
+    return max(detected, key=lambda hand: _area(hand_bbox(hand[0])))
+
+
+def _area(bbox):
+    return bbox[2] * bbox[3]
+
+
+def normalize_landmarks(landmarks):
+    """Reshape one hand's landmarks to a model row and normalize as in training"""
+    landmarks = landmarks.reshape(1, 63)  # 21 landmarks × 3 coordinates
+    return landmarks / _row_scale(landmarks)
+
+
+def _row_scale(batch, out=None):
+    """Each row's max, the training normalization; 1 for rows with no positive value (no NaN/inf)"""
+    scale = np.max(batch, axis=1, keepdims=True, out=out)
+    np.copyto(scale, 1.0, where=scale <= 0)
+    return scale
+
+
+def normalize_hands(hands_landmarks, buffers=None):
+    """Stack several hands' landmarks into an N x 63 batch, each row normalized as in training"""
+    count = len(hands_landmarks)
+    if buffers is None or count > len(buffers.inputs):
+        batch = np.asarray(hands_landmarks, dtype=np.float32).reshape(count, 63)
+        return batch / _row_scale(batch)
+    batch = buffers.inputs[:count]
+    for row, landmarks in zip(batch, hands_landmarks):
+        row[:] = landmarks.reshape(-1)
+    return np.divide(batch, _row_scale(batch, buffers.scale[:count]), out=batch)
+
+
+def hand_results(detected, probabilities, with_landmarks=False):
+    """Per-hand results for detected hands and their model rows, largest hand first.
+
+    `with_landmarks` adds a copy of each hand's landmarks (for traffic capture).
+    """
+    results = [{'probabilities': row, 'handedness': label, 'score': score, 'bbox': hand_bbox(landmarks)}
+               for (landmarks, label, score), row in zip(detected, probabilities)]
+    if with_landmarks:
+        for result, (landmarks, _, _) in zip(results, detected):
+            result['landmarks'] = np.array(landmarks, dtype=np.float32).reshape(21, 3)
+    results.sort(key=lambda hand: _area(hand['bbox']), reverse=True)
+    return results
+
+
+def blank_frame(height=480, width=640):
+    """Black BGR frame used to warm up MediaPipe before the first request"""
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def frame_thumbnail(buffer, size=(32, 24)):
+    """Small grayscale thumbnail of an encoded frame for near-duplicate checks (None if undecodable)"""
+    # JPEG decodes straight to 1/8 scale; other formats are decoded then shrunk
+    img = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None:
+        return None
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,285 @@
+"""
+Process-pool execution mode for the vision pipeline.
+
+Decoding, MediaPipe and the classifier all hold the GIL for most of a frame,
+so one Control Centre process saturates a single core. VisionWorkerPool starts
+N worker processes, each with its own MediaPipe graph and model. Every worker
+owns a shared-memory slot: the front end copies the encoded frame into the
+slot and sends only its length over the worker's pipe, and the worker replies
+with the frame's class probabilities (or None when no hand was found).
+Smoothing stays in the front end, where the session state lives.
+
+A worker that dies or takes longer than the frame timeout is replaced in a
+background thread; its frame, and frames that find no worker left to wait
+for, are answered with WorkersUnavailable (503) until the replacement is ready.
+"""
+
+import time
+import multiprocessing
+import queue
+import threading
+from multiprocessing import shared_memory
+
+from palmspeak.roi import FULL_FRAME
+
+DEFAULT_SLOT_SIZE = 4 * 1024 * 1024
+# Longest a frame waits for a free worker before it is answered with 503
+DEFAULT_ACQUIRE_TIMEOUT = 5.0
+# Longest a worker may take over one frame before it is treated as crashed
+DEFAULT_FRAME_TIMEOUT = 10.0
+
+
+class WorkersUnavailable(RuntimeError):
+    """No worker became free in time, or the pool has stopped"""
+
+
+def _worker_main(conn, shm_name, model_path, backend_name, cache_dir, precision, calibration_path,
+                 max_hands, with_landmarks):
+    """Worker process loop: decode -> landmarks -> model for frames in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        import numpy as np
+        import mediapipe as mp
+        from palmspeak.artifacts import load_inference
+        from palmspeak.roi import hands_to_full_frame
+        from palmspeak.vision import (decode_image, to_rgb, detect_hands, normalize_hands, hand_results,
+                                      process_hands, blank_frame, FrameBuffers)
+
+        # The front end has already populated the artifact cache, so this skips Keras
+        backend, _ = load_inference(model_path, backend_name, cache_dir,
+                                    precision=precision, calibration_path=calibration_path)
+        hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=max_hands)
+        process_hands(hands, blank_frame())
+        backend.predict(np.zeros((1, backend.input_dim), dtype=np.float32))
+        # This worker's RGB frame, landmarks and model rows, reused for every frame
+        buffers = FrameBuffers(max_hands, backend.input_dim)
+    except Exception as e:
+        conn.send(('error', f"Worker startup failed: {str(e)}"))
+        shm.close()
+        return
+    conn.send(('ready', backend.name))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            length, payload, region = message
+            try:
+                # Oversized frames arrive inline instead of through the slot
+                frame = shm.buf[:length] if payload is None else payload
+                try:
+                    img = decode_image(frame)
+                finally:
+                    del frame
+                # Landmarks of a client-uploaded region go back to full-capture coordinates
+                detected = hands_to_full_frame(detect_hands(hands, to_rgb(img, buffers), buffers), region,
+                                               in_place=True)
+                if not detected:
+                    conn.send(('ok', []))
+                else:
+                    # All hands of the frame in one forward pass
+                    inputs = normalize_hands([landmarks for landmarks, _, _ in detected], buffers)
+                    conn.send(('ok', hand_results(detected, backend.predict(inputs), with_landmarks)))
+            except Exception as e:
+                conn.send(('error', str(e)))
+    finally:
+        hands.close()
+        shm.close()
+
+
+class _Worker:
+    """Front-end handle for one worker process"""
+
+    def __init__(self, context, index, slot_size, model_path, backend_name, cache_dir,
+                 precision, calibration_path, max_hands, with_landmarks):
+        self.index = index
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_size)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, model_path, backend_name, cache_dir,
+                  precision, calibration_path, max_hands, with_landmarks),
+            name=f'palmspeak-worker-{index}',
+            daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.backend_name = None
+
+    def wait_ready(self):
+        try:
+            status, detail = self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"Vision worker {self.index} exited during startup")
+        if status != 'ready':
+            raise RuntimeError(detail)
+        self.backend_name = detail
+
+    def process_frame(self, image_bytes, region, timeout):
+        length = len(image_bytes)
+        if length <= self.shm.size:
+            self.shm.buf[:length] = image_bytes
+            self.conn.send((length, None, region))
+        else:
+            self.conn.send((length, bytes(image_bytes), region))
+        # TimeoutError is an OSError, so a hung worker is restarted like a crashed one
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"no reply within {timeout:g}s")
+        status, result = self.conn.recv()
+        if status != 'ok':
+            raise ValueError(result)
+        return result
+
+    def stop(self, timeout=2.0):
+        try:
+            self.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class VisionWorkerPool:
+    """Dispatch frames to a pool of vision worker processes"""
+
+    def __init__(self, num_workers, model_path, backend_name, cache_dir=None, max_hands=1,
+                 precision='float32', calibration_path=None, slot_size=DEFAULT_SLOT_SIZE, logger=None,
+                 with_landmarks=False, acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT,
+                 frame_timeout=DEFAULT_FRAME_TIMEOUT):
+        self.num_workers = num_workers
+        self.model_path = model_path
+        self.backend_name = backend_name
+        self.cache_dir = cache_dir
+        self.max_hands = max_hands
+        # Results carry each hand's landmarks (landmark traffic capture)
+        self.with_landmarks = with_landmarks
+        self.precision = precision
+        self.calibration_path = calibration_path
+        self.slot_size = slot_size
+        self.acquire_timeout = acquire_timeout
+        self.frame_timeout = frame_timeout
+        self.logger = logger
+        # Spawn keeps TensorFlow and MediaPipe state out of the children on every platform
+        self._context = multiprocessing.get_context('spawn')
+        self._workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        # Workers being replaced in the background
+        self.restarting = 0
+        self.running = False
+
+    def __len__(self):
+        return len(self._workers)
+
+    def start(self):
+        """Start the workers and block until each has loaded its model"""
+        try:
+            for index in range(self.num_workers):
+                self._workers.append(self._spawn(index))
+            for worker in self._workers:
+                worker.wait_ready()
+                self._idle.put(worker)
+        except Exception:
+            self.stop()
+            raise
+        self.running = True
+        if self.logger:
+            self.logger.info(f"Started {self.num_workers} vision worker processes "
+                             f"(backend: {self._workers[0].backend_name})")
+
+    def process(self, image_bytes, region=FULL_FRAME):
+        """Run one encoded frame through a free worker; returns per-hand results (see hand_results).
+
+        `region` is the part of the client's full capture the frame covers.
+        """
+        worker = self._acquire()
+        try:
+            return worker.process_frame(image_bytes, region, self.frame_timeout)
+        except (EOFError, OSError) as e:
+            crashed, worker = worker, None
+            self._begin_restart(crashed, e)
+            raise WorkersUnavailable(f"Vision worker {crashed.index} crashed, restarting") from e
+        finally:
+            if worker is not None and self.running:
+                self._idle.put(worker)
+
+    def stop(self):
+        """Stop all workers and release their shared memory"""
+        self.running = False
+        with self._lock:
+            workers, self._workers = self._workers, []
+        # Waiting frames see the pool stopped instead of picking up a stopped worker
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self):
+        """Take an idle worker; WorkersUnavailable on timeout or once the pool stops"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while self.running:
+            with self._lock:
+                if not self._workers:
+                    raise WorkersUnavailable("All vision workers are restarting")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WorkersUnavailable(f"No vision worker free within {self.acquire_timeout:g}s")
+            try:
+                # Short waits, so a pool that stops (or loses its last worker) is noticed
+                return self._idle.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                pass
+        raise WorkersUnavailable("Vision worker pool is stopped")
+
+    def _spawn(self, index):
+        return _Worker(self._context, index, self.slot_size, self.model_path,
+                       self.backend_name, self.cache_dir, self.precision, self.calibration_path,
+                       self.max_hands, self.with_landmarks)
+
+    def _begin_restart(self, worker, error):
+        """Replace a crashed worker without holding up the request that found it"""
+        if self.logger:
+            self.logger.error(f"Vision worker {worker.index} failed: {str(error)}; restarting")
+        with self._lock:
+            self._workers = [w for w in self._workers if w is not worker]
+            self.restarting += 1
+        threading.Thread(target=self._restart, args=(worker,), name=f'palmspeak-restart-{worker.index}',
+                         daemon=True).start()
+
+    def _restart(self, worker):
+        worker.stop(timeout=0.5)
+        replacement = None
+        try:
+            if self.running:
+                replacement = self._spawn(worker.index)
+                replacement.wait_ready()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Vision worker {worker.index} could not be restarted: {str(e)}")
+            if replacement is not None:
+                replacement.stop(timeout=0.5)
+            replacement = None
+        with self._lock:
+            self.restarting -= 1
+            if replacement is not None and self.running:
+                self._workers.append(replacement)
+                self._idle.put(replacement)
+                if self.logger:
+                    self.logger.info(f"Vision worker {worker.index} restarted")
+                return
+            if not self._workers and not self.restarting:
+                self.running = False
+        # The pool stopped while the replacement was starting
+        if replacement is not None:
+            replacement.stop(timeout=0.5)
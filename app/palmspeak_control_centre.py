@@ -23,29 +23,20 @@ PalmSpeak Control Centre - Tkinter GUI for ASL Recognition API
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
-import queue
 import logging
 import sys
 import os
-from flask import Flask, request, jsonify
-import numpy as np
-from tensorflow.keras.models import load_model as tf_load_model
-from PIL import Image
-import io
-import base64
-from flask_cors import CORS
-import traceback
-import cv2
-import mediapipe as mp
-from collections import deque, Counter
+import multiprocessing
 import socket
 from contextlib import closing
+from palmspeak.engine import RecognitionEngine, resource_path
+from palmspeak.logs import RingBufferHandler, configure_logging
 
 class PalmSpeakControlCentre:
     def __init__(self, root):
         self.root = root
         self.root.title("PalmSpeak Control Centre")
-        self.root.geometry("600x500")
+        self.root.geometry("600x680")
         self.root.resizable(True, True)
         
         # Set window colors
@@ -68,35 +59,22 @@ class PalmSpeakControlCentre:
         self.configure_styles(style)
         
         # API Server variables
-        self.flask_app = None
-        self.server_thread = None
         self.server_running = False
-        self.port = int(os.environ.get('PORT', 5000))
-        
-        # Model variables
-        self.model = None
-        self.model_loaded = False
-        self.ASL_CLASSES = [
-            'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
-            'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-            'del', 'nothing', 'space'
-        ]
-        self.prediction_buffer = deque(maxlen=10)
-        self.CONFIDENCE_THRESHOLD = 0.3
-        
-        # Initialize MediaPipe
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=True, max_num_hands=1)
         
         # Logging setup
-        self.log_queue = queue.Queue()
+        self.max_log_lines = int(os.environ.get('PALMSPEAK_LOG_MAX_LINES', 2000))
         self.setup_logging()
         
+        # Recognition service (model, MediaPipe, API server)
+        self.engine = RecognitionEngine(logger=self.logger)
+        self.port = self.engine.port
+        
         # Create GUI
         self.create_widgets()
         
         # Start log processing
         self.process_log_queue()
+        self.refresh_metrics()
         
         # Try to load model on startup
         self.load_model_async()
@@ -176,11 +154,13 @@ class PalmSpeakControlCentre:
         self.logger = logging.getLogger('palmspeak-control')
         self.logger.setLevel(logging.INFO)
         
-        # Create handler that puts messages in queue
-        handler = QueueHandler(self.log_queue)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        # Bounded buffer drained by the log view every 100 ms
+        self.log_handler = RingBufferHandler(int(os.environ.get('PALMSPEAK_LOG_BUFFER', 1000)))
+        self.log_handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger.addHandler(self.log_handler)
+        
+        # Rate limiting and the optional log file
+        self.log_listener = configure_logging(self.logger)
     
     def create_widgets(self):
         """Create the GUI widgets"""
@@ -288,33 +268,31 @@ class PalmSpeakControlCentre:
                                   command=self.clear_log, 
                                   style="RoundedStart.TButton")
         clear_log_btn.grid(row=1, column=0, pady=(10, 0))
+        
+        # Live latency summary
+        metrics_frame = ttk.LabelFrame(main_frame, text="Performance", 
+                                      padding="10", style='Card.TLabelframe')
+        metrics_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E))
+        
+        self.metrics_label = ttk.Label(metrics_frame, text="No requests yet",
+                                       font=('Consolas', 9), background='white',
+                                       foreground='#2C3E50', justify=tk.LEFT)
+        self.metrics_label.grid(row=0, column=0, sticky=tk.W)
     
     def resource_path(self, relative_path):
         """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-        return os.path.join(base_path, relative_path)
+        return resource_path(relative_path)
     
     def load_model_async(self):
         """Load the model in a separate thread"""
         def load_model():
             try:
-                model_path = self.resource_path('alphabet_keras/asl_alphabet_model.h5')
-                
-                if not os.path.exists(model_path):
-                    self.logger.error(f"Model file not found: {model_path}")
-                    self.root.after(0, lambda: self.update_model_status("Not Found", "red"))
-                    return
-                
-                self.logger.info("Loading ASL model...")
-                self.model = tf_load_model(model_path)
-                self.model_loaded = True
-                self.logger.info(f"Model loaded successfully. Input shape: {self.model.input_shape}")
-                self.root.after(0, lambda: self.update_model_status("Loaded", "#27AE60"))
+                status = self.engine.load_model()
+                self.root.after(0, lambda: self.update_model_status(status, "#27AE60"))
                 
+            except FileNotFoundError as e:
+                self.logger.error(str(e))
+                self.root.after(0, lambda: self.update_model_status("Not Found", "red"))
             except Exception as e:
                 self.logger.error(f"Model loading failed: {str(e)}")
                 self.root.after(0, lambda: self.update_model_status("Load Failed", "red"))
@@ -340,159 +318,23 @@ class PalmSpeakControlCentre:
             port = s.getsockname()[1]
         return port
     
-    def create_flask_app(self):
-        """Create and configure Flask app"""
-        app = Flask(__name__)
-        CORS(app, resources={r"/*": {"origins": "*"}})
-        
-        @app.route('/predict', methods=['POST'])
-        def predict():
-            return self.handle_predict(request)
-        
-        @app.route('/clear-buffer', methods=['POST'])
-        def clear_buffer():
-            self.prediction_buffer.clear()
-            return jsonify({
-                'status': 'success',
-                'message': 'Prediction buffer cleared'
-            })
-        
-        @app.route('/health', methods=['GET'])
-        def health_check():
-            return jsonify({
-                'status': 'healthy' if self.model_loaded else 'unhealthy',
-                'model_loaded': self.model_loaded,
-                'buffer_size': len(self.prediction_buffer)
-            })
-        
-        return app
-    
-    def handle_predict(self, request):
-        """Handle prediction requests"""
-        if not self.model_loaded:
-            return jsonify({'error': 'Model not loaded'}), 500
-        
-        try:
-            data = request.json
-            if not data or 'image' not in data:
-                return jsonify({'error': 'No image data'}), 400
-            
-            # Extract image data
-            image_data = data['image'].split(',')[1] if ',' in data['image'] else data['image']
-            
-            # Decode and process image
-            image_bytes = base64.b64decode(image_data)
-            img_array = np.frombuffer(image_bytes, dtype=np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                raise ValueError("Failed to decode image")
-            
-            # Extract hand landmarks
-            landmarks = self.extract_hand_landmarks(img)
-            
-            if landmarks is None:
-                self.prediction_buffer.append(('nothing', 1.0))
-                most_common = self.get_most_common_prediction()
-                return jsonify({
-                    'letter': most_common[0],
-                    'confidence': most_common[1],
-                    'message': 'No hand detected',
-                    'buffer_size': len(self.prediction_buffer)
-                })
-            
-            # Reshape and normalize landmarks for the model
-            landmarks = landmarks.reshape(1, 63)  # 21 landmarks × 3 coordinates
-            landmarks = landmarks / np.max(landmarks)  # Normalize same as in training
-            
-            # Make prediction
-            predictions = self.model.predict(landmarks)
-            predicted_class_index = np.argmax(predictions[0])
-            predicted_class = self.ASL_CLASSES[predicted_class_index]
-            confidence = float(np.max(predictions[0]))
-            
-            # Add to prediction buffer if confidence is above threshold
-            if confidence > self.CONFIDENCE_THRESHOLD:
-                self.prediction_buffer.append((predicted_class, confidence))
-            
-            # Get most common prediction from buffer
-            most_common = self.get_most_common_prediction()
-            
-            self.logger.info(f"Prediction: {predicted_class} ({confidence:.2%}) -> {most_common[0]}")
-            
-            return jsonify({
-                'letter': most_common[0],
-                'raw_letter': predicted_class,
-                'confidence': most_common[1],
-                'raw_confidence': confidence,
-                'buffer_size': len(self.prediction_buffer)
-            })
-            
-        except Exception as e:
-            self.logger.error(f"Prediction error: {str(e)}")
-            return jsonify({'error': str(e)}), 500
-    
-    def extract_hand_landmarks(self, image):
-        """Extract hand landmarks using MediaPipe"""
-        try:
-            # Convert to RGB (MediaPipe requires RGB)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(image_rgb)
-            
-            if results.multi_hand_landmarks:
-                landmarks = []
-                for hand_landmarks in results.multi_hand_landmarks:
-                    for landmark in hand_landmarks.landmark:
-                        landmarks.extend([landmark.x, landmark.y, landmark.z])
-                return np.array(landmarks)
-            return None
-        except Exception as e:
-            self.logger.error(f"Landmark extraction error: {str(e)}")
-            return None
-    
-    def get_most_common_prediction(self):
-        """Return the most common prediction from the buffer"""
-        if not self.prediction_buffer:
-            return ('nothing', 1.0)
-        
-        # Count the occurrences of each prediction
-        predictions = [item[0] for item in self.prediction_buffer]
-        counts = Counter(predictions)
-        most_common = counts.most_common(1)[0][0]
-        
-        # Calculate average confidence for the most common prediction
-        confidences = [item[1] for item in self.prediction_buffer if item[0] == most_common]
-        avg_confidence = sum(confidences) / len(confidences)
-        
-        return (most_common, avg_confidence)
-    
     def start_api(self):
         """Start the Flask API server"""
         if self.server_running:
             return
         
-        if not self.model_loaded:
-            messagebox.showerror("Error", "Model not loaded. Please wait for model to load first.")
+        if self.engine.load_error:
+            messagebox.showerror("Error", "Model failed to load. Check the log for details.")
             return
+        if not self.engine.model_loaded:
+            self.logger.info("Model still loading; predictions return 503 until it is ready")
         
         try:
             # Use the configured port (from environment or default 5000)
             self.port_label.config(text=str(self.port))
             
-            # Create Flask app
-            self.flask_app = self.create_flask_app()
-            
-            # Start server in separate thread
-            def run_server():
-                try:
-                    self.logger.info(f"Starting API server on port {self.port}")
-                    self.flask_app.run(host='0.0.0.0', port=self.port, debug=False, threaded=True)
-                except Exception as e:
-                    self.logger.error(f"Server error: {str(e)}")
-                    self.root.after(0, self.on_server_stopped)
-            
-            self.server_thread = threading.Thread(target=run_server, daemon=True)
-            self.server_thread.start()
+            # Binds the port here so errors show up, then serves in a separate thread
+            self.engine.start_server(on_exit=self.on_server_exit)
             
             # Update UI
             self.server_running = True
@@ -500,8 +342,6 @@ class PalmSpeakControlCentre:
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
             
-            self.logger.info(f"API server started successfully on port {self.port}")
-            
         except Exception as e:
             self.logger.error(f"Failed to start server: {str(e)}")
             messagebox.showerror("Error", f"Failed to start server: {str(e)}")
@@ -511,19 +351,25 @@ class PalmSpeakControlCentre:
         if not self.server_running:
             return
         
-        try:
-            self.logger.info("Stopping API server...")
-            
-            # Flask doesn't have a clean shutdown method, so we'll just mark as stopped
-            self.server_running = False
-            self.on_server_stopped()
-            
-            # Note: The actual Flask server thread will continue until the process ends
-            # This is a limitation of Flask's development server
-            self.logger.info("API server stop requested (thread may continue until app closes)")
-            
-        except Exception as e:
-            self.logger.error(f"Error stopping server: {str(e)}")
+        self.logger.info("Stopping API server...")
+        self.server_running = False
+        self.stop_button.config(state=tk.DISABLED)
+        
+        # Let in-flight requests finish without blocking the GUI
+        def shutdown():
+            try:
+                self.engine.stop_server()
+            except Exception as e:
+                self.logger.error(f"Error stopping server: {str(e)}")
+            self.root.after(0, self.on_server_stopped)
+        
+        threading.Thread(target=shutdown, daemon=True).start()
+    
+    def on_server_exit(self, error):
+        """Called from the server thread when serving ends"""
+        if error is not None:
+            self.logger.error(f"Server error: {str(error)}")
+            self.root.after(0, self.on_server_stopped)
     
     def on_server_stopped(self):
         """Called when server stops"""
@@ -533,39 +379,77 @@ class PalmSpeakControlCentre:
         self.stop_button.config(state=tk.DISABLED)
     
     def process_log_queue(self):
-        """Process log messages from queue and display in GUI"""
-        try:
-            while True:
-                record = self.log_queue.get_nowait()
-                message = record.getMessage()
-                self.log_text.insert(tk.END, message + '\n')
-                self.log_text.see(tk.END)
-        except queue.Empty:
-            pass
+        """Move buffered log lines into the log view in one insert, keeping at most max_log_lines"""
+        lines, dropped = self.log_handler.drain()
+        if dropped:
+            lines.insert(0, f"... {dropped} log lines dropped ...")
+        if lines:
+            self.log_text.insert(tk.END, '\n'.join(lines) + '\n')
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - self.max_log_lines
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
         
         # Schedule next check
         self.root.after(100, self.process_log_queue)
     
+    def refresh_metrics(self):
+        """Show per-stage latency and frame counters from the engine"""
+        summary = self.engine.metrics.summary()
+        if summary['stages']:
+            lines = [f"{'Stage':<26}{'Count':>8}{'Mean ms':>10}{'p95 ms':>10}"]
+            for stage, stats in summary['stages'].items():
+                lines.append(f"{stage:<26}{stats['count']:>8}{stats['mean_ms']:>10.2f}{stats['p95_ms']:>10.2f}")
+            frames = summary['counters']['frames_total']
+            errors = sum(summary['counters']['errors_total'].values())
+            shed = sum(summary['counters']['shed_total'].values())
+            lines.append(f"Frames: {frames.get('accepted', 0)} accepted, "
+                         f"{frames.get('below_threshold', 0)} below threshold, "
+                         f"{frames.get('no_hand', 0)} no hand  |  Errors: {errors}  |  Shed: {shed}")
+            if self.engine.prediction_cache is not None:
+                cache = self.engine.prediction_cache.snapshot()
+                if cache['hit_rate'] is not None:
+                    lines.append(f"Prediction cache: {cache['hits']} hits, {cache['misses']} misses "
+                                 f"({cache['hit_rate']:.0%}), {cache['entries']} entries")
+            self.metrics_label.config(text='\n'.join(lines))
+        
+        # Schedule next refresh
+        self.root.after(1000, self.refresh_metrics)
+    
     def clear_log(self):
         """Clear the log display"""
         self.log_text.delete(1.0, tk.END)
     
     def on_closing(self):
         """Handle window closing"""
-        if self.server_running:
-            self.stop_api()
+        self.server_running = False
+        self.engine.shutdown()
+        if self.log_listener is not None:
+            self.log_listener.stop()
         self.root.destroy()
 
-class QueueHandler(logging.Handler):
-    """Custom logging handler that puts messages in a queue"""
-    def __init__(self, log_queue):
-        super().__init__()
-        self.log_queue = log_queue
-    
-    def emit(self, record):
-        self.log_queue.put(record)
+def startup_probe(path):
+    """Load the model without the window and write the timing to `path` (build_exe.py's launch report)"""
+    import json
+    import time
+    started = time.perf_counter()
+    engine = RecognitionEngine(logger=logging.getLogger('palmspeak-probe'))
+    result = {'status': None, 'error': None}
+    try:
+        result['status'] = engine.load_model()
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        engine.shutdown()
+    result['model_ready_s'] = time.perf_counter() - started
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    return 0 if result['error'] is None else 1
 
 def main():
+    multiprocessing.freeze_support()  # Vision workers in frozen builds
+    if os.environ.get('PALMSPEAK_STARTUP_PROBE'):
+        sys.exit(startup_probe(os.environ['PALMSPEAK_STARTUP_PROBE']))
     root = tk.Tk()
     app = PalmSpeakControlCentre(root)
     
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from palmspeak.admission import AdmissionController, Overloaded
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def admit_in_thread(controller, session_id, outcome):
+    def run():
+        try:
+            with controller.admit(session_id):
+                outcome['admitted'] = True
+        except Overloaded as e:
+            outcome['shed'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_admits_up_to_max_in_flight_without_waiting():
+    controller = AdmissionController(max_in_flight=2, max_pending=0)
+    with controller.admit('a'), controller.admit('b'):
+        assert controller.in_flight == 2
+    assert controller.in_flight == 0
+    assert controller.admitted == 2
+
+
+def test_full_queue_sheds_with_503():
+    controller = AdmissionController(max_in_flight=1, max_pending=0)
+    with controller.admit('a'):
+        with pytest.raises(Overloaded) as info:
+            controller.admit('b')
+    assert (info.value.reason, info.value.status) == ('queue_full', 503)
+    assert info.value.retry_after > 0
+    assert controller.shed['queue_full'] == 1
+
+
+def test_wait_past_max_wait_sheds_with_503():
+    controller = AdmissionController(max_in_flight=1, max_pending=4, max_wait=0.05)
+    with controller.admit('a'):
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as info:
+            controller.admit('b')
+    assert (info.value.reason, info.value.status) == ('timeout', 503)
+    assert time.monotonic() - started >= 0.05
+    assert controller.pending == 0
+
+
+def test_newer_frame_supersedes_queued_one_with_429():
+    controller = AdmissionController(max_in_flight=1, max_pending=4, max_wait=2.0)
+    first, second = {}, {}
+    with controller.admit('other'):
+        older = admit_in_thread(controller, 'session', first)
+        wait_for(lambda: controller.pending == 1)
+        newer = admit_in_thread(controller, 'session', second)
+        older.join(timeout=2.0)
+        assert (first['shed'].reason, first['shed'].status) == ('superseded', 429)
+        assert controller.pending == 1
+    newer.join(timeout=2.0)
+    assert second == {'admitted': True}
+    assert controller.snapshot()['shed'] == {'superseded': 1, 'queue_full': 0, 'timeout': 0}
+
+
+def test_requests_without_session_do_not_supersede():
+    controller = AdmissionController(max_in_flight=1, max_pending=4, max_wait=2.0)
+    outcomes = [{}, {}]
+    with controller.admit(None):
+        threads = [admit_in_thread(controller, None, outcome) for outcome in outcomes]
+        wait_for(lambda: controller.pending == 2)
+    for thread in threads:
+        thread.join(timeout=2.0)
+    assert outcomes == [{'admitted': True}, {'admitted': True}]
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from palmspeak.batching import MicroBatcher
+
+
+@pytest.fixture
+def batcher():
+    calls = []
+
+    def predict(inputs):
+        calls.append(len(inputs))
+        time.sleep(0.01)  # Let concurrent callers queue up behind the running batch
+        return inputs[:, :2] * 10
+
+    batcher = MicroBatcher(predict, max_batch_size=16, max_wait=0.05)
+    batcher.calls = calls
+    yield batcher
+    batcher.stop()
+
+
+def test_concurrent_callers_get_their_own_rows(batcher):
+    results = {}
+
+    def call(i):
+        # Caller i sends 1-3 rows tagged with its own index
+        inputs = np.full((i % 3 + 1, 4), i, dtype=np.float32)
+        inputs[:, 1] = np.arange(len(inputs))
+        results[i] = (inputs, batcher.predict(inputs))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(24)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for inputs, output in results.values():
+        np.testing.assert_array_equal(output, inputs[:, :2] * 10)
+    assert sum(batcher.calls) == sum(i % 3 + 1 for i in range(24))
+    # A batch closes once it reaches 16 rows, so the last caller may take it past that
+    assert len(batcher.calls) < 24 and max(batcher.calls) < 16 + 3
+    assert batcher.stats.snapshot()['requests'] == 24
+
+
+def test_lone_caller_skips_the_window():
+    batcher = MicroBatcher(lambda inputs: inputs, max_wait=1.0)
+    try:
+        started = time.perf_counter()
+        batcher.predict(np.ones((1, 4)))
+        assert time.perf_counter() - started < 0.5
+    finally:
+        batcher.stop()
+
+
+def test_backend_errors_reach_every_caller_in_the_batch():
+    def predict(inputs):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(predict)
+    try:
+        with pytest.raises(ValueError, match='bad batch'):
+            batcher.predict(np.ones((2, 4)))
+    finally:
+        batcher.stop()
+    with pytest.raises(RuntimeError, match='stopped'):
+        batcher.predict(np.ones((1, 4)))
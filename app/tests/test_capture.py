@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from palmspeak.capture import CaptureWriter, CaptureLog, KIND_FRAME, KIND_LANDMARKS, NO_CLASS
+
+CLASSES = ['A', 'B', 'C']
+
+
+def response(raw_letter, letter, confidence=0.75):
+    return {'raw_letter': raw_letter, 'letter': letter, 'raw_confidence': confidence, 'confidence': confidence}
+
+
+def test_write_then_replay_round_trip(tmp_path):
+    path = str(tmp_path / 'traffic.pslog')
+    first_hand = np.arange(63, dtype=np.float32).reshape(1, 21, 3)
+    two_hands = np.linspace(0, 1, 126, dtype=np.float32).reshape(2, 21, 3)
+
+    writer = CaptureWriter(path, CLASSES)
+    writer.record_frame(10.0, 'session-1', b'\xff\xd8jpeg', (0.25, 0.5, 0.5, 0.25),
+                        [{'letter': 'B'}], response('B', 'A'))
+    writer.record_landmarks(10.5, 'session-2', first_hand, response('C', 'C', 0.5))
+    writer.record_landmarks(11.0, 'session-2', two_hands, response('A', 'nothing'))
+    writer.record_landmarks(11.5, '', None, response(None, 'nothing'))
+    assert writer.snapshot()['records'] == 4
+    writer.close()
+
+    with CaptureLog(path) as log:
+        records = list(log)
+        assert [record.kind for record in records] == [KIND_FRAME, KIND_LANDMARKS, KIND_LANDMARKS, KIND_LANDMARKS]
+        frame = records[0]
+        assert (frame.timestamp, frame.session, frame.hands) == (10.0, 'session-1', 1)
+        assert frame.region == (0.25, 0.5, 0.5, 0.25)
+        assert bytes(frame.payload) == b'\xff\xd8jpeg'
+        assert (frame.raw_class, frame.letter_class) == (1, 0)
+        assert frame.raw_confidence == pytest.approx(0.75)
+
+        np.testing.assert_array_equal(records[1].landmarks, first_hand)
+        np.testing.assert_array_equal(records[2].landmarks, two_hands)
+        assert records[2].letter_class == NO_CLASS
+        assert (records[3].hands, records[3].session, len(records[3].payload)) == (0, '', 0)
+
+        rows, labels = log.landmark_rows()
+        np.testing.assert_array_equal(rows, np.concatenate([first_hand, two_hands]).reshape(-1, 63))
+        assert labels.tolist() == [2, 0, NO_CLASS]
+        del records, frame, rows
+
+
+def test_landmarks_mode_stores_hands_instead_of_frames(tmp_path):
+    path = str(tmp_path / 'landmarks.pslog')
+    landmarks = np.ones((21, 3), dtype=np.float32)
+    writer = CaptureWriter(path, CLASSES, mode='landmarks')
+    writer.record_frame(1.0, 's', b'frame bytes', (0.0, 0.0, 1.0, 1.0),
+                        [{'letter': 'A', 'landmarks': landmarks.tolist()}], response('A', 'A'))
+    writer.close()
+    with CaptureLog(path) as log:
+        (record,) = list(log)
+        assert record.kind == KIND_LANDMARKS
+        np.testing.assert_array_equal(record.landmarks[0], landmarks)
+        del record
+
+
+def test_appends_to_existing_capture_and_stops_at_size_limit(tmp_path):
+    path = str(tmp_path / 'limited.pslog')
+    writer = CaptureWriter(path, CLASSES)
+    writer.record_frame(1.0, 's', b'x' * 100, (0.0, 0.0, 1.0, 1.0), [], response(None, 'nothing'))
+    writer.close()
+
+    writer = CaptureWriter(path, CLASSES, max_bytes=writer.size + 200)
+    writer.record_frame(2.0, 's', b'y' * 100, (0.0, 0.0, 1.0, 1.0), [], response(None, 'nothing'))
+    writer.record_frame(3.0, 's', b'z' * 100, (0.0, 0.0, 1.0, 1.0), [], response(None, 'nothing'))
+    assert (writer.records, writer.skipped) == (1, 1)
+    writer.close()
+    with CaptureLog(path) as log:
+        assert [record.timestamp for record in log] == [1.0, 2.0]
+
+
+def test_truncated_record_ends_the_log(tmp_path):
+    path = str(tmp_path / 'truncated.pslog')
+    writer = CaptureWriter(path, CLASSES)
+    for timestamp in (1.0, 2.0):
+        writer.record_frame(timestamp, 's', b'frame', (0.0, 0.0, 1.0, 1.0), [], response(None, 'nothing'))
+    writer.close()
+    with open(path, 'r+b') as f:
+        f.truncate(writer.size - 4)
+    with CaptureLog(path) as log:
+        assert [record.timestamp for record in log] == [1.0]
+
+
+def test_rejects_files_that_are_not_captures(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a capture file')
+    with pytest.raises(ValueError):
+        CaptureLog(str(path))
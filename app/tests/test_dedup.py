@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+import pytest
+
+from palmspeak.dedup import FrameDeduplicator
+from palmspeak.engine import RecognitionEngine
+from palmspeak.sessions import SessionState, SESSION_HEADER
+
+
+def thumbnail(value):
+    return np.full((24, 32), value, dtype=np.uint8)
+
+
+def test_similar_frames_reuse_the_last_computed_result():
+    dedup = FrameDeduplicator(threshold=3.0, max_reuse=2)
+    session = SessionState('client')
+    assert dedup.lookup(session, thumbnail(100)) == (False, None)
+    dedup.store(session, thumbnail(100), ['hands'])
+    assert dedup.lookup(session, thumbnail(102)) == (True, ['hands'])
+    assert dedup.lookup(session, thumbnail(110)) == (False, None)
+    # Reuse is bounded, then the frame is computed again
+    assert dedup.lookup(session, thumbnail(100)) == (True, ['hands'])
+    assert dedup.lookup(session, thumbnail(100)) == (False, None)
+
+
+def test_stale_or_cleared_results_are_not_reused():
+    dedup = FrameDeduplicator(max_age=1.0)
+    session = SessionState('client')
+    dedup.store(session, thumbnail(100), [])
+    session.frame_cache.computed_at -= 2.0
+    assert dedup.lookup(session, thumbnail(100)) == (False, None)
+    dedup.store(session, thumbnail(100), [])
+    session.clear()
+    assert dedup.lookup(session, thumbnail(100)) == (False, None)
+    assert dedup.lookup(session, None) == (False, None)
+
+
+@pytest.fixture
+def engine():
+    engine = RecognitionEngine(port=0, stream_port=0)
+    engine.model_loaded = True
+    engine.computed = 0
+
+    def frame_predictions(image_bytes, session, region=None):
+        engine.computed += 1
+        return []
+
+    engine.frame_predictions = frame_predictions
+    yield engine
+    engine.shutdown()
+
+
+def frame(value):
+    return cv2.imencode('.jpg', np.full((240, 320, 3), value, dtype=np.uint8))[1].tobytes()
+
+
+def post(client, image, session_id='client'):
+    headers = {SESSION_HEADER: session_id} if session_id else {}
+    response = client.post('/predict', data=image, content_type='image/jpeg', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_predict_marks_reused_frames(engine):
+    client = engine.create_flask_app().test_client()
+    assert 'reused' not in post(client, frame(80))
+    assert post(client, frame(80))['reused'] is True
+    assert 'reused' not in post(client, frame(200))
+    assert engine.computed == 2
+
+
+def test_default_session_never_reuses(engine):
+    client = engine.create_flask_app().test_client()
+    for _ in range(3):
+        assert 'reused' not in post(client, frame(80), session_id=None)
+    assert engine.computed == 3
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from palmspeak.hands import HandDetectors
+from palmspeak.sessions import SessionState, DEFAULT_SESSION
+
+
+class FakeHands:
+    def __init__(self, static):
+        self.static = static
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def detectors():
+    return HandDetectors(FakeHands, pool_size=2, max_trackers=1)
+
+
+def test_continuous_session_keeps_its_tracker(detectors):
+    session = SessionState('client')
+    with detectors.lease(session) as first:
+        assert not first.static
+    with detectors.lease(session) as second:
+        assert second is first
+    assert detectors.active_trackers == 1 and detectors.tracks(session)
+
+
+def test_default_session_and_sessions_over_the_limit_use_the_pool(detectors):
+    with detectors.lease(SessionState('first')):
+        pass
+    for session in (SessionState('second'), SessionState(DEFAULT_SESSION), None):
+        with detectors.lease(session) as hands:
+            assert hands.static
+    assert detectors.active_trackers == 1
+
+
+def test_concurrent_frame_of_a_session_borrows_from_the_pool(detectors):
+    session = SessionState('client')
+    with detectors.lease(session) as tracker:
+        with detectors.lease(session) as hands:
+            assert hands.static and hands is not tracker
+
+
+def test_pool_is_bounded_and_reused(detectors):
+    with detectors.lease() as first, detectors.lease() as second:
+        assert first is not second
+        # Both pooled detectors are out, so a third lease waits for one to come back
+        leased = []
+
+        def lease():
+            with detectors.lease() as hands:
+                leased.append(hands)
+
+        thread = threading.Thread(target=lease)
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+    thread.join(1)
+    assert leased and leased[0] in (first, second)
+
+
+def test_release_closes_the_tracker_and_frees_its_slot(detectors):
+    session = SessionState('client')
+    with detectors.lease(session) as tracker:
+        pass
+    detectors.release(session)
+    assert tracker.closed and session.tracker is None
+    assert detectors.active_trackers == 0 and not detectors.tracks(session)
+    # A released (evicted) session never gets a new tracker; another session can
+    with detectors.lease(session) as hands:
+        assert hands.static
+    with detectors.lease(SessionState('next')) as hands:
+        assert not hands.static
+
+
+def test_release_waits_for_the_frame_in_flight(detectors):
+    session = SessionState('client')
+    entered, finish = threading.Event(), threading.Event()
+
+    def frame():
+        with detectors.lease(session):
+            entered.set()
+            finish.wait(1)
+
+    thread = threading.Thread(target=frame)
+    thread.start()
+    entered.wait(1)
+    releaser = threading.Thread(target=detectors.release, args=(session,))
+    releaser.start()
+    releaser.join(0.1)
+    assert releaser.is_alive() and not session.tracker.closed
+    finish.set()
+    thread.join(1)
+    releaser.join(1)
+    assert session.tracker is None and detectors.active_trackers == 0
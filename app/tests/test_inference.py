@@ -0,0 +1,45 @@
+"""Every inference backend must match the Keras model it was built from."""
+
+import os
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from palmspeak.artifacts import save_artifact, read_artifact
+from palmspeak.inference import KerasBackend, create_backend
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'alphabet_keras', 'asl_alphabet_model.h5')
+
+
+@pytest.fixture(scope='module')
+def model():
+    return tf.keras.models.load_model(MODEL_PATH)
+
+
+@pytest.fixture(scope='module')
+def inputs(model):
+    rng = np.random.default_rng(1234)
+    return rng.standard_normal((32, model.input_shape[-1])).astype(np.float32)
+
+
+@pytest.fixture(scope='module')
+def expected(model, inputs):
+    return KerasBackend(model).predict(inputs)
+
+
+@pytest.mark.parametrize('name', ['function', 'tflite', 'numpy'])
+def test_backend_matches_keras(name, model, inputs, expected):
+    backend = create_backend(name, model)
+    np.testing.assert_allclose(backend.predict(inputs), expected, rtol=1e-4, atol=1e-5)
+    # A single row takes the same path the server uses per frame
+    np.testing.assert_allclose(backend.predict(inputs[:1]), expected[:1], rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize('name', ['tflite', 'numpy'])
+def test_cached_artifact_matches_keras(name, model, inputs, expected, tmp_path):
+    path = str(tmp_path / f'model.{name}')
+    save_artifact(path, create_backend(name, model))
+    np.testing.assert_allclose(read_artifact(path, name).predict(inputs), expected, rtol=1e-4, atol=1e-5)
+
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+from palmspeak.engine import RecognitionEngine, ASL_CLASSES
+from palmspeak.inference import NumpyBackend
+from palmspeak.vision import normalize_hands, normalize_landmarks, FrameBuffers
+
+
+@pytest.fixture
+def client():
+    engine = RecognitionEngine(port=0, stream_port=0)
+    rng = np.random.default_rng(0)
+    engine.inference = NumpyBackend([(rng.standard_normal((63, len(ASL_CLASSES))), np.zeros(len(ASL_CLASSES)),
+                                      'softmax')])
+    engine.model_loaded = True
+    yield engine.create_flask_app().test_client()
+    engine.shutdown()
+
+
+def post_json(client, landmarks):
+    return client.post('/predict-landmarks', json={'landmarks': landmarks})
+
+
+def post_binary(client, values):
+    return client.post('/predict-landmarks', data=np.asarray(values, dtype='<f4').tobytes(),
+                       content_type='application/octet-stream')
+
+
+@pytest.mark.parametrize('landmarks', [
+    5, 'abc', {'x': 1}, [[1, 2], [3]], [None] * 63, [0.5] * 62,
+    [0.0] * 63, [-0.5] * 63, [0.5] * 63 + [0.0] * 63,
+])
+def test_malformed_json_landmarks_are_rejected(client, landmarks):
+    response = post_json(client, landmarks)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('values', [np.zeros(63), np.full(63, -1.0), np.full(63, np.nan)])
+def test_malformed_binary_landmarks_are_rejected(client, values):
+    assert post_binary(client, values).status_code == 400
+
+
+def test_valid_landmarks_answer_with_strict_json(client):
+    for response in (post_json(client, [0.5] * 63), post_binary(client, np.linspace(0.1, 1, 63))):
+        assert response.status_code == 200
+        # NaN/Infinity are not JSON; browsers' response.json() rejects them
+        body = json.loads(response.data, parse_constant=lambda name: pytest.fail(f"{name} in response"))
+        assert body['raw_letter'] in ASL_CLASSES
+
+
+def test_normalization_never_divides_by_a_non_positive_max():
+    rows = [np.zeros((21, 3), dtype=np.float32), np.full((21, 3), -0.2, dtype=np.float32),
+            np.linspace(0, 2, 63, dtype=np.float32).reshape(21, 3)]
+    for batch in (normalize_hands(rows), normalize_hands(rows, FrameBuffers(max_hands=3))):
+        assert np.isfinite(batch).all()
+        assert batch[2].max() == pytest.approx(1.0)
+    assert np.isfinite(normalize_landmarks(np.zeros(63, dtype=np.float32))).all()
@@ -0,0 +1,87 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from palmspeak.logs import (LogSampler, RateLimitFilter, RingBufferHandler, JsonFormatter,
+                            _BoundedQueueHandler, start_file_logging)
+
+
+@pytest.fixture
+def logger(request):
+    logger = logging.getLogger(f'palmspeak.test.{request.node.name}')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for log_filter in list(logger.filters):
+        logger.removeFilter(log_filter)
+
+
+def test_ring_buffer_keeps_the_newest_lines(logger):
+    handler = RingBufferHandler(capacity=3)
+    logger.addHandler(handler)
+    for i in range(5):
+        logger.info("line %d", i)
+    assert handler.drain() == (['line 2', 'line 3', 'line 4'], 2)
+    logger.info("line 5")
+    # Drops are reported once; the total keeps counting
+    assert handler.drain() == (['line 5'], 0)
+    assert handler.dropped == 2 and len(handler.lines) == 0
+
+
+def test_rate_limit_suppresses_repeats_per_call_site(logger):
+    handler = RingBufferHandler()
+    logger.addHandler(handler)
+    log_filter = RateLimitFilter(rate=1e-6, burst=3)
+    logger.addFilter(log_filter)
+
+    def repeat(count):
+        for i in range(count):
+            logger.warning("repeated %d", i)
+
+    repeat(10)
+    logger.warning("other call site")
+    lines, _ = handler.drain()
+    assert lines == ['repeated 0', 'repeated 1', 'repeated 2', 'other call site']
+    assert log_filter.suppressed == 7
+
+    # Once the bucket refills, the next record reports what was suppressed
+    log_filter.rate = 1e6
+    repeat(2)
+    assert handler.drain()[0] == ['repeated 0 (7 similar messages suppressed)', 'repeated 1']
+
+
+def test_sampler_lets_one_in_n_through():
+    sampler = LogSampler(every=4)
+    assert [sampler() for _ in range(8)] == [True, False, False, False] * 2
+    assert not any(LogSampler(every=0)() for _ in range(3))
+
+
+def test_full_queue_drops_records_instead_of_blocking(logger):
+    handler = _BoundedQueueHandler(queue.Queue(2))
+    logger.addHandler(handler)
+    for i in range(5):
+        logger.info("record %d", i)
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
+    record = handler.queue.get_nowait()
+    assert record.msg == 'record 0' and record.args is None
+
+
+def test_file_logging_writes_json_lines(logger, tmp_path):
+    path = tmp_path / 'logs' / 'palmspeak.log'
+    listener = start_file_logging(logger, str(path), output_format='json')
+    try:
+        logger.info("hello %s", 'file')
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("failed")
+    finally:
+        listener.stop()
+    entries = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [entry['message'] for entry in entries] == ['hello file', 'failed']
+    assert entries[0]['level'] == 'INFO' and 'RuntimeError: boom' in entries[1]['exception']
+    assert isinstance(JsonFormatter().format(logging.makeLogRecord({'msg': 'x'})), str)
@@ -0,0 +1,61 @@
+import base64
+import io
+
+import cv2
+import numpy as np
+import pytest
+
+from palmspeak.engine import RecognitionEngine, ASL_CLASSES
+from palmspeak.inference import NumpyBackend
+
+
+@pytest.fixture
+def client():
+    engine = RecognitionEngine(port=0, stream_port=0)
+    rng = np.random.default_rng(0)
+    engine.inference = NumpyBackend([(rng.standard_normal((63, len(ASL_CLASSES))), np.zeros(len(ASL_CLASSES)),
+                                      'softmax')])
+    engine.model_loaded = True
+    # No hand in the test frames, so MediaPipe is never needed
+    engine.extract_hands = lambda image, session=None, buffers=None: []
+    yield engine.create_flask_app().test_client()
+    engine.shutdown()
+
+
+@pytest.fixture(scope='module')
+def png():
+    return cv2.imencode('.png', np.zeros((48, 64, 3), dtype=np.uint8))[1].tobytes()
+
+
+def test_binary_multipart_and_base64_uploads_are_accepted(client, png):
+    data_url = 'data:image/png;base64,' + base64.b64encode(png).decode()
+    responses = [
+        client.post('/predict', data=png, content_type='image/png'),
+        client.post('/predict', data={'image': (io.BytesIO(png), 'frame.png')},
+                    content_type='multipart/form-data'),
+        client.post('/predict', json={'image': data_url}),
+        client.post('/predict', json={'image': base64.b64encode(png).decode()}),
+    ]
+    for response in responses:
+        assert response.status_code == 200
+        assert response.get_json()['letter'] == 'nothing'
+
+
+@pytest.mark.parametrize('body', [{}, {'image': None}, {'image': ''}, ['image']])
+def test_missing_image_is_rejected(client, body):
+    response = client.post('/predict', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'No image data'
+
+
+@pytest.mark.parametrize('image', [123, ['abc'], {'data': 'abc'}, 'abc', 'data:image/png;base64,abcde'])
+def test_malformed_json_image_is_rejected(client, image):
+    response = client.post('/predict', json={'image': image})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_undecodable_image_is_rejected(client):
+    response = client.post('/predict', data=b'not an image', content_type='image/jpeg')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Failed to decode image'
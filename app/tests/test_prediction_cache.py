@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+
+from palmspeak.prediction_cache import PredictionCache
+
+
+class CountingModel:
+    """predict(batch) that records how many rows it was asked for"""
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+        self.rows = 0
+
+    def __call__(self, inputs):
+        self.rows += len(inputs)
+        return inputs[:, :2] + self.offset
+
+
+def rows(*values):
+    return np.array([[value] * 63 for value in values], dtype=np.float32)
+
+
+def test_rows_in_the_same_cell_reuse_the_output():
+    cache = PredictionCache(grid=0.01)
+    model = CountingModel()
+    first = cache.predict(rows(0.5), model)
+    again = cache.predict(rows(0.501, 0.7), model)
+    assert model.rows == 2
+    np.testing.assert_array_equal(again[0], first[0])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_new_model_invalidates_entries():
+    cache = PredictionCache(grid=0.01)
+    old_model, new_model = CountingModel(), CountingModel(offset=1.0)
+    cache.set_model(old_model)
+    cache.predict(rows(0.5, 0.6), old_model)
+    assert len(cache) == 2
+
+    # Setting the same model again keeps the entries
+    cache.set_model(old_model)
+    assert len(cache) == 2 and cache.invalidations == 0
+
+    cache.set_model(new_model)
+    assert len(cache) == 0 and cache.invalidations == 1
+    output = cache.predict(rows(0.5), new_model)
+    assert new_model.rows == 1
+    np.testing.assert_allclose(output[0], [1.5, 1.5])
+
+
+def test_entries_expire_after_ttl():
+    cache = PredictionCache(grid=0.01, ttl=0.01)
+    model = CountingModel()
+    cache.predict(rows(0.5), model)
+    time.sleep(0.02)
+    cache.predict(rows(0.5), model)
+    assert model.rows == 2 and cache.expirations == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(grid=0.01, max_entries=2)
+    model = CountingModel()
+    cache.predict(rows(0.1, 0.2), model)
+    cache.predict(rows(0.1), model)  # 0.1 becomes the most recently used
+    cache.predict(rows(0.3), model)  # evicts 0.2
+    assert cache.evictions == 1
+    model.rows = 0
+    cache.predict(rows(0.1, 0.2), model)
+    assert model.rows == 1
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+import palmspeak.engine
+from palmspeak.engine import RecognitionEngine
+from palmspeak.roi import FULL_FRAME, crop_region, hands_to_full_frame
+from palmspeak.sessions import SessionState
+
+
+class FakeHands:
+    def __init__(self, static):
+        self.static = static
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = RecognitionEngine(port=0, stream_port=0)
+    engine.hand_detectors.create_hands = FakeHands
+    calls = engine.detector_calls = []
+
+    def detect_hands(hands, image_rgb, buffers=None):
+        # One hand in the middle of whatever image MediaPipe is given
+        calls.append((hands.static, image_rgb.shape[:2]))
+        landmarks = np.random.default_rng(0).uniform(0.45, 0.55, (21, 3)).astype(np.float32)
+        return [(landmarks, 'Right', 0.9)]
+
+    monkeypatch.setattr(palmspeak.engine, 'detect_hands', detect_hands)
+    yield engine
+    engine.shutdown()
+
+
+def run_frames(engine, session, count=5):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    responses = []
+    for _ in range(count):
+        engine.locate_hands(frame, session)
+        responses.append(engine.add_roi({}, session))
+    return responses
+
+
+def test_tracked_session_sends_full_frames_to_its_tracker(engine):
+    session = SessionState('tracked')
+    responses = run_frames(engine, session)
+    # Every frame reaches the video tracker with the same geometry, so tracking holds
+    assert engine.detector_calls == [(False, (480, 640))] * 5
+    assert session.tracker is not None
+    assert all(response['roi'] is None for response in responses)
+
+
+def test_untracked_session_crops_to_the_hand_region(engine):
+    engine.hand_detectors.max_trackers = 0
+    session = SessionState('untracked')
+    responses = run_frames(engine, session)
+    assert engine.detector_calls[0] == (True, (480, 640))
+    assert all(static and max(shape) == engine.roi_size for static, shape in engine.detector_calls[1:])
+    assert session.tracker is None
+    assert all(response['roi'] is not None for response in responses)
+
+
+def test_sessions_beyond_the_tracker_limit_fall_back_to_cropping(engine):
+    engine.hand_detectors.max_trackers = 1
+    first, second = SessionState('first'), SessionState('second')
+    run_frames(engine, first, 1)
+    responses = run_frames(engine, second, 3)
+    assert first.tracker is not None and second.tracker is None
+    assert responses[-1]['roi'] is not None
+    assert engine.add_roi({}, first)['roi'] is None
+
+
+@pytest.mark.parametrize('image_region', [FULL_FRAME, (0.25, 0.1, 0.5, 0.8)])
+def test_crop_landmarks_map_back_to_the_full_capture(image_region):
+    # A bright pixel at a known full-capture position, in an image covering `image_region`
+    target = (0.55, 0.42)
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    ix, iy, iw, ih = image_region
+    image[int((target[1] - iy) / ih * 480), int((target[0] - ix) / iw * 640)] = 255
+    crop, region = crop_region(image, (0.4, 0.3, 0.3, 0.3), image_region, size=128)
+    assert max(crop.shape[:2]) == 128
+
+    # Locate the pixel in the crop as MediaPipe would, normalized to the crop
+    y, x = np.unravel_index(np.argmax(crop.max(axis=2)), crop.shape[:2])
+    landmarks = np.tile([(x + 0.5) / crop.shape[1], (y + 0.5) / crop.shape[0], 0.1], (21, 1))
+    (mapped, label, score), = hands_to_full_frame([(landmarks, 'Left', 0.8)], region)
+    assert (label, score) == ('Left', 0.8)
+    np.testing.assert_allclose(mapped[:, :2], np.tile(target, (21, 1)), atol=0.01)
+    assert mapped[0, 2] == pytest.approx(0.1 * region[2])
+
+
+def test_in_place_mapping_overwrites_the_landmarks():
+    landmarks = np.full((21, 3), 0.5, dtype=np.float32)
+    region = (0.2, 0.4, 0.5, 0.25)
+    hands_to_full_frame([(landmarks, None, None)], region, in_place=True)
+    np.testing.assert_allclose(landmarks[:, :2], np.tile([0.45, 0.525], (21, 1)))
+    assert hands_to_full_frame([(landmarks, None, None)], FULL_FRAME)[0][0] is landmarks
@@ -0,0 +1,115 @@
+import json
+import socket
+import threading
+import time
+import http.client
+
+import pytest
+from flask import Flask
+
+from palmspeak import serving
+from palmspeak.serving import ApiServer, default_server_mode
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def port_is_free(port):
+    with socket.socket() as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(('127.0.0.1', port))
+        except OSError:
+            return False
+        return True
+
+
+def slow_app(delay=0.3):
+    app = Flask('serving-test')
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(delay)
+        return 'done'
+
+    @app.route('/fast')
+    def fast():
+        return 'ok'
+
+    return app
+
+
+def get(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    connection.request('GET', path)
+    return connection, connection.getresponse().read()
+
+
+def test_waitress_is_the_default_when_installed(monkeypatch):
+    if serving.create_waitress_server is not None:
+        assert default_server_mode() == 'waitress'
+    monkeypatch.setattr(serving, 'create_waitress_server', None)
+    assert default_server_mode() == 'werkzeug'
+    with pytest.raises(ValueError):
+        ApiServer(slow_app(), mode='waitress')
+    with pytest.raises(ValueError):
+        ApiServer(slow_app(), mode='gunicorn')
+
+
+@pytest.mark.parametrize('mode', ['waitress', 'werkzeug'])
+def test_stop_finishes_in_flight_request_and_releases_port(mode):
+    if mode == 'waitress':
+        pytest.importorskip('waitress')
+    port = free_port()
+    exits = []
+    server = ApiServer(slow_app(), host='127.0.0.1', port=port, mode=mode)
+    server.start(on_exit=exits.append)
+
+    # An idle keep-alive connection must not hold the server open
+    idle, body = get(port, '/fast')
+    assert body == b'ok'
+
+    replies = []
+    client = threading.Thread(target=lambda: replies.append(get(port, '/slow')[1]))
+    client.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    server.stop(timeout=5.0)
+    elapsed = time.perf_counter() - started
+    client.join(timeout=5.0)
+    idle.close()
+
+    assert replies == [b'done']
+    assert elapsed < 2.0
+    assert not server.running
+    assert exits == [None]
+    assert port_is_free(port)
+
+
+def test_engine_serves_stream_next_to_waitress():
+    pytest.importorskip('waitress')
+    pytest.importorskip('flask_sock')
+    from simple_websocket import Client
+    from palmspeak.engine import RecognitionEngine
+
+    port, stream_port = free_port(), free_port()
+    engine = RecognitionEngine(host='127.0.0.1', port=port, stream_port=stream_port)
+    assert engine.server_mode == 'waitress'
+    engine.start_server()
+    try:
+        _, body = get(port, '/health')
+        assert json.loads(body)['stream_port'] == stream_port
+        assert '/stream' not in {rule.rule for rule in engine.flask_app.url_map.iter_rules()}
+
+        ws = Client.connect(f'ws://127.0.0.1:{stream_port}/stream')
+        try:
+            ws.send(json.dumps({'landmarks': [0.5] * 63}))
+            assert json.loads(ws.receive(timeout=5))['error'] == 'Model is loading'
+        finally:
+            ws.close()
+    finally:
+        engine.stop_server()
+    assert port_is_free(port) and port_is_free(stream_port)
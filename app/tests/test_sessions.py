@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from palmspeak.engine import RecognitionEngine, ASL_CLASSES
+from palmspeak.inference import NumpyBackend
+from palmspeak.sessions import SessionTable, SESSION_HEADER
+
+
+def test_least_recently_used_session_is_evicted():
+    evicted = []
+    table = SessionTable(max_sessions=2, on_evict=evicted.append)
+    a = table.get('a')
+    table.get('b')
+    assert table.get('a') is a  # Touching 'a' makes 'b' the oldest
+    table.get('c')
+    assert [session.session_id for session in evicted] == ['b']
+    assert table.peek('b') is None and table.peek('a') is a
+    assert len(table) == 2 and table.evicted == 1
+
+
+def test_idle_sessions_expire():
+    evicted = []
+    table = SessionTable(ttl=60, on_evict=evicted.append)
+    table.get('idle').last_seen -= 120
+    table.get('active')
+    assert [session.session_id for session in evicted] == ['idle']
+    assert table.peek('idle') is None
+    # An expired ID starts over with a fresh session
+    assert len(table.get('idle').prediction_buffer) == 0
+
+
+def test_peek_does_not_create_or_refresh():
+    table = SessionTable(max_sessions=2)
+    table.get('a')
+    table.get('b')
+    assert table.peek('a') is not None and table.peek('missing') is None
+    table.get('c')
+    assert table.peek('a') is None and len(table) == 2
+
+
+@pytest.fixture
+def engine():
+    engine = RecognitionEngine(port=0, stream_port=0)
+    rng = np.random.default_rng(0)
+    engine.inference = NumpyBackend([(rng.standard_normal((63, len(ASL_CLASSES))), np.zeros(len(ASL_CLASSES)),
+                                      'softmax')])
+    engine.model_loaded = True
+    yield engine
+    engine.shutdown()
+
+
+def test_clear_buffer_only_clears_the_requesting_session(engine):
+    client = engine.create_flask_app().test_client()
+    landmarks = np.random.default_rng(1).uniform(0.2, 0.8, 63).tolist()
+    for session_id in ('first', 'second'):
+        response = client.post('/predict-landmarks', json={'landmarks': landmarks},
+                               headers={SESSION_HEADER: session_id})
+        assert response.status_code == 200
+
+    response = client.post('/clear-buffer', headers={SESSION_HEADER: 'first'})
+    assert response.get_json()['session_id'] == 'first'
+    assert len(engine.sessions.peek('first').prediction_buffer) == 0
+    assert len(engine.sessions.peek('second').prediction_buffer) == 1
+    # Clearing an unknown session does not create one
+    client.post('/clear-buffer', headers={SESSION_HEADER: 'unknown'})
+    assert engine.sessions.peek('unknown') is None
@@ -0,0 +1,92 @@
+import random
+from collections import Counter
+
+import pytest
+
+from palmspeak.smoothing import VoteWindow, MinShareVote, WeightedVote, NOTHING, policy_factory
+
+
+def reference_vote(predictions):
+    """The original smoothing: Counter.most_common over the buffer, mean confidence"""
+    label = Counter(label for label, _ in predictions).most_common(1)[0][0]
+    confidences = [confidence for entry, confidence in predictions if entry == label]
+    return label, sum(confidences) / len(confidences)
+
+
+def test_empty_window_votes_nothing():
+    assert VoteWindow(5).most_common() == NOTHING
+
+
+def test_tie_goes_to_label_that_entered_first():
+    window = VoteWindow(10)
+    for label in 'BAAB':
+        window.append((label, 0.5))
+    assert window.most_common()[0] == 'B'
+
+
+def test_tie_break_follows_evictions():
+    window = VoteWindow(3)
+    for label in 'ABBA':
+        window.append((label, 0.5))
+    # Window is B, B, A
+    assert window.most_common()[0] == 'B'
+    window.append(('A', 0.5))
+    # Window is B, A, A
+    assert window.most_common()[0] == 'A'
+    window.append(('B', 0.5))
+    # Window is A, A, B
+    assert window.most_common()[0] == 'A'
+    window.append(('B', 0.5))
+    # Window is A, B, B
+    assert window.most_common()[0] == 'B'
+
+
+def test_majority_matches_counter_reference():
+    rng = random.Random(7)
+    window = VoteWindow(10)
+    history = []
+    for _ in range(2000):
+        prediction = (rng.choice('ABCD'), rng.random())
+        window.append(prediction)
+        history.append(prediction)
+        label, confidence = window.most_common()
+        expected_label, expected_confidence = reference_vote(history[-10:])
+        assert label == expected_label
+        assert confidence == pytest.approx(expected_confidence)
+
+
+def test_clear_resets_window():
+    window = VoteWindow(4)
+    for label in 'AAB':
+        window.append((label, 0.9))
+    window.clear()
+    assert len(window) == 0 and window.most_common() == NOTHING
+    window.append(('C', 0.4))
+    assert window.most_common() == ('C', 0.4)
+
+
+def test_min_share_needs_enough_votes():
+    window = VoteWindow(4, MinShareVote(0.75))
+    for label in 'ABAA':
+        window.append((label, 0.8))
+    assert window.most_common() == ('A', pytest.approx(0.8))
+    window.append(('B', 0.8))
+    # Window is B, A, A, B: no label holds 75%
+    assert window.most_common() == NOTHING
+
+
+def test_weighted_vote_prefers_recent_predictions():
+    window = VoteWindow(10, WeightedVote(0.9))
+    for label in 'AAAAB':
+        window.append((label, 1.0))
+    assert window.most_common()[0] == 'A'
+    window.append(('B', 1.0))
+    window.append(('B', 1.0))
+    assert window.most_common()[0] == 'B'
+
+
+def test_policy_factory_parses_parameter():
+    policy = policy_factory('min-share:0.6')()
+    assert isinstance(policy, MinShareVote) and policy.min_share == 0.6
+    with pytest.raises(ValueError):
+        policy_factory('unknown')
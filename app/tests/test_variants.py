@@ -0,0 +1,61 @@
+"""Reduced-precision variants must pass the same agreement gate the loader enforces."""
+
+import logging
+import os
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from palmspeak.artifacts import load_inference, load_variant, save_artifact, read_artifact
+from palmspeak.inference import KerasBackend, create_backend
+from palmspeak.variants import MIN_AGREEMENT, agreement, build_variant, synthetic_landmarks
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'alphabet_keras', 'asl_alphabet_model.h5')
+
+
+@pytest.fixture(scope='module')
+def model():
+    return tf.keras.models.load_model(MODEL_PATH)
+
+
+@pytest.fixture(scope='module')
+def rows(model):
+    return synthetic_landmarks(model.input_shape[-1])
+
+
+@pytest.fixture(scope='module')
+def tflite(model):
+    return create_backend('tflite', model)
+
+
+def test_numpy_backend_ignores_reduced_precision(caplog):
+    with caplog.at_level(logging.WARNING):
+        backend, _ = load_inference(MODEL_PATH, 'numpy', None, logger=logging.getLogger('test'),
+                                    precision='int8')
+    assert (backend.name, backend.precision) == ('numpy', 'float32')
+    assert all(kernel.dtype == np.float32 for kernel, _, _ in backend.layers)
+    assert 'float32 only' in caplog.text
+
+
+def test_tflite_float16_matches_keras(model, rows, tflite, tmp_path):
+    variant = build_variant(tflite, model, 'float16', rows)
+    expected = KerasBackend(model).predict(rows)
+    np.testing.assert_allclose(variant.predict(rows), expected, atol=5e-3)
+    assert agreement(variant, tflite, rows) >= MIN_AGREEMENT
+    assert len(variant.model_content) < len(tflite.model_content)
+
+    path = str(tmp_path / 'float16.tflite')
+    save_artifact(path, variant)
+    np.testing.assert_array_equal(read_artifact(path, 'tflite', 'float16').predict(rows), variant.predict(rows))
+
+
+@pytest.mark.parametrize('precision', ['float16', 'int8'])
+def test_loader_keeps_a_variant_only_if_it_passes_the_gate(precision, model, rows, tflite):
+    share = agreement(build_variant(tflite, model, precision, rows), tflite, rows)
+    loaded = load_variant(tflite, model, precision)
+    if share >= MIN_AGREEMENT:
+        assert loaded.precision == precision
+    else:
+        assert loaded is tflite
@@ -0,0 +1,125 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+from palmspeak.roi import FULL_FRAME
+from palmspeak.workers import VisionWorkerPool, WorkersUnavailable, _Worker
+
+
+class FakeWorker:
+    """Stands in for a worker process; `behaviour` is 'ok', 'crash' or 'hang'"""
+
+    def __init__(self, index, ready):
+        self.index = index
+        self.ready = ready
+        self.behaviour = 'ok'
+        self.regions = []
+        self.stopped = False
+        self.backend_name = 'fake'
+
+    def wait_ready(self):
+        if not self.ready.wait(5):
+            raise RuntimeError("startup timed out")
+
+    def process_frame(self, image_bytes, region, timeout):
+        self.regions.append(region)
+        if self.behaviour == 'crash':
+            raise EOFError()
+        if self.behaviour == 'hang':
+            raise TimeoutError(f"no reply within {timeout:g}s")
+        return [{'index': self.index}]
+
+    def stop(self, timeout=2.0):
+        self.stopped = True
+
+
+@pytest.fixture
+def pool():
+    pool = VisionWorkerPool(1, 'model.keras', 'numpy', acquire_timeout=1.0)
+    pool.ready = threading.Event()
+    pool.ready.set()
+    pool.spawned = []
+
+    def spawn(index):
+        worker = FakeWorker(index, pool.ready)
+        pool.spawned.append(worker)
+        return worker
+
+    pool._spawn = spawn
+    pool.start()
+    yield pool
+    pool.ready.set()
+    pool.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('behaviour', ['crash', 'hang'])
+def test_failed_worker_is_replaced_in_the_background(pool, behaviour):
+    pool.ready.clear()
+    crashed = pool.spawned[0]
+    crashed.behaviour = behaviour
+    with pytest.raises(WorkersUnavailable, match='crashed'):
+        pool.process(b'frame')
+
+    # While the replacement loads, frames are turned away at once instead of waiting
+    started = time.monotonic()
+    with pytest.raises(WorkersUnavailable, match='restarting'):
+        pool.process(b'frame')
+    assert time.monotonic() - started < 0.5
+    assert pool.running and pool.restarting == 1
+
+    pool.ready.set()
+    wait_for(lambda: pool.restarting == 0)
+    assert crashed.stopped
+    assert pool.process(b'frame') == [{'index': 0}]
+    assert pool.spawned[-1] is not crashed and len(pool) == 1
+
+
+def test_pool_stops_when_its_last_worker_cannot_restart(pool):
+    pool.spawned[0].behaviour = 'crash'
+
+    def spawn(index):
+        raise RuntimeError("no model")
+
+    pool._spawn = spawn
+    with pytest.raises(WorkersUnavailable):
+        pool.process(b'frame')
+    wait_for(lambda: not pool.running)
+    with pytest.raises(WorkersUnavailable, match='stopped'):
+        pool.process(b'frame')
+
+
+def test_frame_region_reaches_the_worker(pool):
+    region = (0.25, 0.25, 0.5, 0.5)
+    pool.process(b'frame', region)
+    pool.process(b'frame')
+    assert pool.spawned[0].regions == [region, FULL_FRAME]
+
+
+def test_worker_reply_timeout_raises():
+    worker = _Worker.__new__(_Worker)
+    worker.conn, child_conn = multiprocessing.Pipe()
+    worker.shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(TimeoutError):
+            worker.process_frame(b'frame', FULL_FRAME, 0.05)
+        assert child_conn.recv() == (5, None, FULL_FRAME)
+        assert bytes(worker.shm.buf[:5]) == b'frame'
+
+        child_conn.send(('ok', []))
+        assert worker.process_frame(b'x' * 100, FULL_FRAME, 1.0) == []
+        assert child_conn.recv() == (100, b'x' * 100, FULL_FRAME)
+    finally:
+        worker.conn.close()
+        child_conn.close()
+        worker.shm.close()
+        worker.shm.unlink()
@@ -13,9 +13,19 @@ let translatedText = "";
 let lastDetectedLetter = null; // Track the last detected letter
 let letterConfirmationCount = 0; // Count how many times we've seen the same letter
 let isOverlayMinimized = false; // Track overlay state
+let sessionId = null; // Server-side smoothing session for this recognition run
+let streamSocket = null; // WebSocket to the Control Centre while streaming
+let handRegion = null; // [x, y, width, height] of the capture around the hand, from the server
+let backoffUntil = 0; // Don't send frames before this time (server shedding load)
 const MAX_HISTORY = 5; // Number of predictions to keep for smoothing
 const FRAME_INTERVAL = 500; // Process frames every 500ms
 const CONFIRMATION_THRESHOLD = 3; // How many times we need to see a letter before confirming it
+const STREAM_FRAME_INTERVAL = 66; // ~15 fps when streaming over the WebSocket
+const FULL_FRAME_MAX_SIZE = 480; // Longest side when sending the whole capture
+const HAND_FRAME_SIZE = 224; // Longest side when sending only the hand region
+const API_BASE = 'http://127.0.0.1:5000';
+const STREAM_URL = 'ws://127.0.0.1:5001/stream';
+let confirmationThreshold = CONFIRMATION_THRESHOLD; // Scaled with the frame rate
 
 // Initialize content script
 function initialize() {
@@ -113,6 +123,7 @@ function setupOverlayEventListeners() {
       lastDetectedLetter = null;
       letterConfirmationCount = 0;
       letterHistory = [];
+      clearServerBuffer();
       
       // Provide user feedback
       clearButton.style.backgroundColor = '#4CAF50';
@@ -275,6 +286,8 @@ function startRecognition(stream) {
   letterHistory = [];
   lastDetectedLetter = null;
   letterConfirmationCount = 0;
+  sessionId = newSessionId();
+  handRegion = null;
   
   // Create video element for stream
   videoElement = document.createElement('video');
@@ -287,56 +300,211 @@ function startRecognition(stream) {
   document.body.appendChild(videoElement);
 }
 
-// Begin capturing frames from video
+// Begin capturing frames from video, streaming over a WebSocket when the server supports it
 function beginFrameCapture() {
+  openStream().then(streaming => {
+    if (!isRecognizing) {
+      closeStream();
+      return;
+    }
+    startCaptureLoop(streaming ? STREAM_FRAME_INTERVAL : FRAME_INTERVAL);
+  });
+}
+
+// Capture and send a frame every `interval` ms
+function startCaptureLoop(interval) {
   const canvas = document.createElement('canvas');
   const context = canvas.getContext('2d');
-  canvas.width = 224; // Size for model input
-  canvas.height = 224;
   
+  // Keep the time needed to confirm a letter the same at any frame rate
+  confirmationThreshold = Math.max(1, Math.round(CONFIRMATION_THRESHOLD * FRAME_INTERVAL / interval));
+  
+  if (captureInterval) {
+    clearInterval(captureInterval);
+  }
   captureInterval = setInterval(() => {
     if (!isRecognizing || !videoElement) return;
+    
+    // Skip this tick if the previous frame is still waiting to go out
+    if (streamSocket && streamSocket.bufferedAmount > 0) return;
+    
+    // Skip while the server has asked us to back off
+    if (Date.now() < backoffUntil) return;
 
     try {
-      // Draw the current video frame onto the canvas
-      context.drawImage(videoElement, 0, 0, canvas.width, canvas.height);
-      const imageDataURL = canvas.toDataURL('image/jpeg', 0.8); // Optimize JPEG quality
+      // Draw the hand region the server last reported, or the whole capture
+      const region = drawFrame(canvas, context, handRegion);
       
-      // Send the frame to the Flask API
-      fetch('http://127.0.0.1:5000/predict', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({ image: imageDataURL })
-      })
-      .then(response => {
-        if (!response.ok) {
-          throw new Error(`API request failed with status ${response.status}`);
-        }
-        return response.json();
-      })
-      .then(data => {
-        if (data.error) {
-          console.error("PalmSpeak: API Error:", data.error);
-          return;
-        }
-        
-        // Only process if we're still recognizing (might have stopped during fetch)
-        if (isRecognizing) {
-          updatePrediction(data.letter, data.confidence);
-        }
-      })
-      .catch(error => {
-        console.error("PalmSpeak: Error sending frame to API:", error);
-        if (isRecognizing && predictionElement) {
-          predictionElement.textContent = "API Error: " + error.message;
+      // Encode as JPEG and send the raw bytes (no base64/JSON wrapping)
+      canvas.toBlob(blob => {
+        if (!blob) return;
+        if (streamSocket && streamSocket.readyState === WebSocket.OPEN) {
+          streamSocket.send(region ? new Blob([roiPrefix(region), blob]) : blob);
+        } else {
+          sendFrame(blob, region);
         }
-      });
+      }, 'image/jpeg', 0.8); // Optimize JPEG quality
     } catch (error) {
       console.error("Error during frame processing:", error);
     }
-  }, FRAME_INTERVAL);
+  }, interval);
+}
+
+// Draw `region` of the video (or all of it) onto the canvas; returns the region drawn
+function drawFrame(canvas, context, region) {
+  const videoWidth = videoElement.videoWidth;
+  const videoHeight = videoElement.videoHeight;
+  let sx = 0, sy = 0, sw = videoWidth, sh = videoHeight;
+  let maxSize = FULL_FRAME_MAX_SIZE;
+  if (region) {
+    sx = region[0] * videoWidth;
+    sy = region[1] * videoHeight;
+    sw = region[2] * videoWidth;
+    sh = region[3] * videoHeight;
+    maxSize = HAND_FRAME_SIZE;
+  }
+  const scale = Math.min(1, maxSize / Math.max(sw, sh));
+  const width = Math.max(1, Math.round(sw * scale));
+  const height = Math.max(1, Math.round(sh * scale));
+  if (canvas.width !== width || canvas.height !== height) {
+    canvas.width = width;
+    canvas.height = height;
+  }
+  context.drawImage(videoElement, sx, sy, sw, sh, 0, 0, width, height);
+  return region;
+}
+
+// 20-byte "PSR1" + 4 little-endian float32 prefix telling the stream which region a frame covers
+function roiPrefix(region) {
+  const buffer = new ArrayBuffer(20);
+  const view = new DataView(buffer);
+  [0x50, 0x53, 0x52, 0x31].forEach((byte, i) => view.setUint8(i, byte));
+  region.forEach((value, i) => view.setFloat32(4 + i * 4, value, true));
+  return buffer;
+}
+
+// Open the streaming connection; resolves to false if it is unavailable
+function openStream() {
+  return new Promise(resolve => {
+    let socket;
+    try {
+      socket = new WebSocket(`${STREAM_URL}?session=${encodeURIComponent(sessionId)}`);
+    } catch (error) {
+      resolve(false);
+      return;
+    }
+    
+    socket.onopen = () => {
+      streamSocket = socket;
+      console.log("PalmSpeak: Streaming frames over WebSocket");
+      resolve(true);
+    };
+    socket.onmessage = event => handlePredictionResponse(JSON.parse(event.data));
+    socket.onerror = () => resolve(false);
+    socket.onclose = () => {
+      resolve(false);
+      if (streamSocket !== socket) return;
+      streamSocket = null;
+      // Fall back to per-frame HTTP requests at the normal rate
+      if (isRecognizing) {
+        console.log("PalmSpeak: Stream closed, falling back to HTTP");
+        startCaptureLoop(FRAME_INTERVAL);
+      }
+    };
+  });
+}
+
+// Close the streaming connection, if any
+function closeStream() {
+  if (streamSocket) {
+    const socket = streamSocket;
+    streamSocket = null;
+    socket.close();
+  }
+}
+
+// Apply a prediction returned by either the HTTP or the streaming API
+function handlePredictionResponse(data) {
+  if (data.shed) {
+    // Frame dropped by the server's admission control: not an error, just slow down
+    if (data.shed !== 'superseded') {
+      backoffUntil = Date.now() + (data.retry_after_ms || FRAME_INTERVAL);
+    }
+    return;
+  }
+  if (data.error) {
+    console.error("PalmSpeak: API Error:", data.error);
+    return;
+  }
+  
+  // Only process if we're still recognizing (might have stopped during the request)
+  if (isRecognizing) {
+    if ('roi' in data) {
+      handRegion = data.roi; // null when the hand was lost: send the whole capture again
+    }
+    updatePrediction(data.letter, data.confidence);
+  }
+}
+
+// Send an encoded frame (covering `region` of the capture, or all of it) to the Flask API
+function sendFrame(blob, region) {
+  const headers = {
+    'Content-Type': 'image/jpeg',
+    'X-PalmSpeak-Session': sessionId
+  };
+  if (region) {
+    headers['X-PalmSpeak-ROI'] = region.join(',');
+  }
+  fetch(`${API_BASE}/predict`, {
+    method: 'POST',
+    headers: headers,
+    body: blob
+  })
+  .then(response => {
+    if (response.status === 429 || response.status === 503) {
+      // Load shedding or model loading: the body says how long to wait
+      return response.json().then(data => {
+        if (!data.shed) {
+          backoffUntil = Date.now() + 1000 * (parseInt(response.headers.get('Retry-After'), 10) || 1);
+        }
+        return data;
+      });
+    }
+    if (!response.ok) {
+      throw new Error(`API request failed with status ${response.status}`);
+    }
+    return response.json();
+  })
+  .then(handlePredictionResponse)
+  .catch(error => {
+    console.error("PalmSpeak: Error sending frame to API:", error);
+    if (isRecognizing && predictionElement) {
+      predictionElement.textContent = "API Error: " + error.message;
+    }
+  });
+}
+
+// Create an ID for this tab's smoothing session on the server
+function newSessionId() {
+  if (window.crypto && crypto.randomUUID) {
+    return crypto.randomUUID();
+  }
+  return `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+}
+
+// Reset this session's prediction smoothing on the server
+function clearServerBuffer() {
+  if (!sessionId) return;
+  if (streamSocket && streamSocket.readyState === WebSocket.OPEN) {
+    streamSocket.send(JSON.stringify({ type: 'clear' }));
+    return;
+  }
+  fetch(`${API_BASE}/clear-buffer`, {
+    method: 'POST',
+    headers: { 'X-PalmSpeak-Session': sessionId }
+  }).catch(error => {
+    console.error("PalmSpeak: Error clearing server buffer:", error);
+  });
 }
 
 // Stop recognition process
@@ -350,6 +518,8 @@ function stopRecognition() {
     clearInterval(captureInterval);
     captureInterval = null;
   }
+  
+  closeStream();
 
   if (captureStream) {
     captureStream.getTracks().forEach(track => track.stop());
@@ -411,7 +581,7 @@ function updatePrediction(letter, confidence) {
     
     // Only add to translation if we've confirmed this letter enough times
     // and it's different from the last letter we added to translation
-    if (letterConfirmationCount >= CONFIRMATION_THRESHOLD) {
+    if (letterConfirmationCount >= confirmationThreshold) {
       // Only add if it's not 'nothing' and we haven't already added this letter
       if (letter !== 'nothing') {
         if (letter === 'space') {